@@ -1,10 +1,13 @@
 """Application tree information."""
 
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 
+from django.conf import settings
 from django.utils.safestring import mark_safe
 from druncschema.controller_pb2 import Status
 
+from interfaces.caching import SnapshotCache
 from interfaces.controller_interface import get_controller_status, get_detectors
 from interfaces.process_manager_interface import get_hostnames
 
@@ -69,9 +72,10 @@ def get_app_tree(
     Returns:
         The application tree as a AppType object.
     """
-    status = status or get_controller_status()
-    hostnames = hostnames or get_hostnames(user)
-    detectors = detectors or get_detectors()
+    if status is None or hostnames is None or detectors is None:
+        status, hostnames, detectors = fetch_app_tree_data(
+            user, status, hostnames, detectors
+        )
 
     return AppTree(
         status.name,  # type: ignore [attr-defined]
@@ -82,3 +86,75 @@ def get_app_tree(
         hostnames.get(status.name, "unknown"),  # type: ignore [attr-defined]
         detectors.get(status.name, ""),  # type: ignore [attr-defined]
     )
+
+
+def fetch_app_tree_data(
+    user: str,
+    status: Status | None = None,
+    hostnames: dict[str, str] | None = None,
+    detectors: dict[str, str] | None = None,
+) -> tuple[Status, dict[str, str], dict[str, str]]:
+    """Get the information needed to build the application tree.
+
+    The controller status, the hostnames from the process manager and the detectors
+    from the controller description are independent of each other, so any of them not
+    provided are requested concurrently.
+
+    Args:
+        user: The user to get the information for.
+        status: The root controller status, if already known.
+        hostnames: The hostnames of the applications, if already known.
+        detectors: The detectors of the applications, if already known.
+
+    Returns:
+        The root controller status, the hostnames and the detectors.
+    """
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        status_ = executor.submit(
+            lambda: status if status is not None else get_controller_status()
+        )
+        hostnames_ = executor.submit(
+            lambda: hostnames if hostnames is not None else get_hostnames(user)
+        )
+        detectors_ = executor.submit(
+            lambda: detectors if detectors is not None else get_detectors()
+        )
+        return status_.result(), hostnames_.result(), detectors_.result()
+
+
+@dataclass
+class AppTreeSnapshot:
+    """Application tree and its table rows, as shared between views."""
+
+    tree: AppTree
+    """The application tree."""
+
+    rows: list[dict[str, str]]
+    """The application tree as table rows, as returned by `AppTree.to_list`."""
+
+
+app_tree_cache: SnapshotCache[AppTreeSnapshot] = SnapshotCache(
+    "app_tree", "APP_TREE_SNAPSHOT_TTL"
+)
+"""Application tree snapshots of each session."""
+
+
+def get_app_tree_snapshot(user: str) -> AppTreeSnapshot:
+    """Get the application tree of the current session and its table rows.
+
+    Building the tree requires several requests to the controller and the process
+    manager, so the result is cached for `APP_TREE_SNAPSHOT_TTL` seconds and shared by
+    all the views displaying the tree.
+
+    Args:
+        user: The user to get the tree for.
+
+    Returns:
+        The application tree snapshot.
+    """
+
+    def build() -> AppTreeSnapshot:
+        tree = get_app_tree(user)
+        return AppTreeSnapshot(tree, tree.to_list())
+
+    return app_tree_cache.get(build, settings.CSC_SESSION)
@@ -7,8 +7,34 @@ from druncschema.controller_pb2 import Argument
 
 from interfaces import controller_interface as ci
 
+_form_classes: dict[tuple[tuple[str, str, int], str], type[Form]] = {}
+"""Form classes already created, by FSM schema key and event."""
+
 
 def get_form_for_event(event: str) -> type[Form]:
+    """Get the form for an event, creating it only if not done already.
+
+    Form classes are kept for as long as the FSM schema they are created from is valid,
+    so opening and submitting an event dialog does not require asking the controller
+    for the event arguments every time.
+
+    Args:
+        event: Event to get the form for.
+
+    Returns:
+        A form class including the required arguments.
+    """
+    if (form := _form_classes.get((ci.get_fsm_schema_key(), event))) is None:
+        form = create_form_for_event(event)
+        key = ci.get_fsm_schema_key()
+        # Forms created from a schema no longer valid won't be used again.
+        for stale in [k for k in _form_classes if k[0] != key]:
+            _form_classes.pop(stale, None)
+        _form_classes[(key, event)] = form
+    return form
+
+
+def create_form_for_event(event: str) -> type[Form]:
     """Creates a form from a list of Arguments.
 
     We loop over the arguments and create a form field for each one. The field
@@ -8,6 +8,7 @@ from django.http import HttpRequest, HttpResponse
 from django.shortcuts import render
 
 from interfaces import controller_interface as ci
+from main import jobs
 
 from .. import app_tree, forms, fsm, tables
 
@@ -39,17 +40,27 @@ def make_fsm_flowchart(states: dict[str, dict[str, str]], current_state: str) ->
 
 @login_required
 def state_machine(request: HttpRequest) -> HttpResponse:
-    """Triggers a chan."""
+    """Triggers a change of state, running it in the background, and renders the FSM.
+
+    The rendered FSM reflects the state when the change was submitted. Once the change
+    is done, the `jobFinished` event triggered by the job progress reloads it.
+    """
     event = request.POST.get("event", None)
     arguments: dict[str, Any] = {  # type: ignore[explicit-any]
         k: v
         for k, v in request.POST.items()
         if k not in ["csrfmiddlewaretoken", "event"]
     }
+    job = None
     if event:
         form = forms.get_form_for_event(event)(arguments)
         if form.is_valid():
-            ci.send_event(event, form.cleaned_data)
+            cleaned_data = form.cleaned_data
+            job = jobs.submit(
+                f"Transition {event}",
+                request.user.username,
+                lambda _: ci.send_event(event, cleaned_data),
+            )
         else:
             raise ValueError(f"Invalid form: {form.errors}")
 
@@ -60,7 +71,7 @@ def state_machine(request: HttpRequest) -> HttpResponse:
 
     return render(
         request=request,
-        context=dict(table=table, flowchart=flowchart),
+        context=dict(table=table, flowchart=flowchart, job=job),
         template_name="controller/partials/state_machine.html",
     )
 
@@ -89,7 +100,7 @@ def app_tree_view_summary(request: HttpRequest) -> HttpResponse:
     """Renders the app tree view summary."""
     return render(
         request=request,
-        context=dict(tree=app_tree.get_app_tree(request.user.username)),
+        context=dict(tree=app_tree.get_app_tree_snapshot(request.user.username).tree),
         template_name="controller/partials/app_tree_summary_partial.html",
     )
 
@@ -97,7 +108,8 @@ def app_tree_view_summary(request: HttpRequest) -> HttpResponse:
 @login_required
 def app_tree_view_table(request: HttpRequest) -> HttpResponse:
     """View that renders the app tree view table."""
-    table = tables.AppTreeTable(app_tree.get_app_tree(request.user.username).to_list())
+    snapshot = app_tree.get_app_tree_snapshot(request.user.username)
+    table = tables.AppTreeTable(snapshot.rows)
     return render(
         request=request,
         context=dict(table=table),
@@ -159,16 +159,45 @@ INSTALLED_APPS += ["django_bootstrap5"]
 DJANGO_TABLES2_TEMPLATE = "django_tables2/bootstrap5.html"
 
 PROCESS_MANAGER_URL = os.getenv("PROCESS_MANAGER_URL", "localhost:10054")
+# Time in seconds during which the list of processes retrieved from the process
+# manager is reused between requests. Set to 0 to disable caching.
+PROCESS_MANAGER_SNAPSHOT_TTL = float(os.getenv("PROCESS_MANAGER_SNAPSHOT_TTL", 1))
+# Push changes in the process table to the browser as server-sent events instead of
+# polling for the whole table. Requires serving the app via ASGI.
+PROCESS_TABLE_PUSH = os.getenv("PROCESS_TABLE_PUSH", "false").lower() == "true"
+# Number of rows of the process table rendered at once, more rows being loaded as the
+# user scrolls down.
+PROCESS_TABLE_PAGE_SIZE = int(os.getenv("PROCESS_TABLE_PAGE_SIZE", 200))
+# Maximum number of processes restarted at the same time.
+PROCESS_RESTART_CONCURRENCY = int(os.getenv("PROCESS_RESTART_CONCURRENCY", 10))
+# Number of processes acted on at once by bulk actions, progress being reported after
+# each chunk.
+PROCESS_ACTION_CHUNK_SIZE = int(os.getenv("PROCESS_ACTION_CHUNK_SIZE", 100))
+# Number of lines of a process log displayed at once, and maximum number of lines that
+# can be requested from the process manager.
+PROCESS_LOG_LINES = int(os.getenv("PROCESS_LOG_LINES", 100))
+PROCESS_LOG_MAX_LINES = int(os.getenv("PROCESS_LOG_MAX_LINES", 10000))
 SESSION_MANAGER_URL = os.getenv("SESSION_MANAGER_URL", "localhost:50000")
 CSC_URL = os.getenv("CSC_URL", "drunc_pm:5000")
 CSC_SESSION = os.getenv("CSC_SESSION", "local-1x1-config")
 CSC_SESSION_NAME = os.getenv("CSC_SESSION_NAME", CSC_SESSION)
+# Time in seconds during which the application tree is reused between requests.
+APP_TREE_SNAPSHOT_TTL = float(os.getenv("APP_TREE_SNAPSHOT_TTL", 5))
 
 INSTALLED_APPS += ["crispy_forms", "crispy_bootstrap5"]
 CRISPY_ALLOWED_TEMPLATE_PACKS = "bootstrap5"
 CRISPY_TEMPLATE_PACK = "bootstrap5"
 
+# Number of threads running long operations (e.g. FSM transitions) in the background.
+# Set to 0 to run them within the request instead.
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", 4))
+# Time in seconds after which finished jobs are deleted from the database.
+JOB_EXPIRE_SECS = float(os.getenv("JOB_EXPIRE_SECS", 86400))
+
 KAFKA_ADDRESS = os.getenv("KAFKA_ADDRESS", "kafka:9092")
+# Kafka consumer group of the Kafka consumer, sharing the partitions between instances
+# and keeping the offsets of the messages stored. Set to an empty string for none.
+KAFKA_GROUP_ID = os.getenv("KAFKA_GROUP_ID", "drunc-ui")
 
 KAFKA_TOPIC_REGEX = {
     # PROCMAN matches topics of the form "control.<session>.process_manager".
@@ -178,5 +207,30 @@ KAFKA_TOPIC_REGEX = {
 }
 
 MESSAGE_EXPIRE_SECS = float(os.getenv("MESSAGE_EXPIRE_SECS", 1800))
+# Time in seconds between purges of the expired messages by the Kafka consumer, and
+# number of consecutive message ids deleted at once, each in its own transaction.
+MESSAGE_PURGE_INTERVAL = float(os.getenv("MESSAGE_PURGE_INTERVAL", 60))
+MESSAGE_PURGE_CHUNK_SIZE = int(os.getenv("MESSAGE_PURGE_CHUNK_SIZE", 1000))
+# Time window in seconds by severity within which identical messages received are
+# stored as one, counting them. Messages of severities not listed, or with a window of
+# 0, are always stored.
+MESSAGE_COALESCE_SECS = {
+    "DEBUG": float(os.getenv("MESSAGE_COALESCE_SECS_DEBUG", 10)),
+    "INFO": float(os.getenv("MESSAGE_COALESCE_SECS_INFO", 10)),
+    "WARNING": float(os.getenv("MESSAGE_COALESCE_SECS_WARNING", 10)),
+    "ERROR": float(os.getenv("MESSAGE_COALESCE_SECS_ERROR", 10)),
+    "FATAL": float(os.getenv("MESSAGE_COALESCE_SECS_FATAL", 0)),
+}
+# Number of most recent messages of each topic group kept in the Django cache by the
+# Kafka consumer, for the feeds to be served from without querying the database.
+# Requires a cache backend shared between processes. Set to 0 to disable.
+MESSAGE_LIVE_BUFFER_SIZE = int(os.getenv("MESSAGE_LIVE_BUFFER_SIZE", 0))
+# Number of messages rendered at once in the message feeds.
+MESSAGE_PAGE_SIZE = int(os.getenv("MESSAGE_PAGE_SIZE", 100))
+# Search messages by words using the full-text search index of the database, rather
+# than by substring.
+MESSAGE_FULL_TEXT_SEARCH = (
+    os.getenv("MESSAGE_FULL_TEXT_SEARCH", "true").lower() == "true"
+)
 
 django_stubs_ext.monkeypatch()
@@ -0,0 +1,183 @@
+"""Time-limited caching of the snapshots retrieved from the drunc endpoints."""
+
+import logging
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Generic, TypeVar
+
+from django.conf import settings
+from django.core.cache import cache
+
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
+
+STATS_INTERVAL = 60.0
+"""Minimum time in seconds between logs of the hit and miss counters of a cache."""
+
+
+@dataclass
+class _Entry(Generic[T]):
+    """A cached snapshot and the (wall clock) time at which it expires."""
+
+    value: T
+    expires: float
+
+
+@dataclass
+class _KeyLock:
+    """The lock serialising the refreshes of a key, and the threads using it."""
+
+    lock: threading.Lock = field(default_factory=threading.Lock)
+    users: int = 0
+
+
+class SnapshotCache(Generic[T]):
+    """Cache of snapshots shared between requests for a limited time.
+
+    Snapshots are kept both in process memory and in the Django cache backend, so they
+    are shared between the threads of a worker and, if the backend supports it, between
+    workers. Within a process only one refresh per key is in flight at any time:
+    requests arriving while a snapshot is being refreshed wait for it and reuse the
+    result instead of issuing their own call.
+
+    The lifetime of the snapshots is read from the setting named by `ttl_setting`. A
+    lifetime of zero or less disables caching. Expired snapshots are dropped from
+    process memory on the next request, and at most `max_entries` snapshots are kept
+    there, the least recently used ones being dropped first.
+
+    The number of hits and misses since the cache was created is logged at most every
+    `STATS_INTERVAL` seconds, at INFO level.
+    """
+
+    def __init__(self, name: str, ttl_setting: str, max_entries: int = 64) -> None:
+        """Create a new, empty cache.
+
+        Args:
+            name: Name of the cache, used as prefix for the Django cache keys.
+            ttl_setting: Name of the setting holding the snapshot lifetime in seconds.
+            max_entries: Maximum number of snapshots kept in process memory.
+        """
+        self.name = name
+        self.ttl_setting = ttl_setting
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: dict[str, _Entry[T]] = {}
+        self._key_locks: dict[str, _KeyLock] = {}
+        self._lock = threading.Lock()
+        self._stats_logged = time.monotonic()
+
+    @property
+    def ttl(self) -> float:
+        """Lifetime of the snapshots in seconds."""
+        return float(getattr(settings, self.ttl_setting))
+
+    def get(self, fetch: Callable[[], T], key: str = "") -> T:
+        """Get a snapshot, refreshing it with `fetch` if missing or expired.
+
+        Args:
+            fetch: Function retrieving a fresh snapshot.
+            key: Identifies the snapshot within the cache.
+
+        Returns:
+            The cached or freshly retrieved snapshot.
+        """
+        ttl = self.ttl
+        if ttl <= 0:
+            self._count(hit=False)
+            return fetch()
+
+        with self._key_lock(key):
+            entry = self._entries.get(key)
+            if entry is None or entry.expires <= time.time():
+                entry = cache.get(self._cache_key(key))
+
+            if entry is not None and entry.expires > time.time():
+                self._count(hit=True)
+            else:
+                self._count(hit=False)
+                entry = _Entry(fetch(), time.time() + ttl)
+                cache.set(self._cache_key(key), entry, ttl)
+
+            with self._lock:
+                # Move the key to the end, as the most recently used
+                self._entries.pop(key, None)
+                self._entries[key] = entry
+                self._prune()
+            return entry.value
+
+    def invalidate(self, key: str | None = None) -> None:
+        """Discard a cached snapshot so the next request retrieves a fresh one.
+
+        Args:
+            key: Snapshot to discard. If None, all the snapshots are discarded.
+        """
+        with self._lock:
+            keys = list(self._entries) if key is None else [key]
+            for k in keys:
+                self._entries.pop(k, None)
+        cache.delete_many([self._cache_key(k) for k in keys])
+
+    def clear(self) -> None:
+        """Discard all snapshots and reset the hit and miss counters."""
+        self.invalidate()
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict[str, int]:
+        """Get the number of cache hits and misses since the cache was created."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
+
+    def _cache_key(self, key: str) -> str:
+        return f"drunc_ui:{self.name}:{key}"
+
+    def _prune(self) -> None:
+        """Drop the expired and least recently used snapshots, and their locks.
+
+        Must be called with `_lock` held. The locks of keys being refreshed, or waited
+        for, are in use, so are kept.
+        """
+        now = time.time()
+        for key in [k for k, entry in self._entries.items() if entry.expires <= now]:
+            del self._entries[key]
+        while len(self._entries) > self.max_entries:
+            del self._entries[next(iter(self._entries))]
+        for key, key_lock in list(self._key_locks.items()):
+            if key not in self._entries and not key_lock.users:
+                del self._key_locks[key]
+
+    @contextmanager
+    def _key_lock(self, key: str) -> Iterator[None]:
+        """Hold the lock of a key, kept until all the threads using it are done.
+
+        Args:
+            key: Identifies the snapshot being refreshed.
+        """
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, _KeyLock())
+            key_lock.users += 1
+        try:
+            with key_lock.lock:
+                yield
+        finally:
+            with self._lock:
+                key_lock.users -= 1
+
+    def _count(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+            now = time.monotonic()
+            if now - self._stats_logged < STATS_INTERVAL:
+                return
+            self._stats_logged = now
+            hits, misses = self.hits, self.misses
+        logger.info(f"Snapshot cache {self.name}: {hits} hits, {misses} misses.")
@@ -1,7 +1,9 @@
 """Module providing functions to interact with the drunc controller."""
 
-import functools
-from typing import Any
+import logging
+import threading
+from collections.abc import Callable
+from typing import Any, TypeVar
 
 from django.conf import settings
 from drunc.connectivity_service.client import ConnectivityServiceClient
@@ -20,8 +22,11 @@ MSG_TYPE = {
 }
 """Mapping of argument types to their protobuf message types."""
 
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
+
 
-@functools.cache
 def get_controller_uri() -> str:
     """Find where the root controller is running via the connectivity service.
 
@@ -38,16 +43,93 @@ def get_controller_uri() -> str:
     return uris[0]["uri"].removeprefix("grpc://")
 
 
+class ControllerConnection:
+    """Connection to the root controller, shared between requests.
+
+    The root controller is located via the connectivity service on first use and the
+    driver connected to it is kept, so its gRPC channel is reused by later requests.
+    When a call fails the driver is discarded, so the next call locates the root
+    controller again and reconnects, in case it has moved or been restarted.
+    """
+
+    def __init__(self) -> None:
+        """Create a new connection, established on first use."""
+        self._lock = threading.Lock()
+        self._driver: ControllerDriver | None = None
+        self.uri = ""
+        """The URI of the root controller, or empty if not connected yet."""
+        self.generation = 0
+        """Number of times the connection has been reset."""
+        self.fsm_arguments: dict[str, list[Argument]] = {}
+        """The arguments of the FSM events described by the root controller so far."""
+
+    @property
+    def driver(self) -> ControllerDriver:
+        """The driver connected to the root controller."""
+        with self._lock:
+            if self._driver is None:
+                self.uri = get_controller_uri()
+                token = create_dummy_token_from_uname()
+                self._driver = ControllerDriver(self.uri, token=token)
+            return self._driver
+
+    def reset(self) -> None:
+        """Discard the current driver and FSM schema, reconnecting when next needed."""
+        with self._lock:
+            self._driver = None
+            self.uri = ""
+            self.generation += 1
+            self.fsm_arguments = {}
+
+
+_connection = ControllerConnection()
+
+
 def get_controller_driver() -> ControllerDriver:
-    """Get a ControllerDriver instance."""
-    uri = get_controller_uri()
-    token = create_dummy_token_from_uname()
-    return ControllerDriver(uri, token=token)
+    """Get the ControllerDriver instance connected to the root controller."""
+    return _connection.driver
+
+
+def reset_controller_connection() -> None:
+    """Discard the connection to the root controller, reconnecting when next needed."""
+    _connection.reset()
+
+
+def get_fsm_schema_key() -> tuple[str, str, int]:
+    """Get a key identifying the FSM schema currently provided by `get_arguments`.
+
+    The key changes whenever the connection to the root controller is reset, as the
+    schema might have changed, e.g. if the root controller was restarted.
+
+    Returns:
+        The URI of the root controller (empty if not connected yet), the session and the
+        number of times the connection has been reset.
+    """
+    return _connection.uri, settings.CSC_SESSION, _connection.generation
+
+
+def _query(request: Callable[[ControllerDriver], T]) -> T:
+    """Query the controller, reconnecting and retrying once if the query fails.
+
+    Only use it for requests without side effects, which are safe to repeat.
+
+    Args:
+        request: Function making the request with the driver provided.
+
+    Returns:
+        The response to the request.
+    """
+    try:
+        return request(get_controller_driver())
+    except Exception:
+        logger.warning("Request to the root controller failed, reconnecting.")
+        reset_controller_connection()
+        return request(get_controller_driver())
 
 
 def get_controller_status() -> Status:
     """Get the controller status."""
-    return get_controller_driver().status()
+    return _query(lambda controller: controller.status())
 
 
 def get_fsm_state() -> str:
@@ -72,12 +154,18 @@ def send_event(  # type: ignore[explicit-any]
     Raises:
         RuntimeError: If the event failed, reporting the flag.
     """
-    controller = get_controller_driver()
-    controller.take_control()
     command = FSMCommand(
         command_name=event, arguments=process_arguments(event, arguments)
     )
-    response = controller.execute_fsm_command(arguments=command)
+    controller = get_controller_driver()
+    try:
+        controller.take_control()
+        response = controller.execute_fsm_command(arguments=command)
+    except Exception:
+        # Not retried, as the event might have been executed already.
+        reset_controller_connection()
+        raise
+
     if response.flag != FSMResponseFlag.FSM_EXECUTED_SUCCESSFULLY:
         raise RuntimeError(
             f"Event '{event}' failed with flag "
@@ -89,22 +177,26 @@ def send_event(  # type: ignore[explicit-any]
 def get_arguments(event: str) -> list[Argument]:
     """Get the arguments required to run an event.
 
+    The FSM description is only requested from the root controller for events not
+    described yet since the last time the connection was reset, as it does not change
+    while the root controller is running.
+
     Args:
         event: The event to get the arguments for.
 
     Returns:
         The arguments for the event.
     """
-    controller = get_controller_driver()
-    events = controller.describe_fsm().data.commands
-    try:
-        command = next(c for c in events if c.name == event)
-    except StopIteration:
-        raise ValueError(
-            f"Event '{event}' not found in FSM. Valid events are: "
-            f"{', '.join(c.name for c in events)}"
-        )
-    return command.arguments
+    if event not in _connection.fsm_arguments:
+        events = _query(lambda controller: controller.describe_fsm()).data.commands
+        _connection.fsm_arguments.update({c.name: c.arguments for c in events})
+        if event not in _connection.fsm_arguments:
+            raise ValueError(
+                f"Event '{event}' not found in FSM. Valid events are: "
+                f"{', '.join(c.name for c in events)}"
+            )
+
+    return _connection.fsm_arguments[event]
 
 
 def process_arguments(  # type: ignore[explicit-any]
@@ -139,7 +231,7 @@ def get_detectors(description: Description | None = None) -> dict[str, str]:
     """
     detectors = {}
     if description is None:
-        description = get_controller_driver().describe()
+        description = _query(lambda controller: controller.describe())
 
     if hasattr(description.data, "info"):  # type: ignore [union-attr]
         detectors[description.data.name] = description.data.info  # type: ignore [union-attr]
@@ -0,0 +1,60 @@
+"""Long-lived event loop running the asynchronous calls to the drunc endpoints.
+
+Creating a new event loop for each call (e.g. with `asyncio.run`) also means creating
+new gRPC channels each time, as they are bound to the loop they are created in. Instead,
+all asynchronous calls are run in a single event loop living in a background thread,
+so the gRPC channels created within it can be reused between requests.
+"""
+
+import asyncio
+import os
+import threading
+from collections.abc import Coroutine
+from typing import TypeVar
+
+T = TypeVar("T")
+
+
+class _EventLoopThread:
+    """An event loop running forever in a daemon thread."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._pid = 0
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """The event loop, started on first use.
+
+        The loop is restarted if the process has been forked since, as threads do not
+        survive forking (e.g. when the server workers are forked from a parent).
+        """
+        with self._lock:
+            if self._loop is None or self._loop.is_closed() or self._pid != os.getpid():
+                self._loop = asyncio.new_event_loop()
+                self._pid = os.getpid()
+                threading.Thread(
+                    target=self._loop.run_forever, name="drunc-event-loop", daemon=True
+                ).start()
+            return self._loop
+
+
+_event_loop = _EventLoopThread()
+
+
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    """Get the background event loop, starting it if needed."""
+    return _event_loop.loop
+
+
+def run(coroutine: Coroutine[object, object, T]) -> T:
+    """Run a coroutine in the background event loop and wait for its result.
+
+    Args:
+        coroutine: The coroutine to run.
+
+    Returns:
+        The value returned by the coroutine.
+    """
+    return asyncio.run_coroutine_threadsafe(coroutine, get_event_loop()).result()
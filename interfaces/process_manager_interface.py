@@ -1,8 +1,19 @@
 """Module providing functions to interact with the drunc process manager."""
 
 import asyncio
-from collections.abc import Iterable
+import logging
+import os
+import re
+import uuid
+from collections.abc import (
+    AsyncGenerator,
+    AsyncIterator,
+    Coroutine,
+    Iterable,
+    Iterator,
+)
 from enum import Enum
+from typing import TypeVar
 
 from django.conf import settings
 from drunc.process_manager.process_manager_driver import ProcessManagerDriver
@@ -15,24 +26,158 @@ from druncschema.process_manager_pb2 import (
 )
 from druncschema.token_pb2 import Token
 
+from . import event_loop
+from .caching import SnapshotCache
+
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
+
+session_info_cache: SnapshotCache[ProcessInstanceList] = SnapshotCache(
+    "session_info", "PROCESS_MANAGER_SNAPSHOT_TTL"
+)
+"""Snapshot of the processes reported by the process manager, shared by all users."""
+
+
+_drivers: dict[str, ProcessManagerDriver] = {}
+"""Pool of drivers, one per user, with open channels to the process manager."""
+
+# The channels of the drivers are bound to the event loop of the parent process, which
+# does not run in a forked child, so the child starts with an empty pool
+os.register_at_fork(after_in_child=_drivers.clear)
+
 
 def get_process_manager_driver(username: str) -> ProcessManagerDriver:
-    """Get a ProcessManagerDriver instance."""
-    token = Token(token=f"{username}-token", user_name=username)
-    return ProcessManagerDriver(
-        settings.PROCESS_MANAGER_URL, token=token, aio_channel=True
-    )
+    """Get the ProcessManagerDriver instance for the given user.
+
+    Drivers are created on first use and then kept in a pool, so their gRPC channel
+    (and the underlying connection) is reused by later requests of the same user. As
+    the channels are bound to the event loop they are created in, this must be called
+    from coroutines running in the background event loop.
+
+    Args:
+        username: Username of the user the driver acts on behalf of.
+
+    Returns:
+        The driver for the user.
+    """
+    if (driver := _drivers.get(username)) is None:
+        token = Token(token=f"{username}-token", user_name=username)
+        driver = ProcessManagerDriver(
+            settings.PROCESS_MANAGER_URL, token=token, aio_channel=True
+        )
+        _drivers[username] = driver
+    return driver
 
 
-async def _get_session_info(username: str) -> ProcessInstanceList:
+async def _close_channels(drivers: Iterable[ProcessManagerDriver]) -> None:
+    for driver in drivers:
+        await driver.channel.close()
+
+
+def discard_process_manager_drivers(username: str | None = None) -> None:
+    """Remove drivers from the pool, so new ones are created when next needed.
+
+    The gRPC channels of the drivers removed are closed, so their connections are not
+    left open until they are garbage collected.
+
+    Args:
+        username: The user whose driver to discard. If None, all drivers are discarded.
+    """
+    if username is None:
+        drivers = list(_drivers.values())
+        _drivers.clear()
+    else:
+        drivers = [driver] if (driver := _drivers.pop(username, None)) else []
+    if not drivers:
+        return
+    try:
+        event_loop.run(_close_channels(drivers))
+    except Exception:
+        logger.warning("Failed to close process manager channels", exc_info=True)
+
+
+def _run(username: str, coroutine: Coroutine[object, object, T]) -> T:
+    """Run a coroutine calling the process manager in the background event loop.
+
+    If the call fails, the user's driver is discarded in case its channel is broken.
+
+    Args:
+        username: Username of the user the call is made on behalf of.
+        coroutine: The coroutine to run.
+
+    Returns:
+        The value returned by the coroutine.
+    """
+    try:
+        return event_loop.run(coroutine)
+    except Exception:
+        discard_process_manager_drivers(username)
+        raise
+
+
+async def _get_session_info(
+    username: str, query: ProcessQuery | None = None
+) -> ProcessInstanceList:
     pmd = get_process_manager_driver(username)
-    query = ProcessQuery(names=[".*"])
-    return await pmd.ps(query)
+    return await pmd.ps(query or ProcessQuery(names=[".*"]))
+
+
+def get_session_info(
+    username: str, query: ProcessQuery | None = None
+) -> ProcessInstanceList:
+    """Get info about all sessions from process manager.
+
+    The information is cached for `PROCESS_MANAGER_SNAPSHOT_TTL` seconds and shared
+    between all users, as the query covers every process regardless of who asks.
+
+    Args:
+        username: Username of the user requesting the information.
+        query: Query selecting the processes, or None for all of them. The processes
+            selected by each query are cached separately.
+
+    Returns:
+        The processes known to the process manager.
+    """
+    if query is None:
+        return session_info_cache.get(
+            lambda: _run(username, _get_session_info(username))
+        )
+    return session_info_cache.get(
+        lambda: _run(username, _get_session_info(username, query)),
+        key=query.SerializeToString(deterministic=True).hex(),
+    )
 
 
-def get_session_info(username: str) -> ProcessInstanceList:
-    """Get info about all sessions from process manager."""
-    return asyncio.run(_get_session_info(username))
+def process_query(column: str, search: str) -> ProcessQuery | None:
+    """Translate a search of the process table into a query for the process manager.
+
+    Only the searches for a single term (see `process_manager.snapshot` for the search
+    syntax) that the process manager runs like the table are translated: a
+    case-insensitive substring of the process names (as a regular expression) or a
+    complete UUID. The process manager only selects sessions and users by their exact
+    name, so searching them by substring requires all the processes.
+
+    Args:
+        column: The column of the process table searched, or an empty string for all.
+        search: The search string, as typed by the user.
+
+    Returns:
+        The query, or None if the search can not be run by the process manager.
+    """
+    terms = search.split()
+    if len(terms) != 1 or ":" in search or search.startswith("/"):
+        # Several terms, columns and regular expressions are only searched locally.
+        return None
+    search = terms[0]
+    if column == "name":
+        return ProcessQuery(names=[f"(?i){re.escape(search)}"])
+    if column == "uuid":
+        try:
+            return ProcessQuery(uuids=[ProcessUUID(uuid=str(uuid.UUID(search)))])
+        except ValueError:
+            return None
+    return None
 
 
 class ProcessAction(Enum):
@@ -43,60 +188,156 @@ class ProcessAction(Enum):
     FLUSH = "flush"
 
 
-async def _process_call(
-    uuids: Iterable[str], action: ProcessAction, username: str
+ProcessCallResults = dict[str, BaseException | None]
+"""Outcome of an action for each process, by UUID: the error raised, or None."""
+
+
+async def _restart_process(
+    pmd: ProcessManagerDriver, uuid: ProcessUUID, semaphore: asyncio.Semaphore
 ) -> None:
+    async with semaphore:
+        await pmd.restart(ProcessQuery(uuids=[uuid]))
+
+
+async def _process_call(
+    uuids: list[str], action: ProcessAction, username: str
+) -> ProcessCallResults:
     pmd = get_process_manager_driver(username)
     uuids_ = [ProcessUUID(uuid=u) for u in uuids]
 
     match action:
         case ProcessAction.RESTART:
-            for uuid_ in uuids_:
-                query = ProcessQuery(uuids=[uuid_])
-                await pmd.restart(query)
+            # Processes are restarted one by one by the process manager, so restart
+            # them concurrently, within limits so the process manager is not swamped.
+            semaphore = asyncio.Semaphore(settings.PROCESS_RESTART_CONCURRENCY)
+            errors = await asyncio.gather(
+                *(_restart_process(pmd, uuid_, semaphore) for uuid_ in uuids_),
+                return_exceptions=True,
+            )
+            return dict(zip(uuids, errors))
         case ProcessAction.KILL:
             query = ProcessQuery(uuids=uuids_)
             await pmd.kill(query)
         case ProcessAction.FLUSH:
             query = ProcessQuery(uuids=uuids_)
             await pmd.flush(query)
+    return dict.fromkeys(uuids)
 
 
-def process_call(uuids: Iterable[str], action: ProcessAction, username: str) -> None:
+def process_call(
+    uuids: Iterable[str], action: ProcessAction, username: str
+) -> ProcessCallResults:
     """Perform an action on a process with a given UUID.
 
+    Processes are restarted concurrently, up to `PROCESS_RESTART_CONCURRENCY` at a
+    time, and the failure to restart one of them does not prevent the others from being
+    restarted. Other actions are performed on all processes at once.
+
     Args:
         uuids: List of UUIDs of the process to be actioned.
         action: Action to be performed {restart,flush,kill}.
         username: Username of the user performing the action
+
+    Returns:
+        The outcome of the action for each process.
+    """
+    try:
+        return _run(username, _process_call(list(uuids), action, username))
+    finally:
+        session_info_cache.invalidate()
+
+
+STREAM_BATCH_SIZE = 100
+"""Number of streamed responses moved at once from the event loop to the caller."""
+
+
+async def _next_items(iterator: AsyncIterator[T]) -> list[T]:
+    items: list[T] = []
+    while len(items) < STREAM_BATCH_SIZE:
+        try:
+            items.append(await anext(iterator))
+        except StopAsyncIteration:
+            break
+    return items
+
+
+async def _close(iterator: AsyncIterator[T]) -> None:
+    if isinstance(iterator, AsyncGenerator):
+        await iterator.aclose()
+
+
+def _stream(
+    username: str, open_stream: Coroutine[object, object, AsyncIterator[T]]
+) -> Iterator[T]:
+    """Iterate over a stream of responses from the process manager.
+
+    The items are moved in small batches from the background event loop, as they are
+    received.
+
+    Args:
+        username: Username of the user the call is made on behalf of.
+        open_stream: Coroutine returning the asynchronous iterator over the responses.
+
+    Yields:
+        The responses.
     """
-    return asyncio.run(_process_call(uuids, action, username))
+    iterator = _run(username, open_stream)
+    try:
+        while items := _run(username, _next_items(iterator)):
+            yield from items
+    finally:
+        _run(username, _close(iterator))
 
 
-async def _get_process_logs(uuid: str, username: str) -> list[DecodedResponse]:
+async def _open_process_logs(
+    uuid: str, username: str, how_far: int
+) -> AsyncIterator[DecodedResponse]:
     pmd = get_process_manager_driver(username)
     query = ProcessQuery(uuids=[ProcessUUID(uuid=uuid)])
-    request = LogRequest(query=query, how_far=100)
-    return [item async for item in pmd.logs(request)]
+    return aiter(pmd.logs(LogRequest(query=query, how_far=how_far)))
 
 
-def get_process_logs(uuid: str, username: str) -> list[DecodedResponse]:
-    """Retrieve logs for a process from the process manager.
+def stream_process_logs(uuid: str, username: str, how_far: int) -> Iterator[str]:
+    """Stream the log lines of a process as they are received from the process manager.
+
+    Lines are handed over in small batches as they arrive rather than collected all
+    together first.
 
     Args:
       uuid: UUID of the process.
       username: Username of the user requesting the logs
+      how_far: Number of lines to retrieve from the end of the log.
 
-    Returns:
-      The process logs.
+    Yields:
+      The lines of the log, oldest first.
     """
-    return asyncio.run(_get_process_logs(uuid, username))
+    for item in _stream(username, _open_process_logs(uuid, username, how_far)):
+        yield item.data.line
 
 
-async def _boot_process(user: str, data: dict[str, str | int]) -> None:
+async def _open_boot_process(
+    user: str, data: dict[str, str | int]
+) -> AsyncIterator[DecodedResponse]:
     pmd = get_process_manager_driver(user)
-    async for item in pmd.dummy_boot(user="root", **data):
-        pass
+    return aiter(pmd.dummy_boot(user="root", **data))
+
+
+def stream_boot_process(
+    user: str, data: dict[str, str | int]
+) -> Iterator[DecodedResponse]:
+    """Boot a process with the given data, streaming the responses as they arrive.
+
+    Args:
+        user: the user to boot the process as.
+        data: the data for the process.
+
+    Yields:
+        The responses of the process manager.
+    """
+    try:
+        yield from _stream(user, _open_boot_process(user, data))
+    finally:
+        session_info_cache.invalidate()
 
 
 def boot_process(user: str, data: dict[str, str | int]) -> None:
@@ -106,7 +347,8 @@ def boot_process(user: str, data: dict[str, str | int]) -> None:
         user: the user to boot the process as.
         data: the data for the process.
     """
-    return asyncio.run(_boot_process(user, data))
+    for _ in stream_boot_process(user, data):
+        pass
 
 
 def get_hostnames(user: str) -> dict[str, str]:
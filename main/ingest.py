@@ -0,0 +1,294 @@
+"""Pipeline writing the messages consumed from Kafka to the database.
+
+Decoding and storing the messages within the loop polling Kafka means that any slow
+write to the database stalls the consumption of messages, and the lag grows. Instead,
+the polling thread hands the records over to a `MessageWriter` thread via a bounded
+queue, blocking only when the writer falls too far behind. The writer decodes the
+records, optionally on a pool of processes, and stores them in large batches, made of
+the records of all partitions received until the batch is full or the flush interval
+elapsed. The offsets of the records written are then reported back to the polling
+thread to be committed, so that messages are not lost if the consumer stops.
+
+As a misbehaving application can send the same message thousands of times per second,
+identical messages received within a time window of each other may be coalesced into a
+single row counting them, by a `MessageCoalescer`. Rows updated that way are given a
+new `revision`, so the feeds polling for changes pick up their count.
+"""
+
+import logging
+import queue
+import threading
+import time
+from collections.abc import Callable, Hashable, Iterable, Mapping, Sequence
+from concurrent.futures import Executor
+from datetime import datetime, timedelta
+from functools import partial
+from typing import Protocol
+
+from django.db import DatabaseError, connections, transaction
+
+from .models import DruncMessage
+
+logger = logging.getLogger(__name__)
+
+
+class KafkaRecord(Protocol):
+    """A record consumed from Kafka."""
+
+    @property
+    def offset(self) -> int:
+        """Position of the record in its partition."""
+
+
+Decoder = Callable[[KafkaRecord], DruncMessage]
+"""Function creating the message to store from a record."""
+
+
+def _decode_or_skip(decode: Decoder, record: KafkaRecord) -> DruncMessage | None:
+    """Decode a record, logging and skipping it if it is invalid."""
+    try:
+        return decode(record)
+    except Exception:
+        logger.exception(f"Failed to decode record: {record}")
+        return None
+
+
+class MessageCoalescer:
+    """Coalesces identical messages received within a time window of each other.
+
+    Messages are identical if they have the same topic, severity and text. The first
+    message received is stored, and the identical messages received within the window
+    for their severity after the last one counted are counted in it rather than stored,
+    so the window slides with each message. Once no identical message is received
+    within the window, it starts again from the next message received.
+    """
+
+    def __init__(self, windows: Mapping[str, float]) -> None:
+        """Create a coalescer, with no messages received yet.
+
+        Args:
+            windows: Time window in seconds by severity. Messages of severities not
+                listed or with a window of 0 are never coalesced.
+        """
+        self.windows = {
+            severity: timedelta(seconds=window)
+            for severity, window in windows.items()
+            if window > 0
+        }
+        self._recent: dict[tuple[str, str, str], tuple[datetime, DruncMessage]] = {}
+
+    def add(
+        self, messages: Iterable[DruncMessage]
+    ) -> tuple[list[DruncMessage], list[DruncMessage]]:
+        """Coalesce new messages with the messages received recently.
+
+        The messages to create must be saved before the next call, as messages
+        coalesced with them later are counted by updating them.
+
+        Args:
+            messages: The messages received, in order.
+
+        Returns:
+            The messages to create, and the previously created messages to update.
+        """
+        created: list[DruncMessage] = []
+        updated: dict[int, DruncMessage] = {}
+        latest: datetime | None = None
+        for message in messages:
+            latest = max(latest or message.timestamp, message.timestamp)
+            window = self.windows.get(message.severity)
+            if window is None:
+                created.append(message)
+                continue
+
+            key = (message.topic, message.severity, message.message)
+            recent = self._recent.get(key)
+            if recent is None or abs(message.timestamp - recent[0]) > window:
+                self._recent[key] = (message.timestamp, message)
+                created.append(message)
+                continue
+
+            last_seen, first = recent
+            first.count += 1
+            first.first_seen = min(first.first_seen or last_seen, message.timestamp)
+            first.timestamp = max(first.timestamp, message.timestamp)
+            self._recent[key] = (max(last_seen, message.timestamp), first)
+            if first.pk is not None:
+                updated[first.pk] = first
+
+        if latest is not None:
+            # Forget the messages whose window is over.
+            self._recent = {
+                key: (last_seen, message)
+                for key, (last_seen, message) in self._recent.items()
+                if latest - last_seen <= self.windows[message.severity]
+            }
+        return created, list(updated.values())
+
+
+class MessageWriter(threading.Thread):
+    """Thread decoding and storing the records consumed from Kafka in batches."""
+
+    max_pending = 10
+    """Number of record lists queued before blocking the polling thread."""
+
+    retry_delay = 1.0
+    """Time in seconds before trying again to write a batch that failed."""
+
+    def __init__(
+        self,
+        decode: Decoder,
+        batch_size: int,
+        flush_interval: float,
+        decode_pool: Executor | None = None,
+        after_write: Callable[[], object] | None = None,
+        coalesce_windows: Mapping[str, float] | None = None,
+        on_stored: Callable[[list[DruncMessage], list[DruncMessage]], object]
+        | None = None,
+    ) -> None:
+        """Create a writer, to be started.
+
+        Args:
+            decode: Function creating the message to store from a record. It must be
+                picklable if records are decoded on a pool of processes.
+            batch_size: Number of records stored at once, at most.
+            flush_interval: Time in seconds after which the records received are
+                stored, even if there are fewer than `batch_size`.
+            decode_pool: Pool to decode the records on, or None to decode them in the
+                writer thread.
+            after_write: Function called in the writer thread after each flush, even
+                if there was nothing to store, e.g. to purge expired messages.
+            coalesce_windows: Time window in seconds by severity within which identical
+                messages are coalesced, or None to store every message.
+            on_stored: Function called in the writer thread with the messages created
+                and the messages updated, once stored, e.g. to publish them.
+        """
+        super().__init__(name="message-writer", daemon=True)
+        self.decode = decode
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.decode_pool = decode_pool
+        self.after_write = after_write
+        self.on_stored = on_stored
+        self.coalescer = (
+            MessageCoalescer(coalesce_windows) if coalesce_windows else None
+        )
+        self._queue: queue.Queue[tuple[Hashable, Sequence[KafkaRecord]] | None] = (
+            queue.Queue(maxsize=self.max_pending)
+        )
+        self._lock = threading.Lock()
+        self._written: dict[Hashable, int] = {}
+
+    def put(self, partition: Hashable, records: Sequence[KafkaRecord]) -> None:
+        """Queue records for writing, waiting while the queue is full.
+
+        Args:
+            partition: The partition the records were consumed from.
+            records: The records, in order.
+
+        Raises:
+            RuntimeError: If the writer is no longer running.
+        """
+        while True:
+            if not self.is_alive():
+                raise RuntimeError("The message writer is not running.")
+            try:
+                self._queue.put((partition, records), timeout=self.flush_interval)
+                return
+            except queue.Full:
+                continue
+
+    def written(self) -> dict[Hashable, int]:
+        """Get the offsets to commit for the records written since the last call.
+
+        Returns:
+            The offset of the next record to consume, by partition.
+        """
+        with self._lock:
+            written, self._written = self._written, {}
+        return written
+
+    def stop(self) -> None:
+        """Write the records queued and stop the writer."""
+        if self.is_alive():
+            self._queue.put(None)
+            self.join()
+
+    def run(self) -> None:
+        """Store the records queued in batches, until stopped."""
+        try:
+            stopping = False
+            # Records of a partition left over from the previous batch, which was full
+            pending: tuple[Hashable, Sequence[KafkaRecord]] | None = None
+            while not stopping:
+                records: list[KafkaRecord] = []
+                offsets: dict[Hashable, int] = {}
+                deadline = time.monotonic() + self.flush_interval
+                while len(records) < self.batch_size:
+                    item: tuple[Hashable, Sequence[KafkaRecord]] | None
+                    if pending is not None:
+                        item, pending = pending, None
+                    else:
+                        try:
+                            item = self._queue.get(
+                                timeout=max(0.0, deadline - time.monotonic())
+                            )
+                        except queue.Empty:
+                            break
+                    if item is None:
+                        stopping = True
+                        break
+                    partition, partition_records = item
+                    room = self.batch_size - len(records)
+                    if len(partition_records) > room:
+                        pending = (partition, partition_records[room:])
+                        partition_records = partition_records[:room]
+                    records.extend(partition_records)
+                    offsets[partition] = partition_records[-1].offset + 1
+
+                if records:
+                    self._write(records)
+                    with self._lock:
+                        self._written.update(offsets)
+                if self.after_write is not None:
+                    try:
+                        self.after_write()
+                    except Exception:
+                        logger.exception("Failed to run the post-write task.")
+        finally:
+            connections.close_all()
+
+    def _write(self, records: list[KafkaRecord]) -> None:
+        """Decode and store records in a single transaction, until it succeeds."""
+        decode = partial(_decode_or_skip, self.decode)
+        decoded: Iterable[DruncMessage | None]
+        if self.decode_pool is None:
+            decoded = map(decode, records)
+        else:
+            decoded = self.decode_pool.map(decode, records, chunksize=500)
+        messages = [message for message in decoded if message is not None]
+        updated: list[DruncMessage] = []
+        if self.coalescer is not None:
+            messages, updated = self.coalescer.add(messages)
+
+        while True:
+            try:
+                with transaction.atomic():
+                    DruncMessage.objects.bulk_create(messages)
+                    if updated:
+                        revision = DruncMessage.objects.next_revision()
+                        for message in updated:
+                            message.revision = revision
+                    DruncMessage.objects.bulk_update(
+                        updated, ["count", "first_seen", "timestamp", "revision"]
+                    )
+                break
+            except DatabaseError:
+                logger.exception(f"Failed to store {len(messages)} messages.")
+                time.sleep(self.retry_delay)
+
+        if self.on_stored is not None:
+            try:
+                self.on_stored(messages, updated)
+            except Exception:
+                logger.exception("Failed to run the post-storage task.")
@@ -0,0 +1,171 @@
+"""Background jobs running long operations outside of the request/response cycle.
+
+Operations such as booting processes or FSM transitions can take tens of seconds. Rather
+than holding a server worker (and the user's browser) for that long, they are submitted
+as jobs, run by a pool of threads within the server process, and their progress and
+outcome are recorded in the database for the pages to poll.
+
+Jobs running in a server process are lost if it stops, so when the server starts (see
+`recover_jobs`, run by the `recover_jobs` management command) the unfinished jobs of the
+processes no longer running on its host are marked as failed.
+"""
+
+import logging
+import os
+import socket
+import threading
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.utils import timezone
+
+from .models import Job
+from .purge import purge_expired_jobs
+
+logger = logging.getLogger(__name__)
+
+JobFunction = Callable[[Job], None]
+"""Function performing the operation of a job, given the job to record progress in."""
+
+
+class _WorkerPool:
+    """Pool of threads running the jobs, started on first use."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._executor: ThreadPoolExecutor | None = None
+        self._pid = 0
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """The pool, restarted if the process has been forked since it was started."""
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                self._executor = ThreadPoolExecutor(
+                    max_workers=settings.JOB_WORKERS, thread_name_prefix="drunc-job"
+                )
+                self._pid = os.getpid()
+            return self._executor
+
+
+_workers = _WorkerPool()
+
+
+def _worker_id() -> str:
+    """Identify the current server process, as recorded in the jobs it runs."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _is_running(worker: str) -> bool:
+    """Check whether the server process running a job may still be running.
+
+    Args:
+        worker: The server process, as `<host>:<pid>`.
+
+    Returns:
+        False if the process is known to have stopped, i.e. it ran on this host and no
+        longer exists, or its process id is now the one of the current process.
+    """
+    host, _, pid = worker.rpartition(":")
+    if host != socket.gethostname():
+        return True
+    if not pid.isdigit() or int(pid) == os.getpid():
+        return False
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def fail_orphaned_jobs() -> int:
+    """Mark as failed the unfinished jobs whose server process has stopped.
+
+    Returns:
+        The number of jobs marked as failed.
+    """
+    orphaned = [
+        job.pk
+        for job in Job.objects.filter(finished__isnull=True).only("worker")
+        if not _is_running(job.worker)
+    ]
+    return Job.objects.filter(pk__in=orphaned).update(
+        status=Job.FAILED,
+        error="The server process running the job stopped.",
+        finished=timezone.now(),
+    )
+
+
+def recover_jobs() -> None:
+    """Clean up the jobs when the server starts.
+
+    The jobs of the server processes that stopped are marked as failed, and the expired
+    jobs deleted. Errors are logged rather than raised, so the server starts anyway,
+    e.g. before the database is migrated.
+    """
+    try:
+        if count := fail_orphaned_jobs():
+            logger.warning(f"Marked {count} job(s) of stopped processes as failed.")
+        purge_expired_jobs()
+    except Exception:
+        logger.exception("Failed to recover the jobs.")
+
+
+def submit(name: str, username: str, function: JobFunction) -> Job:
+    """Submit a job running an operation in the background.
+
+    The job starts once the current transaction, if any, is committed. If the
+    `JOB_WORKERS` setting is 0, the job is run straight away instead, before returning.
+
+    Args:
+        name: Description of the operation, displayed to the user.
+        username: Username of the user submitting the job.
+        function: Function performing the operation.
+
+    Returns:
+        The job, to be polled for its progress.
+    """
+    job = Job.objects.create(name=name, username=username, worker=_worker_id())
+    if settings.JOB_WORKERS > 0:
+        transaction.on_commit(
+            lambda: _workers.executor.submit(_run_in_worker, job.pk, function)
+        )
+    else:
+        run(job, function)
+    return job
+
+
+def run(job: Job, function: JobFunction) -> None:
+    """Run the operation of a job, recording its status.
+
+    Args:
+        job: The job to run.
+        function: Function performing the operation. Any exception raised marks the
+            job as failed.
+    """
+    job.status = Job.RUNNING
+    job.save(update_fields=["status"])
+    try:
+        function(job)
+    except Exception as e:
+        logger.exception(f"Job {job.pk} ({job.name}) failed.")
+        job.status = Job.FAILED
+        job.error = str(e) or type(e).__name__
+    else:
+        job.status = Job.SUCCEEDED
+    job.finished = timezone.now()
+    job.save(update_fields=["status", "error", "finished"])
+
+
+def _run_in_worker(job_id: int, function: JobFunction) -> None:
+    """Run a job in a worker thread, closing the thread's database connections after."""
+    try:
+        run(Job.objects.get(pk=job_id), function)
+    except Exception:
+        logger.exception(f"Failed to run job {job_id}.")
+    finally:
+        connections.close_all()
@@ -0,0 +1,156 @@
+"""Live tail of the most recent messages of each topic group, kept in the Django cache.
+
+Feeds are polled every second by every open page, mostly for the last few messages. So
+that these polls do not all query the database, the Kafka consumer also publishes the
+messages it stores to the Django cache, keeping the last `MESSAGE_LIVE_BUFFER_SIZE`
+messages of each topic group, and feeds are served from there when the messages they
+need are all in it. This requires a cache backend shared between the Kafka consumer
+and the web app, with an atomic `incr` (e.g. Redis or Memcached).
+
+Messages are published under consecutive sequence numbers, given by a counter
+incremented for each message published, and stored in a ring buffer of
+`MESSAGE_LIVE_BUFFER_SIZE` slots: each message overwrites the slot of the message
+published that many messages before it. The sequence number is stored with the message,
+so slots already overwritten by a later message are recognised when reading.
+"""
+
+from collections import defaultdict
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import DruncMessage
+from .search import full_text_search, message_matches
+
+FIELDS = (
+    "id",
+    "topic",
+    "topic_group",
+    "session",
+    "timestamp",
+    "first_seen",
+    "message",
+    "severity",
+    "count",
+    "revision",
+)
+"""Fields of the messages kept in the cache."""
+
+
+def _counter_key(group: str) -> str:
+    return f"drunc_ui:live:{group}"
+
+
+def _slot_key(group: str, slot: int) -> str:
+    return f"drunc_ui:live:{group}:{slot}"
+
+
+@dataclass(frozen=True)
+class LiveTail:
+    """The most recent messages of a topic group."""
+
+    messages: list[DruncMessage]
+    """The messages, most recent first."""
+
+    first_id: int
+    """Id from which all the messages of the group are in the tail: the smallest id of
+    the messages first published within the tail, as messages published again (when
+    counting more identical messages) keep their id."""
+
+    def filter(self, search: str = "", severity: str = "") -> list[DruncMessage]:
+        """Get the messages matching a search and severity.
+
+        Args:
+            search: The search string, as typed by the user.
+            severity: The severity of the messages, or an empty string for any.
+
+        Returns:
+            The matching messages, most recent first.
+        """
+        full_text = full_text_search(search)
+        return [
+            message
+            for message in self.messages
+            if (not severity or message.severity == severity)
+            and message_matches(message.message, search, full_text)
+        ]
+
+
+def publish_messages(
+    messages: Iterable[DruncMessage], updated: Iterable[DruncMessage] = ()
+) -> None:
+    """Add stored messages to the live tails of their topic groups.
+
+    Messages published again, e.g. when counting more identical messages, replace
+    their previous version.
+
+    Args:
+        messages: The messages created, saved in the database.
+        updated: The messages previously created and published, updated since.
+    """
+    size = settings.MESSAGE_LIVE_BUFFER_SIZE
+    entries: dict[str, list[dict[str, object]]] = defaultdict(list)
+    for new, group_messages in ((True, messages), (False, updated)):
+        for message in group_messages:
+            entries[message.topic_group].append(
+                {
+                    "message": {field: getattr(message, field) for field in FIELDS},
+                    "new": new,
+                }
+            )
+
+    for group, group_entries in entries.items():
+        cache.add(_counter_key(group), 0, timeout=None)
+        last = cache.incr(_counter_key(group), len(group_entries))
+        first = max(last - len(group_entries), last - size) + 1
+        # Only the last `size` entries fit in the ring buffer.
+        group_entries = group_entries[len(group_entries) - (last - first + 1) :]
+        cache.set_many(
+            {
+                _slot_key(group, sequence % size): entry | {"sequence": sequence}
+                for sequence, entry in enumerate(group_entries, start=first)
+            },
+            timeout=settings.MESSAGE_EXPIRE_SECS,
+        )
+
+
+def get_live_tail(group: str) -> LiveTail | None:
+    """Get the most recent messages of a topic group from the cache.
+
+    Args:
+        group: The topic group, e.g. `PROCMAN`.
+
+    Returns:
+        The messages, or None if the live tail is disabled or has no new messages.
+    """
+    size = settings.MESSAGE_LIVE_BUFFER_SIZE
+    last = cache.get(_counter_key(group)) if size > 0 else None
+    if not last:
+        return None
+
+    sequences = range(last, max(0, last - size), -1)
+    keys = {sequence: _slot_key(group, sequence % size) for sequence in sequences}
+    entries = cache.get_many(list(keys.values()))
+
+    # Only the latest entries up to the first one missing (expired, evicted or
+    # overwritten by a later message) are known to be complete.
+    messages: dict[int, DruncMessage] = {}
+    first_id: int | None = None
+    for sequence in sequences:
+        entry = entries.get(keys[sequence])
+        if entry is None or entry["sequence"] != sequence:
+            break
+        message = messages.setdefault(
+            entry["message"]["id"], DruncMessage(**entry["message"])
+        )
+        if entry["new"]:
+            first_id = message.pk if first_id is None else min(first_id, message.pk)
+    if first_id is None:
+        return None
+
+    return LiveTail(
+        sorted(messages.values(), key=lambda m: (m.timestamp, m.pk), reverse=True),
+        first_id,
+    )
@@ -1,17 +1,34 @@
 """Django management command to populate Kafka messages into application database."""
 
+import logging
+import multiprocessing
+import signal
+import sys
+import time
 from argparse import ArgumentParser
-from datetime import datetime, timedelta, timezone
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from functools import partial
+from multiprocessing.process import BaseProcess
 from typing import Any
 
 from django.conf import settings
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
 from druncschema.broadcast_pb2 import BroadcastMessage, BroadcastType
 from kafka import KafkaConsumer
+from kafka.errors import CommitFailedError
+from kafka.structs import OffsetAndMetadata
 
 from ers.issue_pb2 import IssueChain  # type: ignore [attr-defined]
 
+from ...ingest import MessageWriter
+from ...live import publish_messages
 from ...models import DruncMessage
+from ...purge import purge_expired_jobs, purge_expired_messages
+
+logger = logging.getLogger(__name__)
 
 BROADCAST_TYPE_SEVERITY = {
     BroadcastType.ACK: "DEBUG",
@@ -79,6 +96,37 @@ def from_ers_message(message: Any) -> DruncMessage:  # type: ignore [explicit-an
     )
 
 
+def decode_record(message: Any) -> DruncMessage:  # type: ignore [explicit-any]
+    """Process a Kafka message in the format used by its topic.
+
+    Args:
+        message: Message to be processed.
+
+    Return:
+        A DruncMessage object to be ingested by the database.
+    """
+    if message.topic.startswith("ers"):
+        return from_ers_message(message)
+    return from_kafka_message(message)
+
+
+def offset_to_commit(offset: int) -> OffsetAndMetadata:
+    """Create the offset to commit for a partition, with no metadata.
+
+    Versions of kafka-python from 2.1 add the epoch of the partition leader to the
+    offsets (-1 when unknown), which earlier versions do not accept.
+
+    Args:
+        offset: The offset of the next record to consume from the partition.
+
+    Returns:
+        The offset, with the fields of the installed version of kafka-python.
+    """
+    if "leader_epoch" in OffsetAndMetadata._fields:
+        return OffsetAndMetadata(offset, "", -1)
+    return OffsetAndMetadata(offset, "")
+
+
 class Command(BaseCommand):
     """Consumes messages from Kafka and stores them in the database."""
 
@@ -87,46 +135,191 @@ class Command(BaseCommand):
     def add_arguments(self, parser: ArgumentParser) -> None:
         """Add commandline options."""
         parser.add_argument("--debug", action="store_true")
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            help="Maximum number of messages stored in a single transaction.",
+        )
+        parser.add_argument(
+            "--flush-ms",
+            type=int,
+            default=200,
+            help="Time in ms after which messages received are stored.",
+        )
+        parser.add_argument(
+            "--decode-workers",
+            type=int,
+            default=0,
+            help="Number of processes decoding messages (0 to decode in the writer).",
+        )
+        parser.add_argument(
+            "--group-id",
+            default=settings.KAFKA_GROUP_ID,
+            help="Kafka consumer group sharing the partitions and committed offsets "
+            "(empty for none).",
+        )
+        parser.add_argument(
+            "--instances",
+            type=int,
+            default=1,
+            help="Number of consumer processes to run, restarted if they stop.",
+        )
 
     def handle(  # type: ignore[explicit-any]
         self,
         debug: bool = False,
+        batch_size: int = 5000,
+        flush_ms: int = 200,
+        decode_workers: int = 0,
+        group_id: str = "",
+        instances: int = 1,
         **kwargs: Any,
     ) -> None:
         """Command business logic."""
-        consumer = KafkaConsumer(bootstrap_servers=[settings.KAFKA_ADDRESS])
+        if instances > 1 and not group_id:
+            raise CommandError("Running several instances requires a group id.")
+
+        # Stop gracefully, storing the messages received, when asked to terminate. The
+        # handler is inherited by the consumers run in separate processes.
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+        consume = partial(
+            self.consume, debug, batch_size, flush_ms, decode_workers, group_id
+        )
+        if instances == 1:
+            consume(True)
+        else:
+            self.supervise(instances, consume)
+
+    def supervise(self, instances: int, consume: Callable[[bool], None]) -> None:
+        """Run consumers in separate processes, restarting them if they stop.
+
+        Args:
+            instances: Number of consumers.
+            consume: Function running a consumer, given whether it should purge the
+                expired messages. Only the first consumer does.
+        """
+        # Connections must not be shared with the forked processes.
+        connections.close_all()
+        context = multiprocessing.get_context("fork")
+        workers: list[BaseProcess | None] = [None] * instances
+        try:
+            while True:
+                for index, worker in enumerate(workers):
+                    if worker is not None and worker.is_alive():
+                        continue
+                    if worker is not None:
+                        self.stderr.write(
+                            f"Consumer {index} stopped with exit code "
+                            f"{worker.exitcode}, restarting it."
+                        )
+                    workers[index] = worker = context.Process(
+                        target=consume,
+                        name=f"kafka-consumer-{index}",
+                        args=(index == 0,),
+                    )
+                    worker.start()
+                time.sleep(1)
+        finally:
+            for worker in workers:
+                if worker is not None and worker.is_alive():
+                    worker.terminate()
+            for worker in workers:
+                if worker is not None:
+                    worker.join()
+
+    def consume(
+        self,
+        debug: bool,
+        batch_size: int,
+        flush_ms: int,
+        decode_workers: int,
+        group_id: str,
+        purge: bool,
+    ) -> None:
+        """Consume messages from Kafka and store them, until stopped.
+
+        Args:
+            debug: Whether to print the messages received.
+            batch_size: Maximum number of messages stored in a single transaction.
+            flush_ms: Time in ms after which messages received are stored.
+            decode_workers: Number of processes decoding messages.
+            group_id: Kafka consumer group, or an empty string for none.
+            purge: Whether to purge expired messages periodically.
+        """
+        consumer = KafkaConsumer(
+            bootstrap_servers=[settings.KAFKA_ADDRESS],
+            group_id=group_id or None,
+            enable_auto_commit=False,
+        )
         consumer.subscribe(pattern=f"({'|'.join(settings.KAFKA_TOPIC_REGEX.values())})")
         # TODO: determine why the below doesn't work
         # consumer.subscribe(pattern="control.no_session.process_manager")
 
-        self.stdout.write("Listening for messages from Kafka.")
-        while True:
-            for topic, messages in consumer.poll(timeout_ms=500).items():
-                message_records = []
-
-                process_message = (
-                    from_ers_message
-                    if topic.topic.startswith("ers")
-                    else from_kafka_message
+        next_purge = time.monotonic()
+
+        def purge_expired() -> None:
+            """Remove expired messages and jobs, at most once per interval."""
+            nonlocal next_purge
+            if time.monotonic() < next_purge:
+                return
+            stats = purge_expired_messages()
+            purge_expired_jobs()
+            next_purge = time.monotonic() + settings.MESSAGE_PURGE_INTERVAL
+            if debug:
+                self.stdout.write(
+                    f"Purged {stats.deleted} expired messages in {stats.duration:.3f}s."
                 )
 
-                for message in messages:
-                    if debug:
-                        self.stdout.write(f"Message received: {message}")
-                        self.stdout.flush()
+        def commit() -> None:
+            """Commit the offsets of the messages stored since the last commit.
 
-                    message_records.append(process_message(message))
+            Offsets of messages not stored yet are not committed, so that they are
+            consumed again if the consumer stops before storing them.
+            """
+            written = writer.written()
+            if not written or not group_id:
+                return
+            try:
+                consumer.commit(
+                    {
+                        partition: offset_to_commit(offset)
+                        for partition, offset in written.items()
+                    }
+                )
+            except CommitFailedError:
+                # The partitions were reassigned: their new consumer starts from the
+                # last offsets committed, so some messages may be stored twice.
+                logger.warning("Failed to commit offsets after a rebalance.")
 
-                if message_records:
-                    DruncMessage.objects.bulk_create(message_records)
+        decode_pool = ProcessPoolExecutor(decode_workers) if decode_workers else None
+        writer = MessageWriter(
+            decode_record,
+            batch_size,
+            flush_ms / 1e3,
+            decode_pool,
+            after_write=purge_expired if purge else None,
+            coalesce_windows=settings.MESSAGE_COALESCE_SECS,
+            on_stored=publish_messages if settings.MESSAGE_LIVE_BUFFER_SIZE else None,
+        )
+        writer.start()
 
-            # Remove expired messages from the database.
-            message_timeout = timedelta(seconds=settings.MESSAGE_EXPIRE_SECS)
-            expire_time = datetime.now(tz=timezone.utc) - message_timeout
-            query = DruncMessage.objects.filter(timestamp__lt=expire_time)
-            if query.count():
-                if debug:
-                    self.stdout.write(
-                        f"Deleting {query.count()} messages older than {expire_time}."
-                    )
-                query.delete()
+        self.stdout.write("Listening for messages from Kafka.")
+        try:
+            while True:
+                polled = consumer.poll(timeout_ms=flush_ms, max_records=batch_size)
+                for partition, messages in polled.items():
+                    if debug:
+                        for message in messages:
+                            self.stdout.write(f"Message received: {message}")
+                        self.stdout.flush()
+                    # Blocks while the writer is behind, holding off consumption.
+                    writer.put(partition, messages)
+                commit()
+        finally:
+            writer.stop()
+            commit()
+            consumer.close(autocommit=False)
+            if decode_pool is not None:
+                decode_pool.shutdown()
@@ -0,0 +1,17 @@
+"""Django management command to clean up the jobs before the server starts."""
+
+from typing import Any
+
+from django.core.management.base import BaseCommand
+
+from ...jobs import recover_jobs
+
+
+class Command(BaseCommand):
+    """Fail the jobs of the stopped server processes and delete the expired jobs."""
+
+    help = __doc__
+
+    def handle(self, *args: Any, **kwargs: Any) -> None:  # type: ignore[explicit-any]
+        """Command business logic."""
+        recover_jobs()
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0007_job'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='druncmessage',
+            index=models.Index(fields=['timestamp'], name='main_message_timestamp_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='druncmessage',
+            index=models.Index(fields=['topic', 'timestamp'], name='main_message_topic_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='druncmessage',
+            index=models.Index(fields=['severity', 'timestamp'], name='main_message_severity_idx'),
+        ),
+    ]
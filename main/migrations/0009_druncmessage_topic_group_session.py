@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0008_druncmessage_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='druncmessage',
+            name='session',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='druncmessage',
+            name='topic_group',
+            field=models.CharField(blank=True, max_length=32),
+        ),
+        migrations.AddIndex(
+            model_name='druncmessage',
+            index=models.Index(fields=['topic_group', 'timestamp'], name='main_message_group_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='druncmessage',
+            index=models.Index(fields=['session', 'timestamp'], name='main_message_session_idx'),
+        ),
+    ]
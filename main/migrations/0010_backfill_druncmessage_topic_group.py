@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:40
+
+import re
+
+from django.conf import settings
+from django.db import migrations
+
+
+def backfill_topic_group(apps, schema_editor):
+    """Classify the existing messages by topic, one topic at a time."""
+    DruncMessage = apps.get_model("main", "DruncMessage")
+    topics = DruncMessage.objects.values_list("topic", flat=True).distinct()
+    for topic in list(topics):
+        group = next(
+            (
+                name
+                for name, regex in settings.KAFKA_TOPIC_REGEX.items()
+                if re.search(regex, topic)
+            ),
+            "",
+        )
+        parts = topic.split(".")
+        DruncMessage.objects.filter(topic=topic).update(
+            topic_group=group, session=parts[1] if len(parts) > 1 else ""
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0009_druncmessage_topic_group_session'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_topic_group, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,94 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:41
+
+from django.db import migrations
+
+SQLITE_FORWARD = [
+    # External content table: only the index is stored, the text stays in the messages
+    """
+    CREATE VIRTUAL TABLE main_druncmessage_fts USING fts5(
+        message, content='main_druncmessage', content_rowid='id'
+    )
+    """,
+    """
+    CREATE TRIGGER main_druncmessage_fts_insert AFTER INSERT ON main_druncmessage
+    BEGIN
+        INSERT INTO main_druncmessage_fts(rowid, message)
+        VALUES (new.id, new.message);
+    END
+    """,
+    """
+    CREATE TRIGGER main_druncmessage_fts_delete AFTER DELETE ON main_druncmessage
+    BEGIN
+        INSERT INTO main_druncmessage_fts(main_druncmessage_fts, rowid, message)
+        VALUES ('delete', old.id, old.message);
+    END
+    """,
+    """
+    CREATE TRIGGER main_druncmessage_fts_update AFTER UPDATE OF message
+    ON main_druncmessage
+    BEGIN
+        INSERT INTO main_druncmessage_fts(main_druncmessage_fts, rowid, message)
+        VALUES ('delete', old.id, old.message);
+        INSERT INTO main_druncmessage_fts(rowid, message)
+        VALUES (new.id, new.message);
+    END
+    """,
+    "INSERT INTO main_druncmessage_fts(main_druncmessage_fts) VALUES ('rebuild')",
+]
+
+SQLITE_BACKWARD = [
+    "DROP TRIGGER IF EXISTS main_druncmessage_fts_update",
+    "DROP TRIGGER IF EXISTS main_druncmessage_fts_delete",
+    "DROP TRIGGER IF EXISTS main_druncmessage_fts_insert",
+    "DROP TABLE IF EXISTS main_druncmessage_fts",
+]
+
+POSTGRES_FORWARD = [
+    """
+    CREATE INDEX main_message_search_idx ON main_druncmessage
+    USING GIN (to_tsvector('simple', message))
+    """,
+]
+
+POSTGRES_BACKWARD = ["DROP INDEX IF EXISTS main_message_search_idx"]
+
+
+def _has_fts5(schema_editor):
+    """Whether the SQLite library was compiled with FTS5 support."""
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+        return bool(cursor.fetchone()[0])
+
+
+def _execute(schema_editor, statements):
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def create_search_index(apps, schema_editor):
+    """Create the full-text search index supported by the database, if any."""
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite" and _has_fts5(schema_editor):
+        _execute(schema_editor, SQLITE_FORWARD)
+    elif vendor == "postgresql":
+        _execute(schema_editor, POSTGRES_FORWARD)
+
+
+def drop_search_index(apps, schema_editor):
+    """Drop the full-text search index, if any."""
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        _execute(schema_editor, SQLITE_BACKWARD)
+    elif vendor == "postgresql":
+        _execute(schema_editor, POSTGRES_BACKWARD)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0010_backfill_druncmessage_topic_group'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
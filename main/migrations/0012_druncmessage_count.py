@@ -0,0 +1,75 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:47
+
+from django.db import migrations, models
+from django.db.models import F
+
+# Adding or removing the fields rebuilds the messages table on SQLite, dropping its triggers.
+SQLITE_TRIGGERS = [
+    """
+    CREATE TRIGGER IF NOT EXISTS main_druncmessage_fts_insert
+    AFTER INSERT ON main_druncmessage
+    BEGIN
+        INSERT INTO main_druncmessage_fts(rowid, message)
+        VALUES (new.id, new.message);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS main_druncmessage_fts_delete
+    AFTER DELETE ON main_druncmessage
+    BEGIN
+        INSERT INTO main_druncmessage_fts(main_druncmessage_fts, rowid, message)
+        VALUES ('delete', old.id, old.message);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS main_druncmessage_fts_update
+    AFTER UPDATE OF message ON main_druncmessage
+    BEGIN
+        INSERT INTO main_druncmessage_fts(main_druncmessage_fts, rowid, message)
+        VALUES ('delete', old.id, old.message);
+        INSERT INTO main_druncmessage_fts(rowid, message)
+        VALUES (new.id, new.message);
+    END
+    """,
+]
+
+
+def restore_search_triggers(apps, schema_editor):
+    """Recreate the triggers keeping the FTS5 table in sync, if it exists."""
+    connection = schema_editor.connection
+    if (
+        connection.vendor == "sqlite"
+        and "main_druncmessage_fts" in connection.introspection.table_names()
+    ):
+        for statement in SQLITE_TRIGGERS:
+            schema_editor.execute(statement)
+
+
+def set_first_seen(apps, schema_editor):
+    """Set the time existing messages were first received to their timestamp."""
+    DruncMessage = apps.get_model("main", "DruncMessage")
+    DruncMessage.objects.filter(first_seen=None).update(first_seen=F("timestamp"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0011_druncmessage_search'),
+    ]
+
+    operations = [
+        # Restores the triggers after removing the fields when migrating backwards
+        migrations.RunPython(migrations.RunPython.noop, restore_search_triggers),
+        migrations.AddField(
+            model_name='druncmessage',
+            name='count',
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.AddField(
+            model_name='druncmessage',
+            name='first_seen',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(restore_search_triggers, migrations.RunPython.noop),
+        migrations.RunPython(set_first_seen, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:30
+
+from django.db import migrations, models
+
+# Adding or removing the field rebuilds the messages table on SQLite, dropping its triggers.
+SQLITE_TRIGGERS = [
+    """
+    CREATE TRIGGER IF NOT EXISTS main_druncmessage_fts_insert
+    AFTER INSERT ON main_druncmessage
+    BEGIN
+        INSERT INTO main_druncmessage_fts(rowid, message)
+        VALUES (new.id, new.message);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS main_druncmessage_fts_delete
+    AFTER DELETE ON main_druncmessage
+    BEGIN
+        INSERT INTO main_druncmessage_fts(main_druncmessage_fts, rowid, message)
+        VALUES ('delete', old.id, old.message);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS main_druncmessage_fts_update
+    AFTER UPDATE OF message ON main_druncmessage
+    BEGIN
+        INSERT INTO main_druncmessage_fts(main_druncmessage_fts, rowid, message)
+        VALUES ('delete', old.id, old.message);
+        INSERT INTO main_druncmessage_fts(rowid, message)
+        VALUES (new.id, new.message);
+    END
+    """,
+]
+
+
+def restore_search_triggers(apps, schema_editor):
+    """Recreate the triggers keeping the FTS5 table in sync, if it exists."""
+    connection = schema_editor.connection
+    if (
+        connection.vendor == "sqlite"
+        and "main_druncmessage_fts" in connection.introspection.table_names()
+    ):
+        for statement in SQLITE_TRIGGERS:
+            schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0013_job_worker'),
+    ]
+
+    operations = [
+        # Restores the triggers after removing the field when migrating backwards
+        migrations.RunPython(migrations.RunPython.noop, restore_search_triggers),
+        migrations.AddField(
+            model_name='druncmessage',
+            name='revision',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.RunPython(restore_search_triggers, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='druncmessage',
+            index=models.Index(fields=['revision'], name='main_message_revision_idx'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:36
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def split_progress(apps, schema_editor):
+    """Record the progress of the existing jobs as one row per line."""
+    Job = apps.get_model("main", "Job")
+    JobProgress = apps.get_model("main", "JobProgress")
+    JobProgress.objects.bulk_create(
+        JobProgress(job=job, line=line)
+        for job in Job.objects.exclude(progress="").order_by("id")
+        for line in job.progress.splitlines()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0014_druncmessage_revision'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobProgress',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('line', models.TextField()),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='progress_lines', to='main.job')),
+            ],
+            options={
+                'ordering': ('id',),
+            },
+        ),
+        migrations.RunPython(split_progress, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='job',
+            name='progress',
+        ),
+    ]
@@ -1,7 +1,10 @@
 """Models module for the main app."""
 
-from typing import ClassVar
+import re
+from collections.abc import Collection, Iterable
+from typing import Any, ClassVar
 
+from django.conf import settings
 from django.contrib.auth.models import AbstractUser
 from django.db import models
 
@@ -18,8 +21,93 @@ class User(AbstractUser):
         ]
 
 
+def get_topic_group(topic: str) -> str:
+    """Get the group of a Kafka topic, as defined in the `KAFKA_TOPIC_REGEX` setting.
+
+    Args:
+        topic: The Kafka topic.
+
+    Returns:
+        The name of the first group whose regex matches the topic, or an empty string.
+
+    Example:
+        >>> get_topic_group("control.my_session.process_manager")
+        'PROCMAN'
+        >>> get_topic_group("unknown")
+        ''
+    """
+    for group, regex in settings.KAFKA_TOPIC_REGEX.items():
+        if re.search(regex, topic):
+            return group
+    return ""
+
+
+def get_topic_session(topic: str) -> str:
+    """Get the name of the session a Kafka topic is about.
+
+    Topics are of the form `<kind>.<session>.<...>`, e.g.
+    `control.<session>.process_manager`.
+
+    Args:
+        topic: The Kafka topic.
+
+    Returns:
+        The name of the session, or an empty string if the topic does not include one.
+
+    Example:
+        >>> get_topic_session("control.my_session.process_manager")
+        'my_session'
+    """
+    parts = topic.split(".")
+    return parts[1] if len(parts) > 1 else ""
+
+
+class DruncMessageQuerySet(models.QuerySet["DruncMessage"]):
+    """QuerySet for DruncMessage, classifying the messages by topic on creation."""
+
+    def bulk_create(
+        self,
+        objs: Iterable["DruncMessage"],
+        batch_size: int | None = None,
+        ignore_conflicts: bool = False,
+        update_conflicts: bool = False,
+        update_fields: Collection[str] | None = None,
+        unique_fields: Collection[str] | None = None,
+    ) -> list["DruncMessage"]:
+        """Classify the messages by topic and insert them into the database."""
+        objs = list(objs)
+        for obj in objs:
+            obj.classify()
+        return super().bulk_create(
+            objs,
+            batch_size=batch_size,
+            ignore_conflicts=ignore_conflicts,
+            update_conflicts=update_conflicts,
+            update_fields=update_fields,
+            unique_fields=unique_fields,
+        )
+
+    def next_revision(self) -> int:
+        """Get the revision to give the messages updated, after all the previous ones.
+
+        Must be called within the transaction updating the messages.
+        """
+        latest = self.aggregate(revision=models.Max("revision"))["revision"]
+        return (latest or 0) + 1
+
+
 class DruncMessage(models.Model):
-    """Model for drunc broadcast messages."""
+    """Model for drunc broadcast messages.
+
+    On creation, messages are classified into the topic groups defined in the
+    `KAFKA_TOPIC_REGEX` setting, so they can be filtered without matching the regexes
+    against every message when queried.
+
+    Identical messages received in quick succession may be stored as a single message,
+    with `timestamp` the time it was last received (see `main.ingest`). Each time such a
+    message is updated it is given a new `revision`, greater than those of all the
+    messages updated before, so the feeds can poll for the messages updated.
+    """
 
     SEVERITY_CHOICES = (
         ("INFO", "INFO"),
@@ -33,3 +121,105 @@ class DruncMessage(models.Model):
     timestamp = models.DateTimeField()
     message = models.TextField()
     severity = models.CharField(max_length=10, choices=SEVERITY_CHOICES, default="INFO")
+    topic_group = models.CharField(max_length=32, blank=True)
+    session = models.CharField(max_length=255, blank=True)
+    count = models.PositiveIntegerField(default=1)
+    first_seen = models.DateTimeField(null=True, blank=True)
+    revision = models.PositiveBigIntegerField(default=0)
+
+    objects = DruncMessageQuerySet.as_manager()
+
+    class Meta:
+        """Meta class for the DruncMessage model."""
+
+        indexes: ClassVar = [
+            # Expiry of old messages and ordering of the feed
+            models.Index(fields=["timestamp"], name="main_message_timestamp_idx"),
+            # Feeds of a given topic, group, session or severity, most recent first
+            models.Index(fields=["topic", "timestamp"], name="main_message_topic_idx"),
+            models.Index(
+                fields=["topic_group", "timestamp"], name="main_message_group_idx"
+            ),
+            models.Index(
+                fields=["session", "timestamp"], name="main_message_session_idx"
+            ),
+            models.Index(
+                fields=["severity", "timestamp"], name="main_message_severity_idx"
+            ),
+            # Messages updated since a feed was last polled
+            models.Index(fields=["revision"], name="main_message_revision_idx"),
+        ]
+
+    def classify(self) -> None:
+        """Set the fields derived from the topic and time of the message, if not set.
+
+        These are the topic group and session, and the time the message was first
+        received.
+        """
+        self.topic_group = self.topic_group or get_topic_group(self.topic)
+        self.session = self.session or get_topic_session(self.topic)
+        self.first_seen = self.first_seen or self.timestamp
+
+    def save(self, *args: Any, **kwargs: Any) -> None:  # type: ignore[explicit-any]
+        """Classify the message by topic and save it."""
+        self.classify()
+        super().save(*args, **kwargs)
+
+
+class Job(models.Model):
+    """Model for long-running operations run in the background."""
+
+    PENDING = "PENDING"
+    RUNNING = "RUNNING"
+    SUCCEEDED = "SUCCEEDED"
+    FAILED = "FAILED"
+    STATUS_CHOICES = (
+        (PENDING, "Pending"),
+        (RUNNING, "Running"),
+        (SUCCEEDED, "Succeeded"),
+        (FAILED, "Failed"),
+    )
+
+    name = models.CharField(max_length=255)
+    username = models.CharField(max_length=150)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    error = models.TextField(blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+    finished = models.DateTimeField(null=True, blank=True)
+    worker = models.CharField(max_length=255, blank=True)
+    """Server process running the job, as `<host>:<pid>`."""
+
+    @property
+    def done(self) -> bool:
+        """Whether the job has finished, successfully or not."""
+        return self.status in (self.SUCCEEDED, self.FAILED)
+
+    @property
+    def progress(self) -> str:
+        """The progress recorded so far, one line per step."""
+        return "".join(f"{step.line}\n" for step in self.progress_lines.all())
+
+    def add_progress(self, line: str) -> None:
+        """Record a line of progress of the job.
+
+        Each line is stored as its own row, so recording progress takes the same time
+        however much was recorded before.
+
+        Args:
+            line: Description of the progress made.
+        """
+        JobProgress.objects.create(job=self, line=line)
+
+
+class JobProgress(models.Model):
+    """A line of progress of a job."""
+
+    job = models.ForeignKey(
+        Job, on_delete=models.CASCADE, related_name="progress_lines"
+    )
+    line = models.TextField()
+
+    class Meta:
+        """Meta class for the JobProgress model."""
+
+        ordering = ("id",)
@@ -0,0 +1,89 @@
+"""Deletion of the expired messages and jobs from the database.
+
+Deleting all the expired messages at once, after every poll of Kafka, holds the write
+lock of the database (taken straight away with SQLite's `IMMEDIATE` transactions) for as
+long as the deletion takes and competes with the web app. Instead, expired messages are
+purged every `MESSAGE_PURGE_INTERVAL` seconds, in chunks of at most
+`MESSAGE_PURGE_CHUNK_SIZE` consecutive ids each deleted in its own transaction, so the
+lock is released between chunks. Jobs finished more than `JOB_EXPIRE_SECS` ago are
+purged along with the messages, all at once as there are few of them.
+"""
+
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db.models import Max, Min
+from django.utils import timezone
+
+from .models import DruncMessage, Job
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class PurgeStats:
+    """Outcome of a purge of the messages."""
+
+    deleted: int
+    """Number of messages deleted."""
+
+    chunks: int
+    """Number of deletions run."""
+
+    duration: float
+    """Time taken in seconds."""
+
+
+def purge_messages(before: datetime, chunk_size: int) -> PurgeStats:
+    """Delete the messages older than a given time, in chunks of consecutive ids.
+
+    Args:
+        before: Timestamp before which messages are deleted.
+        chunk_size: Number of consecutive ids covered by each deletion.
+
+    Returns:
+        The number of messages deleted and the time taken.
+    """
+    start = time.perf_counter()
+    expired = DruncMessage.objects.filter(timestamp__lt=before)
+    ids = expired.aggregate(first=Min("id"), last=Max("id"))
+
+    deleted = chunks = 0
+    if ids["first"] is not None:
+        for low in range(ids["first"], ids["last"] + 1, chunk_size):
+            count, _ = expired.filter(id__gte=low, id__lt=low + chunk_size).delete()
+            deleted += count
+            chunks += 1
+    return PurgeStats(deleted, chunks, time.perf_counter() - start)
+
+
+def purge_expired_messages() -> PurgeStats:
+    """Delete the messages older than `MESSAGE_EXPIRE_SECS`, logging the outcome.
+
+    Returns:
+        The number of messages deleted and the time taken.
+    """
+    before = timezone.now() - timedelta(seconds=settings.MESSAGE_EXPIRE_SECS)
+    stats = purge_messages(before, settings.MESSAGE_PURGE_CHUNK_SIZE)
+    logger.info(
+        f"Purged {stats.deleted} messages older than {before} in {stats.chunks} "
+        f"chunks and {stats.duration:.3f}s."
+    )
+    return stats
+
+
+def purge_expired_jobs() -> int:
+    """Delete the jobs finished more than `JOB_EXPIRE_SECS` ago, logging the outcome.
+
+    Returns:
+        The number of jobs deleted.
+    """
+    before = timezone.now() - timedelta(seconds=settings.JOB_EXPIRE_SECS)
+    # The total deleted includes the progress lines of the jobs
+    _, deleted_by_model = Job.objects.filter(finished__lt=before).delete()
+    deleted = deleted_by_model.get(Job._meta.label, 0)
+    logger.info(f"Purged {deleted} jobs finished before {before}.")
+    return deleted
@@ -0,0 +1,203 @@
+"""Full-text search of the messages.
+
+Searching messages by substring (`icontains`) means scanning every message, on every
+poll of every open feed. Instead, messages are indexed for full-text search: via an FTS5
+table kept in sync by triggers on SQLite, and via a GIN index on the `tsvector` of the
+messages on PostgreSQL (see migration `0011_druncmessage_search`).
+
+Search strings are split into words, each matching any word in the message starting
+with it, while text between double quotes matches that exact phrase. All words and
+phrases must be present. If full-text search is not available or disabled with the
+`MESSAGE_FULL_TEXT_SEARCH` setting, messages are searched by substring instead.
+Messages already in memory are matched the same way by `message_matches`, given which
+of the two the database uses (see `full_text_search`).
+"""
+
+import re
+import time
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import BooleanField, QuerySet
+from django.db.models.expressions import RawSQL
+
+from .models import DruncMessage
+
+FTS_TABLE = "main_druncmessage_fts"
+"""Name of the FTS5 table indexing the messages on SQLite."""
+
+POSTGRES_VECTOR = "to_tsvector('simple', message)"
+"""Expression of the `tsvector` indexed on PostgreSQL, to be matched exactly."""
+
+
+@dataclass(frozen=True)
+class SearchTerm:
+    """A word or phrase to search for."""
+
+    words: tuple[str, ...]
+    """The words, in order."""
+
+    prefix: bool
+    """Whether the last word only needs to be the start of a word in the message."""
+
+
+def parse_search(search: str) -> list[SearchTerm]:
+    """Split a search string into the terms to search for.
+
+    Args:
+        search: The search string, as typed by the user.
+
+    Returns:
+        The terms: phrases for text between double quotes and prefixes for other words.
+
+    Example:
+        >>> parse_search('started "run number" 12')  # doctest: +NORMALIZE_WHITESPACE
+        [SearchTerm(words=('started',), prefix=True),
+         SearchTerm(words=('run', 'number'), prefix=False),
+         SearchTerm(words=('12',), prefix=True)]
+    """
+    terms = []
+    for index, part in enumerate(search.split('"')):
+        words = re.findall(r"[^\W_]+", part.lower())
+        if index % 2:
+            if words:
+                terms.append(SearchTerm(tuple(words), prefix=False))
+        else:
+            terms.extend(SearchTerm((word,), prefix=True) for word in words)
+    return terms
+
+
+def to_fts5_query(terms: list[SearchTerm]) -> str:
+    """Write the search terms as an SQLite FTS5 query.
+
+    Example:
+        >>> to_fts5_query(parse_search('start "run number"'))
+        '"start"* "run number"'
+    """
+    return " ".join(
+        f'"{" ".join(term.words)}"' + ("*" if term.prefix else "") for term in terms
+    )
+
+
+def to_tsquery(terms: list[SearchTerm]) -> str:
+    """Write the search terms as a PostgreSQL `tsquery`.
+
+    Example:
+        >>> to_tsquery(parse_search('start "run number"'))
+        'start:* & (run <-> number)'
+    """
+    return " & ".join(
+        f"({' <-> '.join(term.words)})"
+        if len(term.words) > 1
+        else term.words[0] + (":*" if term.prefix else "")
+        for term in terms
+    )
+
+
+FTS_RECHECK_SECS = 60.0
+"""Time in seconds after which a database found without the FTS5 table is checked
+again, so a table created by migrating the database while the app runs is found."""
+
+_fts_tables: dict[str, tuple[bool, float]] = {}
+"""Whether the SQLite database of each connection alias has the FTS5 table, and when it
+was checked."""
+
+
+def _has_fts_table() -> bool:
+    """Whether the FTS5 table exists in the SQLite database of the connection."""
+    found, checked = _fts_tables.get(connection.alias, (False, float("-inf")))
+    if not found and time.monotonic() - checked >= FTS_RECHECK_SECS:
+        found = FTS_TABLE in connection.introspection.table_names()
+        _fts_tables[connection.alias] = (found, time.monotonic())
+    return found
+
+
+def full_text_search(search: str) -> bool:
+    """Whether messages are searched by full text rather than by substring.
+
+    Args:
+        search: The search string, as typed by the user.
+
+    Returns:
+        Whether `search_messages` uses the full-text index of the database.
+    """
+    if not parse_search(search) or not settings.MESSAGE_FULL_TEXT_SEARCH:
+        return False
+    if connection.vendor == "postgresql":
+        return True
+    return connection.vendor == "sqlite" and _has_fts_table()
+
+
+def search_messages(
+    queryset: QuerySet[DruncMessage], search: str
+) -> QuerySet[DruncMessage]:
+    """Filter messages to those matching a search string.
+
+    Args:
+        queryset: The messages to search.
+        search: The search string, as typed by the user.
+
+    Returns:
+        The messages matching the search.
+    """
+    if not search:
+        return queryset
+    if not full_text_search(search):
+        return queryset.filter(message__icontains=search)
+
+    terms = parse_search(search)
+    if connection.vendor == "postgresql":
+        match = RawSQL(
+            f"{POSTGRES_VECTOR} @@ to_tsquery('simple', %s)",
+            [to_tsquery(terms)],
+            output_field=BooleanField(),
+        )
+        return queryset.alias(search_match=match).filter(search_match=True)
+    return queryset.filter(
+        id__in=RawSQL(
+            f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s",
+            [to_fts5_query(terms)],
+        )
+    )
+
+
+def _term_matches(term: SearchTerm, words: list[str]) -> bool:
+    """Whether a term is found in the given words of a message."""
+    *whole, last = term.words
+    for start in range(len(words) - len(whole)):
+        candidate = words[start + len(whole)]
+        if words[start : start + len(whole)] == whole and (
+            candidate.startswith(last) if term.prefix else candidate == last
+        ):
+            return True
+    return False
+
+
+def message_matches(message: str, search: str, full_text: bool) -> bool:
+    """Check whether the text of a message matches a search string, in memory.
+
+    Args:
+        message: The text of the message.
+        search: The search string, as typed by the user.
+        full_text: Whether to match words as the full-text search does, rather than a
+            substring, as given by `full_text_search`.
+
+    Returns:
+        Whether the message would be found by `search_messages`.
+
+    Example:
+        >>> message_matches("Run number 12 started", 'start "run number"', True)
+        True
+        >>> message_matches("Run number 12 started", '"number run"', True)
+        False
+        >>> message_matches("Run number 12 started", "start run", False)
+        False
+    """
+    if not search:
+        return True
+    if not full_text:
+        return search.lower() in message.lower()
+
+    words = re.findall(r"[^\W_]+", message.lower())
+    return all(_term_matches(term, words) for term in parse_search(search))
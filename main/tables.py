@@ -1,7 +1,12 @@
 """Defines the Drunc Message Table for the data from the Kafka messages."""
 
+from collections.abc import Callable
+from typing import ClassVar
+
 import django_tables2 as tables
 
+from .models import DruncMessage
+
 
 class DruncMessageTable(tables.Table):
     """Defines a Drunc Message Table for the data from the Kafka messages."""
@@ -12,3 +17,16 @@ class DruncMessageTable(tables.Table):
         orderable=False,
     )
     message = tables.Column(verbose_name="Message", orderable=False)
+    count = tables.Column(verbose_name="Count", orderable=False)
+
+    def render_count(self, value: int) -> str:
+        """Show the number of identical messages received, if more than one."""
+        return f"x{value}" if value > 1 else ""
+
+    class Meta:
+        """Table meta options for rendering behaviour and styling."""
+
+        row_attrs: ClassVar[dict[str, Callable[[DruncMessage], int]]] = {
+            "data-id": lambda record: record.pk,
+            "data-revision": lambda record: record.revision,
+        }
@@ -8,6 +8,8 @@ app_name = "main"
 
 partial_urlpatterns = [
     path("messages/<str:topic>", partials.messages, name="messages"),
+    path("jobs/", partials.jobs, name="jobs"),
+    path("jobs/<int:job_id>", partials.job, name="job"),
 ]
 
 urlpatterns = [
@@ -1,35 +1,190 @@
 """View functions for partials."""
 
+from datetime import timedelta
+from http import HTTPStatus
+
 from django.conf import settings
 from django.contrib.auth.decorators import login_required
+from django.db.models import Count, Max, Q, QuerySet, Subquery
 from django.http import HttpRequest, HttpResponse
-from django.shortcuts import render
+from django.shortcuts import get_object_or_404, render
+from django.utils import timezone
 from django_tables2 import RequestConfig
 
-from main.models import DruncMessage
+from main.live import get_live_tail
+from main.models import DruncMessage, Job
+from main.search import search_messages
 from main.tables import DruncMessageTable
-from main.views.utils import handle_errors
+from main.views.utils import fingerprint, handle_errors, render_if_modified
+
+
+def _older_than(
+    records: QuerySet[DruncMessage], message_id: int
+) -> QuerySet[DruncMessage]:
+    """Filter messages to those before a given one in the feed, by (timestamp, id)."""
+    cursor = DruncMessage.objects.filter(pk=message_id).values("timestamp")
+    return records.filter(
+        Q(timestamp__lt=Subquery(cursor))
+        | Q(timestamp=Subquery(cursor), id__lt=message_id)
+    )
 
 
 @login_required
 @handle_errors
 def messages(request: HttpRequest, topic: str) -> HttpResponse:
-    """View function to display messages for a given topic."""
+    """View function to display messages for a given topic.
+
+    Only the most recent `MESSAGE_PAGE_SIZE` messages are rendered at first, ending
+    with a row loading the previous page (`before_id`) when revealed. Messages received
+    since are then fetched by polling for the messages with an id greater than the
+    latest one displayed (`after_id`), along with the messages updated since (with a
+    revision greater than `after_revision`) as their count changed, to be added at the
+    top of the feed in place of their previous version. The recent messages are taken
+    from the live tail in the cache when it has all those needed, rather than from the
+    database.
+    """
     search = request.GET.get("search", "")
     severity = request.GET.get("severity", "")
+    page_size = settings.MESSAGE_PAGE_SIZE
 
-    records = DruncMessage.objects.filter(
-        topic__regex=settings.KAFKA_TOPIC_REGEX[topic], message__icontains=search
-    ).order_by("-timestamp")
+    records = search_messages(
+        DruncMessage.objects.filter(topic_group=topic), search
+    ).order_by("-timestamp", "-id")
 
     if severity:
         records = records.filter(severity=severity)
 
-    table = DruncMessageTable(records)
+    tail = get_live_tail(topic)
+    live = tail.filter(search, severity) if tail is not None else []
+    # The live tail has the first page if it has enough matching messages
+    live_page = live[:page_size] if len(live) >= page_size else None
+
+    def first_page() -> list[DruncMessage]:
+        return live_page if live_page is not None else list(records[:page_size])
+
+    if after_id := request.GET.get("after_id"):
+        after = int(after_id)
+        after_revision = int(request.GET.get("after_revision") or 0)
+        # The message displayed last must be in the tail, so the messages updated after
+        # it was received are too
+        if tail is not None and after >= tail.first_id:
+            newer = [
+                message
+                for message in live
+                if message.pk > after or message.revision > after_revision
+            ]
+        else:
+            newer = list(
+                records.filter(Q(id__gt=after) | Q(revision__gt=after_revision))[
+                    : page_size + 1
+                ]
+            )
+        if not newer:
+            return HttpResponse(status=HTTPStatus.NO_CONTENT)
+        if len(newer) <= page_size:
+            return render(
+                request=request,
+                context={"table": DruncMessageTable(newer), "more": False},
+                template_name="main/partials/message_rows.html",
+            )
+        # Too many new messages to add them all, so start again from the first page
+        response = render(
+            request=request,
+            context=_message_page_context(request, first_page()),
+            template_name="main/partials/message_items.html",
+        )
+        response["HX-Retarget"] = "#message-list"
+        response["HX-Reswap"] = "innerHTML"
+        return response
+
+    if before_id := request.GET.get("before_id"):
+        return render(
+            request=request,
+            context=_message_page_context(
+                request, list(_older_than(records, int(before_id))[:page_size])
+            ),
+            template_name="main/partials/message_rows.html",
+        )
+
+    if live_page is not None:
+        data: tuple[object, ...] = tuple((m.pk, m.count) for m in live_page)
+    else:
+        # New messages increase the latest id, updated ones the latest revision, while
+        # expired ones decrease the count, so these identify the filtered messages
+        # without fetching them.
+        latest = records.aggregate(
+            max_id=Max("id"), max_revision=Max("revision"), count=Count("id")
+        )
+        data = (latest["max_id"], latest["max_revision"], latest["count"])
+
+    return render_if_modified(
+        request,
+        fingerprint(request.user.get_username(), topic, search, severity, *data),
+        "main/partials/message_items.html",
+        lambda: _message_page_context(request, first_page()),
+    )
+
+
+def _message_page_context(
+    request: HttpRequest, page: list[DruncMessage]
+) -> dict[str, object]:
+    """Create the context to render a page of messages.
+
+    Args:
+        request: The request being handled.
+        page: The messages in the page, most recent first.
+
+    Returns:
+        The context, including whether there may be older messages to load.
+    """
+    table = DruncMessageTable(page)
     RequestConfig(request, paginate=False).configure(table)
+    return {
+        "table": table,
+        "more": len(page) == settings.MESSAGE_PAGE_SIZE,
+        "last_id": page[-1].pk if page else None,
+    }
+
+
+RECENT_JOBS = timedelta(minutes=1)
+"""How long finished jobs are still listed for."""
+
 
+@login_required
+def jobs(request: HttpRequest) -> HttpResponse:
+    """View function to display the unfinished and recently finished jobs of the user.
+
+    Each job displayed then polls for its own progress until it finishes.
+    """
+    recent = timezone.now() - RECENT_JOBS
+    records = (
+        Job.objects.filter(
+            Q(finished__isnull=True) | Q(finished__gte=recent),
+            username=request.user.get_username(),
+        )
+        .order_by("-created")
+        .prefetch_related("progress_lines")
+    )
     return render(
         request=request,
-        context={"table": table},
-        template_name="main/partials/message_items.html",
+        context={"jobs": records},
+        template_name="main/partials/jobs.html",
+    )
+
+
+@login_required
+def job(request: HttpRequest, job_id: int) -> HttpResponse:
+    """View function to display the progress of a job.
+
+    Once the job is finished, the response triggers a `jobFinished` event so other
+    parts of the page can be refreshed.
+    """
+    record = get_object_or_404(Job, pk=job_id, username=request.user.get_username())
+    response = render(
+        request=request,
+        context={"job": record},
+        template_name="main/partials/job.html",
     )
+    if record.done:
+        response["HX-Trigger"] = "jobFinished"
+    return response
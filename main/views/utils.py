@@ -1,10 +1,13 @@
 """View utilities."""
 
+import hashlib
 import logging
-from collections.abc import Callable
+from collections.abc import Callable, Mapping
 
-from django.http import HttpRequest, HttpResponse
+from django.http import HttpRequest, HttpResponse, HttpResponseNotModified
 from django.shortcuts import render
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags
 
 ViewType = (
     Callable[[HttpRequest], HttpResponse] | Callable[[HttpRequest, str], HttpResponse]
@@ -30,3 +33,56 @@ def handle_errors(view_func: ViewType) -> ViewType:
             return render(request, "main/error_message.html")
 
     return wrapped_view
+
+
+def fingerprint(*data: object) -> str:
+    """Compute an ETag identifying the data a response is rendered from.
+
+    Args:
+        data: The data the response depends on. Its representation must change when
+            the data changes.
+
+    Returns:
+        The ETag, quoted as expected in the ETag header.
+    """
+    digest = hashlib.blake2b(repr(data).encode(), digest_size=16).hexdigest()
+    return f'"{digest}"'
+
+
+def render_if_modified(
+    request: HttpRequest,
+    etag: str,
+    template_name: str,
+    context: Callable[[], Mapping[str, object]],
+) -> HttpResponse:
+    """Render a template, unless the client already has the latest version of it.
+
+    The response always includes the ETag and asks the browser to revalidate it on
+    every request, so polling requests carry the ETag of the version last received. If
+    that ETag matches, a `304 Not Modified` response is returned without rendering the
+    template. The browser handles it, so htmx never sees it: it receives the cached copy
+    of the previous response instead and swaps that identical content in again.
+
+    Args:
+        request: The request being handled.
+        etag: The ETag of the data the template would be rendered from, as returned by
+            `fingerprint`.
+        template_name: The template to render.
+        context: Function creating the context of the template, only called if the
+            template is rendered.
+
+    Returns:
+        The rendered template or an empty `304 Not Modified` response.
+    """
+    if request.method in ("GET", "HEAD") and etag in parse_etags(
+        request.headers.get("If-None-Match", "")
+    ):
+        response: HttpResponse = HttpResponseNotModified()
+    else:
+        response = render(
+            request=request, context=dict(context()), template_name=template_name
+        )
+
+    response["ETag"] = etag
+    patch_cache_control(response, no_cache=True)
+    return response
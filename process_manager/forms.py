@@ -1,6 +1,12 @@
 """Forms for the process_manager app."""
 
+import re
+
 from django import forms
+from django.conf import settings
+from druncschema.process_manager_pb2 import ProcessInstance
+
+from .snapshot import ProcessFilter
 
 
 class BootProcessForm(forms.Form):
@@ -10,3 +16,63 @@ class BootProcessForm(forms.Form):
     n_processes = forms.IntegerField()
     sleep = forms.IntegerField()
     n_sleeps = forms.IntegerField()
+
+
+class LogLinesForm(forms.Form):
+    """Form selecting the lines of a process log to display."""
+
+    how_far = forms.IntegerField(
+        min_value=1, max_value=settings.PROCESS_LOG_MAX_LINES, required=False
+    )
+    """Number of lines to retrieve from the end of the log."""
+
+    skip = forms.IntegerField(min_value=0, required=False)
+    """Number of lines at the end of the log already displayed, to leave out."""
+
+    after = forms.CharField(required=False)
+    """Anchor of the last line displayed, to get only the lines after it."""
+
+
+class ProcessTableForm(forms.Form):
+    """Form selecting the rows of the process table to render."""
+
+    offset = forms.IntegerField(min_value=0, required=False)
+    """Number of rows already displayed, to render only the rows after them."""
+
+    limit = forms.IntegerField(min_value=0, required=False)
+    """Number of rows to render, if more than `PROCESS_TABLE_PAGE_SIZE`."""
+
+
+class ProcessFilterForm(forms.Form):
+    """Form selecting processes by their properties, to act on them all at once."""
+
+    session = forms.CharField(required=False)
+    user = forms.CharField(required=False)
+    name = forms.CharField(
+        required=False, help_text="Regular expression searched for in process names."
+    )
+    status = forms.ChoiceField(
+        required=False,
+        choices=[("", "Any")]
+        + [(status, status) for status in ProcessInstance.StatusCode.keys()],
+    )
+
+    def clean_name(self) -> str:
+        """Check the name is a valid regular expression."""
+        name: str = self.cleaned_data["name"]
+        try:
+            re.compile(name)
+        except re.error as e:
+            raise forms.ValidationError(f"Invalid regular expression: {e}")
+        return name
+
+    def clean(self) -> dict[str, str]:
+        """Check at least one criterion is given, not to act on every process."""
+        cleaned_data: dict[str, str] = super().clean() or {}
+        if not self.errors and not any(cleaned_data.values()):
+            raise forms.ValidationError("Select processes by at least one criterion.")
+        return cleaned_data
+
+    def process_filter(self) -> ProcessFilter:
+        """Get the filter selected, once the form is validated."""
+        return ProcessFilter(**self.cleaned_data)
@@ -0,0 +1,104 @@
+"""Selection of the process log lines to send to the log viewer.
+
+The process manager only returns the last `how_far` lines of a log, so the viewer works
+from the end of the log: older lines are found by asking for more lines and leaving out
+the ones already displayed, and new lines by finding the last line displayed among the
+latest ones. So that repeated lines can be told apart, lines are identified by an anchor
+covering their text and the text of the `ANCHOR_LINES - 1` lines before them. Lines are
+consumed as they are streamed and only a bounded number of them are kept in memory at
+any time.
+"""
+
+import hashlib
+from collections import deque
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+
+ANCHOR_LINES = 20
+"""Number of consecutive lines identifying the last one of them."""
+
+
+@dataclass(frozen=True)
+class LogLine:
+    """A line of a process log."""
+
+    text: str
+
+    anchor: str = ""
+    """Identifies the line with the lines before it, if known, to find where the log
+    viewer is at."""
+
+    @property
+    def blank(self) -> bool:
+        """Whether the line has no content to display."""
+        return not self.text.strip()
+
+
+def anchored_lines(lines: Iterable[str]) -> Iterator[LogLine]:
+    """Get the lines with their anchors, as the lines are received.
+
+    The anchors of the first `ANCHOR_LINES - 1` lines received only cover the lines
+    received before them, so are only found again if these are the first lines of the
+    log.
+
+    Args:
+        lines: The lines of the log, oldest first.
+
+    Yields:
+        The lines, oldest first.
+    """
+    window: deque[str] = deque(maxlen=ANCHOR_LINES)
+    for text in lines:
+        window.append(text)
+        digest = hashlib.blake2b("\n".join(window).encode(), digest_size=8)
+        yield LogLine(text, digest.hexdigest())
+
+
+def last_lines(lines: Iterable[str], count: int) -> list[LogLine]:
+    """Get the last lines, with their anchors.
+
+    Args:
+        lines: The lines of the log, oldest first.
+        count: Number of lines to return.
+
+    Returns:
+        The last `count` lines, oldest first.
+    """
+    return list(deque(anchored_lines(lines), maxlen=count))
+
+
+def lines_before(lines: Iterable[str], skip: int) -> Iterator[LogLine]:
+    """Get all lines but the last ones, as the lines are received.
+
+    Args:
+        lines: The lines of the log, oldest first.
+        skip: Number of lines to leave out at the end, e.g. those already displayed.
+
+    Yields:
+        The lines, oldest first, except for the last `skip` ones.
+    """
+    buffer: deque[str] = deque()
+    for line in lines:
+        buffer.append(line)
+        if len(buffer) > skip:
+            yield LogLine(buffer.popleft())
+
+
+def lines_after(lines: Iterable[str], anchor: str) -> list[LogLine] | None:
+    """Get the lines following the last line with a given anchor.
+
+    Args:
+        lines: The lines of the log, oldest first.
+        anchor: Anchor of the line to look for, e.g. the last one displayed.
+
+    Returns:
+        The lines after the given one, oldest first, or None if it is not found, e.g.
+        if more lines than received were added to the log since.
+    """
+    after: list[LogLine] | None = None
+    for line in anchored_lines(lines):
+        if line.anchor == anchor:
+            after = []
+        elif after is not None:
+            after.append(line)
+    return after
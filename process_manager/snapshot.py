@@ -0,0 +1,276 @@
+"""Conversion of the process manager information into process table data.
+
+The process table is polled every second by every open page, and searched on every
+keystroke. Rather than converting every cell to lowercase text on each request, each
+snapshot of the processes is converted once into a `ProcessSnapshot`, holding the rows
+with their lowercase text by column, and the rows matching each search are memoized,
+sorted as requested.
+
+Searches are split into terms separated by whitespace, all of which must be found in a
+row. A term is searched for in the column selected in the search dropdown, if any, or in
+all columns, unless it is written as `column:value`. Values between slashes (e.g.
+`name:/^ru.*-0[12]$/`) are case-insensitive regular expressions, while other values are
+matched as case-insensitive substrings.
+"""
+
+import re
+import threading
+from collections import OrderedDict
+from collections.abc import Sequence
+from dataclasses import dataclass
+from functools import lru_cache
+from operator import itemgetter
+
+from druncschema.process_manager_pb2 import (
+    ProcessInstance,
+    ProcessInstanceList,
+    ProcessQuery,
+)
+
+ProcessRow = dict[str, str | int]
+"""Data for a row of the process table."""
+
+STATUS_NAMES = {value: name for name, value in ProcessInstance.StatusCode.items()}
+"""Names of the process status codes, by value."""
+
+
+def get_process_rows(session_info: ProcessInstanceList) -> list[ProcessRow]:
+    """Get the process table data from the processes reported by the process manager.
+
+    Args:
+        session_info: The processes, as returned by `get_session_info`.
+
+    Returns:
+        The data for each row of the process table.
+    """
+    return [
+        {
+            "uuid": process_instance.uuid.uuid,
+            "name": process_instance.process_description.metadata.name,
+            "user": process_instance.process_description.metadata.user,
+            "session": process_instance.process_description.metadata.session,
+            "status_code": STATUS_NAMES[process_instance.status_code],
+            "exit_code": process_instance.return_code,
+        }
+        for process_instance in session_info.data.values  # type: ignore [attr-defined]
+    ]
+
+
+@dataclass(frozen=True)
+class SearchTerm:
+    """A term of a search of the process table."""
+
+    columns: tuple[str, ...]
+    """The columns searched, any of which must match."""
+
+    text: str
+    """The lowercase text searched for, if not a regular expression."""
+
+    pattern: re.Pattern[str] | None = None
+    """The regular expression searched for, if any."""
+
+    def matches(self, row: dict[str, str]) -> bool:
+        """Whether the term is found in a row, given as lowercase text by column."""
+        if self.pattern is not None:
+            return any(self.pattern.search(row[column]) for column in self.columns)
+        return any(self.text in row[column] for column in self.columns)
+
+
+@lru_cache(maxsize=256)
+def _compile(pattern: str) -> re.Pattern[str] | None:
+    """Compile a regular expression typed by the user, or None if it is invalid."""
+    try:
+        return re.compile(pattern, re.IGNORECASE)
+    except re.error:
+        return None
+
+
+def parse_process_search(
+    search: str, column: str, columns: Sequence[str]
+) -> list[SearchTerm]:
+    """Split a search of the process table into terms.
+
+    Args:
+        search: The search string, as typed by the user.
+        column: The column selected to search in, or an empty string for all columns.
+        columns: The columns of the table.
+
+    Returns:
+        The terms, all of which must be found in a row.
+
+    Example:
+        >>> parse_process_search("session:Run /^app/", "", ["name", "session"])
+        ... # doctest: +NORMALIZE_WHITESPACE
+        [SearchTerm(columns=('session',), text='run', pattern=None),
+         SearchTerm(columns=('name', 'session'), text='/^app/',
+                    pattern=re.compile('^app', re.IGNORECASE))]
+    """
+    default = (column,) if column in columns else tuple(columns)
+    terms = []
+    for word in search.split():
+        name, sep, value = word.partition(":")
+        selected = default
+        if sep and name.lower() in columns and value:
+            selected, word = (name.lower(),), value
+        pattern = None
+        if len(word) > 2 and word.startswith("/") and word.endswith("/"):
+            pattern = _compile(word[1:-1])
+        terms.append(SearchTerm(selected, word.lower(), pattern))
+    return terms
+
+
+@dataclass(frozen=True)
+class ProcessFilter:
+    """Selection of processes by their properties, e.g. to act on them all at once.
+
+    Empty criteria select any process, and processes must match all the others.
+    """
+
+    session: str = ""
+    """The session of the processes."""
+
+    user: str = ""
+    """The user the processes belong to."""
+
+    name: str = ""
+    """Regular expression searched for in the name of the processes."""
+
+    status: str = ""
+    """The status of the processes, e.g. `RUNNING`."""
+
+    def __str__(self) -> str:
+        """Describe the criteria, e.g. `session=run-a, status=DEAD`."""
+        return ", ".join(f"{k}={v}" for k, v in vars(self).items() if v) or "all"
+
+    def query(self) -> ProcessQuery:
+        """Get a query for the process manager selecting the processes to filter.
+
+        The process manager selects the processes matching any of the criteria of a
+        query, so only the most selective criterion is sent, and the processes must
+        still be filtered with `matches`.
+
+        Returns:
+            The query.
+        """
+        if self.session:
+            return ProcessQuery(session=self.session)
+        if self.user:
+            return ProcessQuery(user=self.user)
+        return ProcessQuery(names=[self.name or ".*"])
+
+    def matches(self, row: ProcessRow) -> bool:
+        """Whether a process matches all the criteria.
+
+        Args:
+            row: The data of the process, as a row of the process table.
+
+        Returns:
+            Whether the process matches.
+        """
+        return (
+            (not self.session or row["session"] == self.session)
+            and (not self.user or row["user"] == self.user)
+            and (not self.name or re.search(self.name, str(row["name"])) is not None)
+            and (not self.status or row["status_code"] == self.status)
+        )
+
+
+class ProcessSnapshot:
+    """The rows of the process table for a snapshot of the processes, to be searched.
+
+    Snapshots are shared between requests, so must not be modified.
+    """
+
+    max_results = 64
+    """Number of search results memoized, the oldest being forgotten first."""
+
+    def __init__(self, rows: list[ProcessRow]) -> None:
+        """Index the rows for searching.
+
+        Args:
+            rows: The rows of the process table.
+        """
+        self.rows = rows
+        self.columns = list(rows[0]) if rows else []
+        self._text = [{k: str(v).lower() for k, v in row.items()} for row in rows]
+        self._results: OrderedDict[tuple[str, str, str], list[ProcessRow]] = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+    def filter(
+        self, search: str, column: str = "", order_by: str = ""
+    ) -> list[ProcessRow]:
+        """Get the rows matching a search.
+
+        Args:
+            search: The search string, as typed by the user.
+            column: The column selected to search in, or an empty string for all.
+            order_by: The column to sort the rows by, prefixed with `-` for descending
+                order, or an empty string to keep them in order.
+
+        Returns:
+            The matching rows.
+        """
+        terms = parse_process_search(search, column, self.columns)
+        sort_column = order_by.removeprefix("-")
+        if sort_column not in self.columns:
+            sort_column = ""
+        if not terms and not sort_column:
+            return self.rows
+
+        key = (search, column, order_by)
+        with self._lock:
+            if (rows := self._results.get(key)) is not None:
+                return rows
+
+        rows = [
+            row
+            for row, text in zip(self.rows, self._text)
+            if all(term.matches(text) for term in terms)
+        ]
+        if sort_column:
+            rows.sort(key=itemgetter(sort_column), reverse=order_by.startswith("-"))
+        with self._lock:
+            self._results[key] = rows
+            while len(self._results) > self.max_results:
+                self._results.popitem(last=False)
+        return rows
+
+
+_snapshots: OrderedDict[int, tuple[ProcessInstanceList, ProcessSnapshot]] = (
+    OrderedDict()
+)
+"""Snapshots of the most recent process lists, by identity of the list."""
+
+_snapshots_lock = threading.Lock()
+
+SNAPSHOTS_KEPT = 8
+"""Number of process lists whose snapshot is kept."""
+
+
+def get_process_snapshot(session_info: ProcessInstanceList) -> ProcessSnapshot:
+    """Get the snapshot of a process list, created once for each list.
+
+    As `get_session_info` returns the same list while it is cached, requests within the
+    lifetime of the cache share the snapshot, and the search results memoized in it.
+
+    Args:
+        session_info: The processes, as returned by `get_session_info`.
+
+    Returns:
+        The snapshot of the processes.
+    """
+    with _snapshots_lock:
+        entry = _snapshots.get(id(session_info))
+        if entry is not None and entry[0] is session_info:
+            _snapshots.move_to_end(id(session_info))
+            return entry[1]
+
+    snapshot = ProcessSnapshot(get_process_rows(session_info))
+    with _snapshots_lock:
+        # Keep a reference to the list so its id is not reused by another list.
+        _snapshots[id(session_info)] = (session_info, snapshot)
+        while len(_snapshots) > SNAPSHOTS_KEPT:
+            _snapshots.popitem(last=False)
+    return snapshot
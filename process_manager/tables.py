@@ -1,9 +1,16 @@
 """Defines the ProcessTable for displaying process data in a structured table format."""
 
+from collections.abc import Callable
+from dataclasses import dataclass
+from functools import cache, lru_cache
 from typing import ClassVar
 
 import django_tables2 as tables
-from django.utils.safestring import mark_safe
+from django.urls import reverse
+from django.utils.html import escape
+from django.utils.safestring import SafeString, mark_safe
+
+from .snapshot import ProcessRow
 
 logs_column_template = (
     "<a href=\"{% url 'process_manager:logs' record.uuid %}\" "
@@ -104,6 +111,9 @@ class ProcessTable(tables.Table):
         attrs: ClassVar[dict[str, str]] = {
             "class": "table table-striped table-hover table-responsive",
         }
+        row_attrs: ClassVar[dict[str, Callable[[ProcessRow], str]]] = {
+            "id": lambda record: f"process-{record['uuid']}",
+        }
 
     def render_status_code(self, value: str) -> str:
         """Render the status_code with Bootstrap badge classes."""
@@ -125,3 +135,104 @@ class ProcessTable(tables.Table):
             'style="transform: scale(1.5);" '
             f'_="{row_checkbox_hyperscript}">'
         )
+
+
+ROW_CACHE_SIZE = 20000
+"""Number of rendered rows of the process table kept for reuse."""
+
+
+@dataclass(frozen=True)
+class _RowTemplate:
+    """Markup of the rows of the process table, with placeholders for the values."""
+
+    markup: str
+    """The markup of a row, to format with the values of the process."""
+
+    table: ProcessTable
+    """An empty table, rendering the cells with custom markup."""
+
+
+@cache
+def _row_template() -> _RowTemplate:
+    """Build the markup of the rows from the columns of `ProcessTable`, once.
+
+    This needs the URLs to be loaded, so can not be done on import.
+    """
+    table = ProcessTable([])
+    td = {column.name: column.attrs["td"].as_html() for column in table.columns}
+    placeholder = "00000000-0000-0000-0000-000000000000"
+    logs_url = reverse("process_manager:logs", args=[placeholder]).replace(
+        placeholder, "{uuid}"
+    )
+    markup = (
+        '<tr id="process-{uuid}">'
+        f"<td {td['uuid']}>{{uuid}}</td>"
+        f"<td {td['name']}>{{name}}</td>"
+        f"<td {td['user']}>{{user}}</td>"
+        f"<td {td['session']}>{{session}}</td>"
+        f"<td {td['status_code']}>{{status_code}}</td>"
+        f"<td {td['exit_code']}>{{exit_code}}</td>"
+        f'<td {td["logs"]}><a href="{logs_url}" '
+        'class="btn btn-sm btn-primary text-white" title="View logs">LOGS</a></td>'
+        f"<td {td['select']}>{{select}}</td>"
+        "</tr>"
+    )
+    return _RowTemplate(markup, table)
+
+
+@lru_cache(maxsize=ROW_CACHE_SIZE)
+def _render_row(
+    uuid: str, name: str, user: str, session: str, status: str, exit_code: str
+) -> str:
+    template = _row_template()
+    uuid = escape(uuid)
+    return template.markup.format(
+        uuid=uuid,
+        name=escape(name),
+        user=escape(user),
+        session=escape(session),
+        status_code=template.table.render_status_code(status),
+        exit_code=escape(exit_code),
+        select=template.table.render_select(uuid),
+    )
+
+
+def render_process_row(row: ProcessRow) -> SafeString:
+    """Render a row of the process table.
+
+    The markup is the same as rendering the table with django-tables2, except for the
+    classes alternating between rows (already styled by `table-striped`), but is built
+    from fragments prepared once rather than resolving each cell of each row. Rows are
+    cached by process and state, so unchanged rows are not rendered again when polled.
+
+    Args:
+        row: The data of the row.
+
+    Returns:
+        The HTML of the row.
+    """
+    return mark_safe(
+        _render_row(
+            str(row["uuid"]),
+            str(row["name"]),
+            str(row["user"]),
+            str(row["session"]),
+            str(row["status_code"]),
+            str(row["exit_code"]),
+        )
+    )
+
+
+def render_process_rows(rows: list[ProcessRow]) -> dict[str, str]:
+    """Render individual rows of the process table.
+
+    The markup is the same used for the rows when rendering the whole table, so rows can
+    be replaced within an already rendered table.
+
+    Args:
+        rows: The data of the rows to render.
+
+    Returns:
+        The HTML of each row, by process UUID.
+    """
+    return {str(row["uuid"]): render_process_row(row) for row in rows}
@@ -9,6 +9,12 @@ app_name = "process_manager"
 
 partial_urlpatterns = [
     path("process_table/", partials.process_table, name="process_table"),
+    path(
+        "process_table_events/",
+        partials.process_table_events,
+        name="process_table_events",
+    ),
+    path("log_lines/<uuid:uuid>", partials.log_lines, name="log_lines"),
 ]
 
 urlpatterns: list[URLPattern | URLResolver] = [
@@ -1,10 +1,94 @@
 """View functions for performing actions on DUNE processes."""
 
+from django.conf import settings
 from django.contrib.auth.decorators import login_required, permission_required
-from django.http import HttpRequest, HttpResponse, HttpResponseRedirect
+from django.http import (
+    HttpRequest,
+    HttpResponse,
+    HttpResponseBadRequest,
+    HttpResponseRedirect,
+)
 from django.urls import reverse
 
-from interfaces.process_manager_interface import ProcessAction, process_call
+from interfaces.process_manager_interface import (
+    ProcessAction,
+    ProcessCallResults,
+    get_session_info,
+    process_call,
+)
+from main import jobs
+from main.models import Job
+
+from ..forms import ProcessFilterForm
+from ..snapshot import ProcessFilter, get_process_snapshot
+from .partials import search_processes
+
+
+def report_results(
+    job: Job, action: ProcessAction, results: ProcessCallResults
+) -> None:
+    """Record the outcome of an action on processes in its job.
+
+    Args:
+        job: The job performing the action.
+        action: The action performed.
+        results: The outcome of the action for each process.
+
+    Raises:
+        RuntimeError: If the action failed for any of the processes.
+    """
+    name = action.value.capitalize()
+    failed = {uuid: error for uuid, error in results.items() if error is not None}
+    if succeeded := len(results) - len(failed):
+        job.add_progress(f"{name}: {succeeded} process(es) succeeded.")
+    for uuid, error in failed.items():
+        job.add_progress(f"{name} of {uuid} failed: {error}")
+    if failed:
+        raise RuntimeError(f"{len(failed)} of {len(results)} process(es) failed.")
+
+
+def act_in_chunks(
+    job: Job, action: ProcessAction, uuids: list[str], username: str
+) -> None:
+    """Perform an action on processes in chunks, recording the progress in a job.
+
+    Processes are acted on `PROCESS_ACTION_CHUNK_SIZE` at a time, so requests to the
+    process manager stay small and the progress of large actions is visible.
+
+    Args:
+        job: The job performing the action.
+        action: The action to perform.
+        uuids: The UUIDs of the processes.
+        username: Username of the user performing the action.
+
+    Raises:
+        RuntimeError: If the action failed for any of the processes.
+    """
+    size = settings.PROCESS_ACTION_CHUNK_SIZE
+    results: ProcessCallResults = {}
+    for start in range(0, len(uuids), size):
+        results.update(process_call(uuids[start : start + size], action, username))
+        if len(uuids) > size:
+            job.add_progress(
+                f"{action.value.capitalize()}: {len(results)} of {len(uuids)} "
+                "process(es) done."
+            )
+    report_results(job, action, results)
+
+
+def select_processes(username: str, process_filter: ProcessFilter) -> list[str]:
+    """Get the UUIDs of the processes matching a filter.
+
+    Args:
+        username: Username of the user selecting the processes.
+        process_filter: The filter.
+
+    Returns:
+        The UUIDs of the matching processes.
+    """
+    session_info = get_session_info(username, process_filter.query())
+    snapshot = get_process_snapshot(session_info)
+    return [str(row["uuid"]) for row in snapshot.rows if process_filter.matches(row)]
 
 
 @login_required
@@ -12,7 +96,11 @@ from interfaces.process_manager_interface import ProcessAction, process_call
 def process_action(request: HttpRequest) -> HttpResponse:
     """Perform an action on the selected processes.
 
-    Both the action and the selected processes are retrieved from the request.
+    Both the action and the selected processes are retrieved from the request. If
+    `select_all` is set, the action is performed on all the processes matching the
+    search of the process table instead, including those not displayed. If `selection`
+    is `filter`, it is performed on the processes matching the `ProcessFilterForm`
+    submitted, looked up when the action is run.
 
     Args:
         request: Django HttpRequest object.
@@ -27,6 +115,34 @@ def process_action(request: HttpRequest) -> HttpResponse:
         # action.lower() is not a valid enum value
         return HttpResponseRedirect(reverse("process_manager:index"))
 
-    if uuids_ := request.POST.getlist("select"):
-        process_call(uuids_, action_enum, request.user.username)
+    username = request.user.username
+    name = action_enum.value.capitalize()
+    if request.POST.get("selection") == "filter":
+        form = ProcessFilterForm(request.POST, prefix="filter")
+        if not form.is_valid():
+            return HttpResponseBadRequest(form.errors.as_text())
+        process_filter = form.process_filter()
+
+        def act_on_filter(job: Job) -> None:
+            uuids_ = select_processes(username, process_filter)
+            job.add_progress(f"{name}: {len(uuids_)} process(es) selected.")
+            act_in_chunks(job, action_enum, uuids_, username)
+
+        jobs.submit(f"{name} processes ({process_filter})", username, act_on_filter)
+        return HttpResponseRedirect(reverse("process_manager:index"))
+
+    if request.POST.get("select_all") == "true":
+        column = request.POST.get("search-drp", "")
+        search = request.POST.get("search", "")
+        snapshot = search_processes(username, column, search)
+        uuids_ = [str(row["uuid"]) for row in snapshot.filter(search, column)]
+    else:
+        uuids_ = request.POST.getlist("select")
+
+    if uuids_:
+        jobs.submit(
+            f"{name} {len(uuids_)} process(es)",
+            username,
+            lambda job: act_in_chunks(job, action_enum, uuids_, username),
+        )
     return HttpResponseRedirect(reverse("process_manager:index"))
@@ -10,9 +10,15 @@ from django.shortcuts import render
 from django.urls import reverse_lazy
 from django.views.generic.edit import FormView
 
-from interfaces.process_manager_interface import boot_process, get_process_logs
+from interfaces.process_manager_interface import (
+    stream_boot_process,
+    stream_process_logs,
+)
+from main import jobs
+from main.models import Job
 
-from ..forms import BootProcessForm
+from ..forms import BootProcessForm, ProcessFilterForm
+from ..logs import ANCHOR_LINES, last_lines
 
 
 @login_required
@@ -21,7 +27,11 @@ def index(request: HttpRequest) -> HttpResponse:
     return render(
         request=request,
         template_name="process_manager/index.html",
-        context={"debug": settings.DEBUG},
+        context={
+            "debug": settings.DEBUG,
+            "push": settings.PROCESS_TABLE_PUSH,
+            "filter_form": ProcessFilterForm(prefix="filter"),
+        },
     )
 
 
@@ -30,6 +40,9 @@ def index(request: HttpRequest) -> HttpResponse:
 def logs(request: HttpRequest, uuid: uuid.UUID) -> HttpResponse:
     """Display the logs of a process.
 
+    The last `PROCESS_LOG_LINES` lines are displayed, with `ANCHOR_LINES` more lines
+    retrieved so that the last one has the same anchor as when the log is followed.
+
     Args:
       request: the triggering request.
       uuid: identifier for the process.
@@ -37,12 +50,19 @@ def logs(request: HttpRequest, uuid: uuid.UUID) -> HttpResponse:
     Returns:
       The rendered page.
     """
-    logs_response = get_process_logs(str(uuid), request.user.username)
+    page_size = settings.PROCESS_LOG_LINES
+    lines = stream_process_logs(
+        str(uuid), request.user.username, page_size + ANCHOR_LINES
+    )
 
-    # Process the log text to exclude empty lines
-    log_lines = [val.data.line for val in logs_response if val.data.line.strip()]
+    # Empty lines are kept, although hidden, so lines can be counted when loading more
+    log_lines = last_lines(lines, page_size)
 
-    context = {"log_lines": log_lines}
+    context = {
+        "uuid": uuid,
+        "log_lines": log_lines,
+        "page_size": page_size,
+    }
     return render(request, "process_manager/logs.html", context)
 
 
@@ -55,7 +75,7 @@ class BootProcessView(PermissionRequiredMixin, FormView[BootProcessForm]):
     permission_required = "main.can_modify_processes"
 
     def form_valid(self, form: BootProcessForm) -> HttpResponse:
-        """Boot a Process when valid form data has been POSTed.
+        """Boot processes in the background when valid form data has been POSTed.
 
         Args:
             form: the form instance that has been validated.
@@ -63,5 +83,16 @@ class BootProcessView(PermissionRequiredMixin, FormView[BootProcessForm]):
         Returns:
             A redirect to the index page.
         """
-        boot_process(self.request.user.username, form.cleaned_data)
+        username = self.request.user.username
+        data = form.cleaned_data
+
+        def boot(job: Job) -> None:
+            for response in stream_boot_process(username, data):
+                process = response.data
+                job.add_progress(
+                    f"Booted {process.process_description.metadata.name} "
+                    f"({process.uuid.uuid})"
+                )
+
+        jobs.submit(f"Boot {data['session_name']}", username, boot)
         return super().form_valid(form)
@@ -1,43 +1,52 @@
 """View functions for partials."""
 
-from django.contrib.auth.decorators import login_required
-from django.http import HttpRequest, HttpResponse
-from django.shortcuts import render
-from druncschema.process_manager_pb2 import ProcessInstance
-
-from interfaces.process_manager_interface import get_session_info
-from main.views.utils import handle_errors
-
-from ..tables import ProcessTable
-
-
-def filter_table(
-    search: str, column: str, table: list[dict[str, str | int]]
-) -> list[dict[str, str | int]]:
-    """Filter table data based on search and column parameters.
-
-    If the search parameter is empty, the table data is returned unfiltered. Otherwise,
-    the table data is filtered based on the search parameter. If the column parameter
-    is provided, the search string is matched against the values in that column only.
-    If no valid column is specified, the search string is matched against all columns.
+import json
+import uuid
+from collections.abc import AsyncIterator, Iterable
+from dataclasses import asdict
+
+from django.conf import settings
+from django.contrib.auth.decorators import login_required, permission_required
+from django.http import (
+    HttpRequest,
+    HttpResponse,
+    HttpResponseBadRequest,
+    StreamingHttpResponse,
+)
+from django.template.loader import get_template
+from django.utils.safestring import mark_safe
+
+from interfaces.process_manager_interface import (
+    get_session_info,
+    process_query,
+    stream_process_logs,
+)
+from main.views.utils import fingerprint, handle_errors, render_if_modified
+
+from ..forms import LogLinesForm, ProcessTableForm
+from ..logs import ANCHOR_LINES, LogLine, last_lines, lines_after, lines_before
+from ..snapshot import ProcessSnapshot, get_process_snapshot
+from ..tables import ProcessTable, render_process_row
+from ..watcher import watcher
+
+
+def search_processes(username: str, column: str, search: str) -> ProcessSnapshot:
+    """Get the snapshot of the processes possibly matching a search of the table.
+
+    The process manager selects the processes where it matches them like the search,
+    so only those are transferred. The snapshot must then be filtered with the search,
+    which only removes rows if the search could not be run by the process manager.
 
     Args:
-        search: The search string to filter the table data.
-        column: The column name to filter by, or an empty string to search all columns.
-        table: The table data to filter.
+        username: Username of the user searching the processes.
+        column: The column selected to search in, or an empty string for all.
+        search: The search string, as typed by the user.
 
     Returns:
-        The filtered table data.
+        The snapshot of the processes.
     """
-    if not search or not table:
-        return table
-
-    all_cols = list(table[0].keys())
-    columns = [column] if column in all_cols else all_cols
-
-    # Convert search string to lowercase for case-insensitive matching
-    search = search.lower()
-    return [row for row in table if any(search in str(row[k]).lower() for k in columns)]
+    session_info = get_session_info(username, process_query(column, search))
+    return get_process_snapshot(session_info)
 
 
 @login_required
@@ -45,26 +54,17 @@ def filter_table(
 def process_table(request: HttpRequest) -> HttpResponse:
     """Renders the process table.
 
-    This view may be called using either GET or POST methods. GET renders the table with
-    no check boxes selected. POST renders the table with checked boxes for any table row
-    with a uuid provided in the select key of the request data.
+    The rows are searched and sorted before only the first `PROCESS_TABLE_PAGE_SIZE`
+    (or `limit`, if more rows are displayed already) are rendered, with a row loading
+    the next ones when revealed. Given an `offset`, only the rows after it are rendered,
+    to be added to the table.
     """
-    session_info = get_session_info(request.user.username)
-
-    status_enum_lookup = dict(item[::-1] for item in ProcessInstance.StatusCode.items())
-
-    # Build the table data
-    table_data = [
-        {
-            "uuid": process_instance.uuid.uuid,
-            "name": process_instance.process_description.metadata.name,
-            "user": process_instance.process_description.metadata.user,
-            "session": process_instance.process_description.metadata.session,
-            "status_code": status_enum_lookup[process_instance.status_code],
-            "exit_code": process_instance.return_code,
-        }
-        for process_instance in session_info.data.values  # type: ignore [attr-defined]
-    ]
+    form = ProcessTableForm(request.GET)
+    if not form.is_valid():
+        return HttpResponseBadRequest(form.errors.as_text())
+    offset = form.cleaned_data["offset"] or 0
+    limit = max(form.cleaned_data["limit"] or 0, settings.PROCESS_TABLE_PAGE_SIZE)
+
     # Get the values from the GET request
     search_dropdown = request.GET.get("search-drp", "")
     search_input = request.GET.get("search", "")
@@ -73,16 +73,112 @@ def process_table(request: HttpRequest) -> HttpResponse:
     column = search_dropdown if search_dropdown else ""
     search = search_input if search_input else ""
 
-    # Apply search filtering
-    table_data = filter_table(search, column, table_data)
-    table = ProcessTable(table_data)
-
     # Set the order based on the 'sort' parameter in the GET request, defaulting to ''
     sort_param = request.GET.get("sort", "")
-    table.order_by = sort_param
 
-    return render(
-        request=request,
-        context={"table": table},
-        template_name="process_manager/partials/process_table.html",
+    # Apply search filtering and sorting. The results are shared by the requests for
+    # the same snapshot.
+    snapshot = search_processes(request.user.username, column, search)
+    table_data = snapshot.filter(search, column, sort_param)
+    rows = table_data[offset : offset + limit]
+
+    def context() -> dict[str, object]:
+        return {
+            "table": ProcessTable(rows),
+            "rows_html": mark_safe("".join(map(render_process_row, rows))),
+            "total": len(table_data),
+            "more": offset + len(rows) < len(table_data),
+            "next_offset": offset + len(rows),
+        }
+
+    return render_if_modified(
+        request,
+        fingerprint(
+            request.user.get_username(),
+            rows,
+            len(table_data),
+            offset,
+            search,
+            column,
+            sort_param,
+        ),
+        "process_manager/partials/process_rows.html"
+        if offset
+        else "process_manager/partials/process_table.html",
+        context,
+    )
+
+
+@login_required
+async def process_table_events(request: HttpRequest) -> StreamingHttpResponse:
+    """Streams the changes in the process table as server-sent events.
+
+    Each event carries the UUIDs of the new and removed processes and the rendered rows
+    of the processes whose data changed, so the client can update the table in place.
+    This requires the app to be served via ASGI, as the connection is kept open.
+    """
+    user = await request.auser()
+
+    async def events() -> AsyncIterator[str]:
+        async for diff in watcher.subscribe(user.get_username()):
+            if diff:
+                yield f"event: process-diff\ndata: {json.dumps(asdict(diff))}\n\n"
+            else:
+                yield ": keep-alive\n\n"
+
+    response = StreamingHttpResponse(events(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+@login_required
+@permission_required("main.can_view_process_logs", raise_exception=True)
+def log_lines(
+    request: HttpRequest, uuid: uuid.UUID
+) -> HttpResponse | StreamingHttpResponse:
+    """Streams lines of the log of a process.
+
+    By default, the last `how_far` lines of the log are sent, leaving out the last
+    `skip` ones, so older lines can be loaded as the user scrolls back. If `after` is
+    given, only the lines after the line with that anchor are sent instead, so a log
+    being followed can be extended with the new lines. These are looked for in the last
+    `how_far + ANCHOR_LINES` lines of the log. If the line is not among them, e.g. as
+    more lines were added since, the last `how_far` lines replace those displayed.
+
+    Args:
+      request: the triggering request.
+      uuid: identifier for the process.
+
+    Returns:
+      The rendered lines, streamed as they are received from the process manager.
+    """
+    form = LogLinesForm(request.GET)
+    if not form.is_valid():
+        return HttpResponseBadRequest(form.errors.as_text())
+
+    how_far = form.cleaned_data["how_far"] or settings.PROCESS_LOG_LINES
+    template = get_template("process_manager/partials/log_line.html")
+
+    if after := form.cleaned_data["after"]:
+        window = list(
+            stream_process_logs(
+                str(uuid), request.user.username, how_far + ANCHOR_LINES
+            )
+        )
+        if (new_lines := lines_after(window, after)) is None:
+            # Replace the lines displayed, as some lines would be missing after them
+            response = StreamingHttpResponse(
+                template.render({"line": line}, request)
+                for line in last_lines(window, how_far)
+            )
+            response["HX-Reswap"] = "innerHTML"
+            return response
+        selected: Iterable[LogLine] = new_lines
+    else:
+        lines = stream_process_logs(str(uuid), request.user.username, how_far)
+        selected = lines_before(lines, form.cleaned_data["skip"] or 0)
+
+    return StreamingHttpResponse(
+        template.render({"line": line}, request) for line in selected
     )
@@ -0,0 +1,152 @@
+"""Server side watcher pushing changes in the processes to the connected clients."""
+
+import asyncio
+import logging
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, field
+
+from asgiref.sync import sync_to_async
+
+from interfaces.process_manager_interface import get_session_info
+
+from .snapshot import ProcessRow, get_process_rows
+from .tables import render_process_rows
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ProcessDiff:
+    """Changes in the processes between two consecutive checks."""
+
+    added: list[str] = field(default_factory=list)
+    """UUIDs of the new processes."""
+
+    removed: list[str] = field(default_factory=list)
+    """UUIDs of the processes no longer reported by the process manager."""
+
+    changed: dict[str, str] = field(default_factory=dict)
+    """Rendered table rows of the processes whose data changed, by UUID."""
+
+    reload: bool = False
+    """Whether the client should reload the whole table rather than apply the diff."""
+
+    def __bool__(self) -> bool:
+        """Whether there are any changes."""
+        return bool(self.added or self.removed or self.changed or self.reload)
+
+
+def diff_rows(old: dict[str, ProcessRow], new: dict[str, ProcessRow]) -> ProcessDiff:
+    """Find the changes between two versions of the process table data.
+
+    Args:
+        old: The previous table rows, by UUID.
+        new: The current table rows, by UUID.
+
+    Returns:
+        The changes, with the changed rows already rendered.
+    """
+    changed = [row for uuid, row in new.items() if uuid in old and old[uuid] != row]
+    return ProcessDiff(
+        added=[uuid for uuid in new if uuid not in old],
+        removed=[uuid for uuid in old if uuid not in new],
+        changed=render_process_rows(changed) if changed else {},
+    )
+
+
+class ProcessWatcher:
+    """Watches the process manager and notifies subscribers of changes in processes.
+
+    A single watcher checks the processes on behalf of all the subscribers, and only
+    while there are subscribers. Each subscriber receives the changes found since it
+    subscribed, starting with a request to reload the whole table.
+    """
+
+    interval = 1.0
+    """Time in seconds between checks of the processes."""
+
+    heartbeat = 15.0
+    """Maximum time in seconds between notifications, sent even if nothing changed."""
+
+    max_pending = 10
+    """Number of notifications kept for a subscriber before asking it to reload."""
+
+    def __init__(self) -> None:
+        """Create a new watcher, idle until the first subscription."""
+        self._subscribers: set[asyncio.Queue[ProcessDiff]] = set()
+        self._task: asyncio.Task[None] | None = None
+        self._rows: dict[str, ProcessRow] | None = None
+        self._username = ""
+
+    async def subscribe(self, username: str) -> AsyncIterator[ProcessDiff]:
+        """Get the changes in the processes as they happen.
+
+        An empty diff is produced if nothing changed for `heartbeat` seconds, so the
+        connection with the client can be kept alive.
+
+        Args:
+            username: Username of the user subscribing.
+
+        Yields:
+            The changes in the processes.
+        """
+        queue: asyncio.Queue[ProcessDiff] = asyncio.Queue(maxsize=self.max_pending)
+        queue.put_nowait(ProcessDiff(reload=True))
+        self._subscribers.add(queue)
+        self._username = username
+        if (
+            self._task is None
+            or self._task.done()
+            or self._task.get_loop() is not asyncio.get_running_loop()
+        ):
+            self._task = asyncio.create_task(self._run())
+
+        try:
+            while True:
+                try:
+                    yield await asyncio.wait_for(queue.get(), self.heartbeat)
+                except asyncio.TimeoutError:
+                    yield ProcessDiff()
+        finally:
+            self._subscribers.discard(queue)
+
+    async def _run(self) -> None:
+        """Check the processes periodically while there are subscribers."""
+        while self._subscribers:
+            try:
+                await self._check()
+            except Exception:
+                # Try again later, comparing with the last rows known.
+                logger.exception("Failed to check the processes.")
+            await asyncio.sleep(self.interval)
+        self._rows = None
+
+    async def _check(self) -> None:
+        """Check the processes and notify the subscribers of any changes."""
+        session_info = await sync_to_async(get_session_info, thread_sensitive=False)(
+            self._username
+        )
+        rows = {str(row["uuid"]): row for row in get_process_rows(session_info)}
+        if self._rows is None:
+            # Nothing to compare with: subscribers have been asked to reload anyway.
+            self._rows = rows
+            return
+
+        diff = await sync_to_async(diff_rows, thread_sensitive=False)(self._rows, rows)
+        self._rows = rows
+        if not diff:
+            return
+
+        for queue in self._subscribers:
+            if not queue.full():
+                queue.put_nowait(diff)
+                continue
+
+            # The subscriber is lagging behind, so it is best to start again.
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait(ProcessDiff(reload=True))
+
+
+watcher = ProcessWatcher()
+"""The process watcher shared by all the clients."""
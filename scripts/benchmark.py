@@ -0,0 +1,515 @@
+"""Benchmark of the request hot paths of the UI, against fake drunc services.
+
+The script runs offline: the drivers used by the UI to talk to the process manager, the
+root controller and the session manager, and the connectivity service lookup, are
+replaced by fakes serving synthetic sessions of the requested number of processes and a
+deep application tree, with a configurable latency per call. Each scenario then drives
+one view with a number of concurrent clients, e.g.:
+
+```
+python scripts/benchmark.py --processes 10 1000 10000 --clients 10 --requests 100
+```
+
+For each scenario and number of processes, the median and 99th percentile latencies,
+the throughput and the number of calls to the drunc services per request are reported.
+Results can be saved with `--save results.json` and compared with a previous run with
+`--baseline results.json`, the script exiting with an error if any scenario is slower
+or makes more calls than the baseline by more than `--max-regression` (20% by default).
+
+It requires the same environment as the web app (drunc and druncschema installed), but
+uses its own temporary database.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from collections.abc import AsyncIterator, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from types import SimpleNamespace
+
+SCENARIOS = ["process_table", "app_tree_table", "messages", "state_machine", "logs"]
+"""The views benchmarked."""
+
+
+class Calls:
+    """Thread-safe count of the calls made to the fake drunc services."""
+
+    def __init__(self) -> None:
+        """Start counting from zero."""
+        self._lock = threading.Lock()
+        self.count = 0
+
+    def add(self) -> None:
+        """Count a call."""
+        with self._lock:
+            self.count += 1
+
+
+@dataclass
+class FakeServices:
+    """Data served by the fake drunc services and how long they take to respond."""
+
+    processes: list[SimpleNamespace]
+    """The processes reported by the process manager."""
+
+    tree: SimpleNamespace
+    """The status of the root controller, with its children."""
+
+    latency: float
+    """Time taken in seconds by each call."""
+
+    log_lines: int
+    """Number of lines in the log of each process."""
+
+    calls: Calls
+    """Calls made to the services."""
+
+
+services: FakeServices | None = None
+"""The fake services the fake drivers use, set up by `install_fakes`."""
+
+
+def _services() -> FakeServices:
+    if services is None:
+        raise RuntimeError("The fake services have not been installed.")
+    return services
+
+
+def make_processes(count: int, session: str = "benchmark") -> list[SimpleNamespace]:
+    """Create the processes of a synthetic session, as reported by the process manager.
+
+    Args:
+        count: Number of processes.
+        session: Name of the session.
+
+    Returns:
+        The processes, a tenth of which are dead.
+    """
+    from druncschema.process_manager_pb2 import ProcessInstance
+
+    running = ProcessInstance.StatusCode.Value("RUNNING")
+    dead = ProcessInstance.StatusCode.Value("DEAD")
+    return [
+        SimpleNamespace(
+            uuid=SimpleNamespace(uuid=f"00000000-0000-0000-0000-{index:012d}"),
+            process_description=SimpleNamespace(
+                metadata=SimpleNamespace(
+                    name=f"app-{index}",
+                    user="benchmark",
+                    session=session,
+                    hostname=f"host-{index % 50}",
+                )
+            ),
+            status_code=dead if index % 10 == 9 else running,
+            return_code=1 if index % 10 == 9 else 0,
+        )
+        for index in range(count)
+    ]
+
+
+def make_tree(
+    depth: int, fanout: int, name: str = "root-controller"
+) -> SimpleNamespace:
+    """Create the status of a controller with a tree of applications below it.
+
+    Args:
+        depth: Number of levels of controllers below this one.
+        fanout: Number of children of each controller.
+        name: Name of the controller.
+
+    Returns:
+        The status of the controller.
+    """
+    children = (
+        [make_tree(depth - 1, fanout, f"{name}.{i}") for i in range(fanout)]
+        if depth > 0
+        else []
+    )
+    return SimpleNamespace(
+        name=name, children=children, data=SimpleNamespace(state="configured")
+    )
+
+
+def _describe(status: SimpleNamespace) -> SimpleNamespace:
+    """Get the description of a controller, as returned by `describe`."""
+    return SimpleNamespace(
+        data=SimpleNamespace(name=status.name, info="benchmark-detector"),
+        children=[_describe(child) for child in status.children],
+    )
+
+
+def _matches(query: object, process: SimpleNamespace) -> bool:
+    """Whether a process matches a process query."""
+    import re
+
+    metadata = process.process_description.metadata
+    uuids = [uuid.uuid for uuid in getattr(query, "uuids", [])]
+    names = list(getattr(query, "names", []))
+    session = getattr(query, "session", "")
+    user = getattr(query, "user", "")
+    return (
+        (not uuids or process.uuid.uuid in uuids)
+        and (not names or any(re.search(name, metadata.name) for name in names))
+        and (not session or metadata.session == session)
+        and (not user or metadata.user == user)
+    )
+
+
+class FakeProcessManagerDriver:
+    """Stand-in for `ProcessManagerDriver`, serving the synthetic session."""
+
+    def __init__(self, address: str, token: object, aio_channel: bool = True) -> None:
+        """Create a driver, ignoring where the process manager is."""
+
+    async def _call(self) -> FakeServices:
+        fake = _services()
+        fake.calls.add()
+        await asyncio.sleep(fake.latency)
+        return fake
+
+    async def ps(self, query: object) -> SimpleNamespace:
+        """List the processes matching the query."""
+        fake = await self._call()
+        values = [p for p in fake.processes if _matches(query, p)]
+        return SimpleNamespace(data=SimpleNamespace(values=values))
+
+    async def logs(self, request: object) -> AsyncIterator[SimpleNamespace]:
+        """Stream the last lines of the log of a process."""
+        fake = await self._call()
+        how_far = int(getattr(request, "how_far", fake.log_lines))
+        for index in range(max(0, fake.log_lines - how_far), fake.log_lines):
+            yield SimpleNamespace(data=SimpleNamespace(line=f"Log line {index}"))
+
+
+class FakeControllerDriver:
+    """Stand-in for `ControllerDriver`, serving the synthetic application tree."""
+
+    def __init__(self, uri: str, token: object) -> None:
+        """Create a driver, ignoring where the controller is."""
+
+    def _call(self) -> FakeServices:
+        fake = _services()
+        fake.calls.add()
+        time.sleep(fake.latency)
+        return fake
+
+    def status(self) -> SimpleNamespace:
+        """Get the status of the root controller and its children."""
+        return self._call().tree
+
+    def describe(self) -> SimpleNamespace:
+        """Describe the root controller and its children."""
+        return _describe(self._call().tree)
+
+    def describe_fsm(self) -> SimpleNamespace:
+        """Describe the FSM events, which take no arguments."""
+        from controller.fsm import EVENTS
+
+        self._call()
+        commands = [SimpleNamespace(name=event, arguments=[]) for event in EVENTS]
+        return SimpleNamespace(data=SimpleNamespace(commands=commands))
+
+
+class FakeSessionManagerDriver:
+    """Stand-in for `SessionManagerDriver`, serving the synthetic session."""
+
+    def __init__(self, address: str, token: object, aio_channel: bool = True) -> None:
+        """Create a driver, ignoring where the session manager is."""
+
+    def _call(self) -> FakeServices:
+        fake = _services()
+        fake.calls.add()
+        time.sleep(fake.latency)
+        return fake
+
+    def list_all_configs(self) -> SimpleNamespace:
+        """List the configurations available to boot a session."""
+        self._call()
+        config = SimpleNamespace(file="benchmark.data.xml", session_id="benchmark")
+        return SimpleNamespace(data=SimpleNamespace(config_keys=[config]))
+
+    def list_all_sessions(self) -> SimpleNamespace:
+        """List the active sessions, those of the synthetic processes."""
+        fake = self._call()
+        sessions = {
+            process.process_description.metadata.session: (
+                process.process_description.metadata.user
+            )
+            for process in fake.processes
+        }
+        active = [
+            SimpleNamespace(name=name, user=user) for name, user in sessions.items()
+        ]
+        return SimpleNamespace(data=SimpleNamespace(active_sessions=active))
+
+
+def install_fakes(fake: FakeServices) -> None:
+    """Make the UI talk to the fake services rather than the real ones.
+
+    Args:
+        fake: The data served and the latency of the services.
+    """
+    global services
+    services = fake
+
+    from interfaces import controller_interface as ci
+    from interfaces import process_manager_interface as pmi
+    from interfaces import session_manager_interface as smi
+
+    pmi.ProcessManagerDriver = FakeProcessManagerDriver  # type: ignore [misc, assignment]
+    pmi.discard_process_manager_drivers()
+    ci.ControllerDriver = FakeControllerDriver  # type: ignore [misc, assignment]
+    ci.get_controller_uri = lambda: "benchmark:0"
+    ci.reset_controller_connection()
+    smi.SessionManagerDriver = FakeSessionManagerDriver  # type: ignore [misc, assignment]
+
+
+def setup_django(database_dir: str) -> None:
+    """Set up Django with a fresh database in the given directory."""
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "drunc_ui.settings")
+    os.environ["DATABASE_DIR"] = database_dir
+
+    import django
+    from django.conf import settings
+    from django.core.management import call_command
+
+    django.setup()
+    settings.ALLOWED_HOSTS = ["testserver"]
+    call_command("migrate", verbosity=0)
+
+
+def seed_messages(count: int) -> None:
+    """Store messages for the message feeds."""
+    from datetime import datetime, timedelta, timezone
+
+    from main.models import DruncMessage
+
+    now = datetime.now(tz=timezone.utc)
+    DruncMessage.objects.bulk_create(
+        (
+            DruncMessage(
+                topic="control.benchmark.process_manager",
+                timestamp=now - timedelta(seconds=index),
+                message=f"Process app-{index % 1000} changed state to running",
+                severity="ERROR" if index % 20 == 0 else "INFO",
+            )
+            for index in range(count)
+        ),
+        batch_size=1000,
+    )
+
+
+@dataclass
+class Result:
+    """Measurements of a scenario."""
+
+    requests: int
+    errors: int
+    p50_ms: float
+    p99_ms: float
+    throughput: float
+    """Requests per second."""
+    calls_per_request: float
+    """Calls to the drunc services per request."""
+
+
+def scenario_url(name: str) -> str:
+    """Get the URL requested by a scenario."""
+    from django.urls import reverse
+
+    if name == "process_table":
+        return reverse("process_manager:process_table")
+    if name == "app_tree_table":
+        return reverse("controller:app_tree_table")
+    if name == "messages":
+        return reverse("main:messages", args=["PROCMAN"])
+    if name == "state_machine":
+        return reverse("controller:state_machine")
+    if name == "logs":
+        return reverse(
+            "process_manager:logs", args=[_services().processes[0].uuid.uuid]
+        )
+    raise ValueError(f"Unknown scenario: {name}")
+
+
+def _client_requests(url: str, count: int) -> Iterator[tuple[float, bool]]:
+    """Make requests as a logged in user, yielding their latency and success."""
+    from django.test import Client
+
+    from main.models import User
+
+    client = Client()
+    client.force_login(User.objects.get(username="benchmark"))
+    for _ in range(count):
+        start = time.perf_counter()
+        response = client.get(url)
+        response.getvalue()  # consume streamed responses
+        yield time.perf_counter() - start, response.status_code < 400
+
+
+def run_scenario(name: str, clients: int, requests: int) -> Result:
+    """Request a view with concurrent clients.
+
+    Args:
+        name: The scenario.
+        clients: Number of concurrent clients.
+        requests: Number of requests made by each client.
+
+    Returns:
+        The measurements.
+    """
+    from django.core.cache import cache
+
+    from controller.app_tree import app_tree_cache
+    from interfaces.process_manager_interface import session_info_cache
+
+    url = scenario_url(name)
+    cache.clear()
+    session_info_cache.clear()
+    app_tree_cache.clear()
+    calls = _services().calls
+    calls_before = calls.count
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(clients) as executor:
+        outcomes = list(
+            itertools.chain.from_iterable(
+                executor.map(
+                    lambda _: list(_client_requests(url, requests)), range(clients)
+                )
+            )
+        )
+    duration = time.perf_counter() - start
+
+    latencies = sorted(latency * 1e3 for latency, _ in outcomes)
+    quantiles = statistics.quantiles(latencies, n=100, method="inclusive")
+    return Result(
+        requests=len(outcomes),
+        errors=sum(not ok for _, ok in outcomes),
+        p50_ms=statistics.median(latencies),
+        p99_ms=quantiles[98],
+        throughput=len(outcomes) / duration,
+        calls_per_request=(calls.count - calls_before) / len(outcomes),
+    )
+
+
+def find_regressions(
+    results: dict[str, Result], baseline: dict[str, dict[str, float]], threshold: float
+) -> list[str]:
+    """Compare results with a baseline.
+
+    Args:
+        results: The results, by scenario.
+        baseline: The baseline results, by scenario, as saved by a previous run.
+        threshold: Relative degradation tolerated, e.g. 0.2 for 20%.
+
+    Returns:
+        Description of each regression found.
+    """
+    regressions = []
+    for key, result in results.items():
+        if (base := baseline.get(key)) is None:
+            continue
+        if result.p99_ms > base["p99_ms"] * (1 + threshold):
+            regressions.append(
+                f"{key}: p99 {result.p99_ms:.1f} ms > {base['p99_ms']:.1f} ms"
+            )
+        if result.throughput < base["throughput"] * (1 - threshold):
+            regressions.append(
+                f"{key}: throughput {result.throughput:.1f}/s "
+                f"< {base['throughput']:.1f}/s"
+            )
+        if result.calls_per_request > base["calls_per_request"] * (1 + threshold):
+            regressions.append(
+                f"{key}: {result.calls_per_request:.2f} calls/request "
+                f"> {base['calls_per_request']:.2f}"
+            )
+        if result.errors:
+            regressions.append(f"{key}: {result.errors} failed requests")
+    return regressions
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    """Parse the command line arguments."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--processes", type=int, nargs="+", default=[10, 1000], help="Session sizes."
+    )
+    parser.add_argument("--clients", type=int, default=10)
+    parser.add_argument("--requests", type=int, default=50, help="Per client.")
+    parser.add_argument("--scenario", choices=SCENARIOS, nargs="+", default=SCENARIOS)
+    parser.add_argument(
+        "--latency-ms", type=float, default=1.0, help="Latency of each drunc call."
+    )
+    parser.add_argument("--tree-depth", type=int, default=3)
+    parser.add_argument("--tree-fanout", type=int, default=5)
+    parser.add_argument("--messages", type=int, default=10000)
+    parser.add_argument("--log-lines", type=int, default=1000)
+    parser.add_argument("--save", type=Path, help="Save the results to a JSON file.")
+    parser.add_argument("--baseline", type=Path, help="JSON file to compare with.")
+    parser.add_argument("--max-regression", type=float, default=0.2)
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run the benchmark.
+
+    Returns:
+        The exit code: 1 if regressions were found, 0 otherwise.
+    """
+    args = parse_args(argv)
+    with tempfile.TemporaryDirectory() as database_dir:
+        setup_django(database_dir)
+
+        from main.models import User
+
+        User.objects.create_superuser("benchmark", password="benchmark")
+        seed_messages(args.messages)
+
+        results: dict[str, Result] = {}
+        for count in args.processes:
+            install_fakes(
+                FakeServices(
+                    processes=make_processes(count),
+                    tree=make_tree(args.tree_depth, args.tree_fanout),
+                    latency=args.latency_ms / 1e3,
+                    log_lines=args.log_lines,
+                    calls=Calls(),
+                )
+            )
+            for name in args.scenario:
+                key = f"{name}[{count}]"
+                results[key] = result = run_scenario(name, args.clients, args.requests)
+                print(
+                    f"{key:<28} p50 {result.p50_ms:8.1f} ms  p99 {result.p99_ms:8.1f} "
+                    f"ms  {result.throughput:8.1f} req/s  "
+                    f"{result.calls_per_request:6.2f} calls/req  "
+                    f"{result.errors} errors"
+                )
+
+    if args.save:
+        args.save.write_text(
+            json.dumps({k: asdict(r) for k, r in results.items()}, indent=2)
+        )
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())
+        regressions = find_regressions(results, baseline, args.max_regression)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,9 +2,9 @@
 
 from django.contrib.auth.decorators import login_required
 from django.http import HttpRequest, HttpResponse
-from django.shortcuts import render
 
 from interfaces import session_manager_interface as smi
+from main.views.utils import fingerprint, render_if_modified
 
 from .. import tables
 
@@ -12,18 +12,22 @@ from .. import tables
 @login_required
 def active_sessions_table_view(request: HttpRequest) -> HttpResponse:
     """View that renders the active sessions table."""
-    return render(
-        request=request,
-        context=dict(table=tables.ActiveSessions(smi.get_sessions())),
-        template_name="session_manager/partials/table_partial.html",
+    sessions = smi.get_sessions()
+    return render_if_modified(
+        request,
+        fingerprint(request.user.get_username(), sessions),
+        "session_manager/partials/table_partial.html",
+        lambda: dict(table=tables.ActiveSessions(sessions)),
     )
 
 
 @login_required
 def available_configs_table_view(request: HttpRequest) -> HttpResponse:
     """View that renders the available configs table."""
-    return render(
-        request=request,
-        context=dict(table=tables.AvailableConfigs(smi.get_configs())),
-        template_name="session_manager/partials/table_partial.html",
+    configs = smi.get_configs()
+    return render_if_modified(
+        request,
+        fingerprint(request.user.get_username(), configs),
+        "session_manager/partials/table_partial.html",
+        lambda: dict(table=tables.AvailableConfigs(configs)),
     )
@@ -45,6 +45,36 @@ def dummy_session_data() -> dict[str, str | int]:
     return dict(session_name="sess_name", n_processes=1, sleep=5, n_sleeps=4)
 
 
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """Make sure no cached data leaks between tests."""
+    from django.core.cache import cache
+
+    from controller.app_tree import app_tree_cache
+    from interfaces.controller_interface import reset_controller_connection
+    from interfaces.process_manager_interface import (
+        discard_process_manager_drivers,
+        session_info_cache,
+    )
+
+    def clear():
+        cache.clear()
+        session_info_cache.clear()
+        app_tree_cache.clear()
+        discard_process_manager_drivers()
+        reset_controller_connection()
+
+    clear()
+    yield
+    clear()
+
+
+@pytest.fixture(autouse=True)
+def inline_jobs(settings):
+    """Run background jobs within the request, so their effects can be checked."""
+    settings.JOB_WORKERS = 0
+
+
 @pytest.fixture(autouse=True)
 def grpc_mock(mocker):
     """Mock out the method that generates gRPC calls to external interfaces."""
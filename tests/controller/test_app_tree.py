@@ -158,3 +158,49 @@ def test_get_app_tree(mocker):
         [AppTree("child", [AppTree("grandchild", [], "unknown")], "unknown", "det1")],
         "",
     )
+
+
+def test_fetch_app_tree_data(mocker):
+    """Test that only the missing app tree information is requested."""
+    from controller.app_tree import fetch_app_tree_data
+
+    mock_status = mocker.patch("controller.app_tree.get_controller_status")
+    mock_hostnames = mocker.patch("controller.app_tree.get_hostnames")
+    mock_detectors = mocker.patch("controller.app_tree.get_detectors")
+
+    result = fetch_app_tree_data("a_user")
+    assert result == (
+        mock_status.return_value,
+        mock_hostnames.return_value,
+        mock_detectors.return_value,
+    )
+    mock_hostnames.assert_called_once_with("a_user")
+
+    status, hostnames, detectors = object(), {"root": "host"}, {}
+    assert fetch_app_tree_data("a_user", status, hostnames, detectors) == (
+        status,
+        hostnames,
+        detectors,
+    )
+    mock_status.assert_called_once()
+    mock_hostnames.assert_called_once()
+    mock_detectors.assert_called_once()
+
+
+def test_get_app_tree_snapshot(mocker):
+    """Test that the app tree is built once and shared between requests."""
+    from controller.app_tree import get_app_tree_snapshot
+
+    tree = AppTree(
+        name="ParentApp",
+        children=[AppTree(name="ChildApp", children=[], host="childhost")],
+        host="parenthost",
+    )
+    mock = mocker.patch("controller.app_tree.get_app_tree", return_value=tree)
+
+    snapshot = get_app_tree_snapshot("a_user")
+    assert snapshot.tree == tree
+    assert snapshot.rows == tree.to_list()
+
+    assert get_app_tree_snapshot("another_user") == snapshot
+    mock.assert_called_once_with("a_user")
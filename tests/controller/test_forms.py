@@ -81,3 +81,22 @@ def test_get_form_for_event_with_arguments(mocker):
     assert type(form.fields["arg4"]) is forms.FloatField
     assert form.fields["arg4"].initial == 22.5
     assert form.fields["arg4"].required
+
+
+def test_get_form_for_event_cached(mocker):
+    """Test that forms are reused until the FSM schema changes."""
+    from controller import forms
+    from interfaces.controller_interface import reset_controller_connection
+
+    mock = mocker.patch("controller.forms.ci.get_arguments", return_value=[])
+
+    form_class = forms.get_form_for_event("test_event")
+    assert forms.get_form_for_event("test_event") is form_class
+    mock.assert_called_once_with("test_event")
+
+    forms.get_form_for_event("other_event")
+    assert mock.call_count == 2
+
+    reset_controller_connection()
+    assert forms.get_form_for_event("test_event") is not form_class
+    assert mock.call_count == 3
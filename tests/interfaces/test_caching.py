@@ -0,0 +1,153 @@
+import threading
+import time
+
+import pytest
+
+from interfaces.caching import SnapshotCache
+
+
+@pytest.fixture
+def snapshot_cache(settings):
+    """A snapshot cache with a long lifetime."""
+    settings.TEST_SNAPSHOT_TTL = 60
+    cache = SnapshotCache("test", "TEST_SNAPSHOT_TTL")
+    yield cache
+    cache.clear()
+
+
+def test_get_caches_value(snapshot_cache, mocker):
+    """Test that the value is only fetched once within its lifetime."""
+    fetch = mocker.Mock(return_value=[1, 2, 3])
+
+    assert snapshot_cache.get(fetch) == [1, 2, 3]
+    assert snapshot_cache.get(fetch) == [1, 2, 3]
+    fetch.assert_called_once()
+    assert snapshot_cache.stats() == {"hits": 1, "misses": 1}
+
+
+def test_get_keys(snapshot_cache, mocker):
+    """Test that different keys are cached independently."""
+    fetch = mocker.Mock(side_effect=["a", "b"])
+
+    assert snapshot_cache.get(fetch, "key_a") == "a"
+    assert snapshot_cache.get(fetch, "key_b") == "b"
+    assert snapshot_cache.get(fetch, "key_a") == "a"
+    assert fetch.call_count == 2
+
+
+def test_get_expired(snapshot_cache, settings, mocker):
+    """Test that expired values are fetched again."""
+    settings.TEST_SNAPSHOT_TTL = 0.01
+    fetch = mocker.Mock(side_effect=["old", "new"])
+
+    assert snapshot_cache.get(fetch) == "old"
+    time.sleep(0.02)
+    assert snapshot_cache.get(fetch) == "new"
+    assert snapshot_cache.stats() == {"hits": 0, "misses": 2}
+
+
+def test_get_disabled(snapshot_cache, settings, mocker):
+    """Test that a zero lifetime disables the cache."""
+    settings.TEST_SNAPSHOT_TTL = 0
+    fetch = mocker.Mock(return_value="value")
+
+    snapshot_cache.get(fetch)
+    snapshot_cache.get(fetch)
+    assert fetch.call_count == 2
+
+
+def test_get_shared_between_processes(snapshot_cache, mocker):
+    """Test that values stored by another process in the Django cache are reused."""
+    fetch = mocker.Mock(return_value="value")
+    snapshot_cache.get(fetch)
+
+    other_process = SnapshotCache("test", "TEST_SNAPSHOT_TTL")
+    assert other_process.get(fetch) == "value"
+    fetch.assert_called_once()
+
+
+def test_get_prunes_expired(snapshot_cache, settings, mocker):
+    """Test that expired snapshots and their locks are dropped from memory."""
+    settings.TEST_SNAPSHOT_TTL = 0.01
+    fetch = mocker.Mock(return_value="value")
+
+    for key in ("a", "b", "c"):
+        snapshot_cache.get(fetch, key)
+    time.sleep(0.02)
+    snapshot_cache.get(fetch, "d")
+    assert list(snapshot_cache._entries) == ["d"]
+    assert list(snapshot_cache._key_locks) == ["d"]
+
+
+def test_get_prune_keeps_waited_lock(snapshot_cache, settings, mocker):
+    """Test that the lock of a key is kept while a thread waits for it."""
+    settings.TEST_SNAPSHOT_TTL = 0.01
+    fetch = mocker.Mock(return_value="value")
+    snapshot_cache.get(fetch, "a")
+    time.sleep(0.02)
+
+    with snapshot_cache._key_lock("a"):
+        # Another request prunes the expired snapshot, while "a" is in use
+        snapshot_cache.get(fetch, "b")
+        assert "a" in snapshot_cache._key_locks
+    snapshot_cache.get(fetch, "c")
+    assert "a" not in snapshot_cache._key_locks
+
+
+def test_get_logs_stats(snapshot_cache, mocker, caplog):
+    """Test that the hit and miss counters are logged."""
+    mocker.patch("interfaces.caching.STATS_INTERVAL", 0)
+    fetch = mocker.Mock(return_value="value")
+
+    with caplog.at_level("INFO", logger="interfaces.caching"):
+        snapshot_cache.get(fetch)
+        snapshot_cache.get(fetch)
+    assert caplog.messages[-1] == "Snapshot cache test: 1 hits, 1 misses."
+
+
+def test_get_max_entries(settings, mocker):
+    """Test that only the most recently used snapshots are kept in memory."""
+    settings.TEST_SNAPSHOT_TTL = 60
+    snapshot_cache = SnapshotCache("test_lru", "TEST_SNAPSHOT_TTL", max_entries=2)
+    fetch = mocker.Mock(return_value="value")
+
+    for key in ("a", "b", "a", "c"):
+        snapshot_cache.get(fetch, key)
+    assert list(snapshot_cache._entries) == ["a", "c"]
+    assert list(snapshot_cache._key_locks) == ["a", "c"]
+    snapshot_cache.clear()
+
+
+def test_invalidate(snapshot_cache, mocker):
+    """Test that invalidated values are fetched again."""
+    fetch = mocker.Mock(side_effect=["old", "new"])
+
+    assert snapshot_cache.get(fetch) == "old"
+    snapshot_cache.invalidate()
+    assert snapshot_cache.get(fetch) == "new"
+
+
+def test_get_single_flight(snapshot_cache):
+    """Test that concurrent requests share a single refresh."""
+    calls = []
+    release = threading.Event()
+
+    def fetch():
+        calls.append(1)
+        release.wait(timeout=5)
+        return "value"
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(snapshot_cache.get(fetch)))
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert results == ["value"] * 5
+    assert len(calls) == 1
@@ -18,6 +18,51 @@ def test_get_controller_driver(mocker):
     mock_token.assert_called_once()
     mock_driver.assert_called_once_with("uri", token="token")
 
+    # The driver is reused by later calls
+    assert get_controller_driver() is mock_driver.return_value
+    mock_driver.assert_called_once()
+
+
+def test_get_controller_status_reconnects(mocker):
+    """Test that a failed query reconnects to the controller and retries."""
+    from interfaces.controller_interface import get_controller_status
+
+    broken, working = mocker.MagicMock(), mocker.MagicMock()
+    broken.status.side_effect = RuntimeError("connection lost")
+    mock_driver = mocker.patch(
+        "interfaces.controller_interface.ControllerDriver",
+        side_effect=[broken, working],
+    )
+    mock_uri = mocker.patch(
+        "interfaces.controller_interface.get_controller_uri",
+        side_effect=["old_uri", "new_uri"],
+    )
+    mocker.patch("interfaces.controller_interface.create_dummy_token_from_uname")
+
+    assert get_controller_status() == working.status.return_value
+    assert mock_uri.call_count == 2
+    assert mock_driver.call_args.args == ("new_uri",)
+
+
+def test_send_event_failure_resets_connection(mocker):
+    """Test that a failed event is not retried but resets the connection."""
+    from interfaces.controller_interface import get_controller_driver, send_event
+
+    mock_driver = mocker.patch("interfaces.controller_interface.ControllerDriver")
+    mocker.patch("interfaces.controller_interface.get_controller_uri")
+    mocker.patch("interfaces.controller_interface.create_dummy_token_from_uname")
+    mocker.patch("interfaces.controller_interface.process_arguments")
+    mocker.patch("interfaces.controller_interface.FSMCommand")
+    controller = mock_driver.return_value
+    controller.execute_fsm_command.side_effect = RuntimeError("connection lost")
+
+    with pytest.raises(RuntimeError, match="connection lost"):
+        send_event("event", {})
+    controller.execute_fsm_command.assert_called_once()
+
+    get_controller_driver()
+    assert mock_driver.call_count == 2
+
 
 def test_get_controller_status(mocker):
     """Test the _boot_process function."""
@@ -221,3 +266,27 @@ def test_get_detectors(mocker):
     mock_controller().describe.return_value = root_status_with_none_child
     result = get_detectors()
     assert result == {"root": ""}
+
+
+def test_get_arguments_cached(mocker):
+    """Test that the FSM description is reused until the connection is reset."""
+    from interfaces.controller_interface import (
+        get_arguments,
+        get_fsm_schema_key,
+        reset_controller_connection,
+    )
+
+    command = mocker.MagicMock(arguments=["arg1"])
+    command.name = "event"
+    mock = mocker.patch("interfaces.controller_interface.get_controller_driver")
+    mock().describe_fsm.return_value.data.commands = [command]
+
+    key = get_fsm_schema_key()
+    assert get_arguments("event") == ["arg1"]
+    assert get_arguments("event") == ["arg1"]
+    mock().describe_fsm.assert_called_once()
+
+    reset_controller_connection()
+    assert get_fsm_schema_key() != key
+    assert get_arguments("event") == ["arg1"]
+    assert mock().describe_fsm.call_count == 2
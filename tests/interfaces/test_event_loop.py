@@ -0,0 +1,16 @@
+import asyncio
+import threading
+
+from interfaces import event_loop
+
+
+def test_run():
+    """Test that coroutines run in a single background event loop."""
+
+    async def get_loop_and_thread():
+        return asyncio.get_running_loop(), threading.current_thread()
+
+    loop, thread = event_loop.run(get_loop_and_thread())
+    assert thread is not threading.current_thread()
+    assert loop is event_loop.get_event_loop()
+    assert event_loop.run(get_loop_and_thread()) == (loop, thread)
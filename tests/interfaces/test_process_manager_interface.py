@@ -1,11 +1,14 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
 from django.conf import settings
 from druncschema.process_manager_pb2 import LogRequest, ProcessQuery, ProcessUUID
 from druncschema.token_pb2 import Token
 
 from interfaces.process_manager_interface import (
     boot_process,
-    get_process_logs,
     get_process_manager_driver,
+    stream_process_logs,
 )
 
 
@@ -30,6 +33,34 @@ def test_get_process_manager_driver(mocker):
     assert driver == mock_driver.return_value
 
 
+def test_get_process_manager_driver_pooled(mocker):
+    """Test that drivers are reused for the same user only."""
+    mock_driver = mocker.patch(
+        "interfaces.process_manager_interface.ProcessManagerDriver",
+        side_effect=lambda *args, **kwargs: mocker.MagicMock(),
+    )
+
+    driver = get_process_manager_driver("user1")
+    assert get_process_manager_driver("user1") is driver
+    assert get_process_manager_driver("user2") is not driver
+    assert mock_driver.call_count == 2
+
+
+def test_failed_call_discards_driver(mock_get_process_manager_driver):
+    """Test that the driver of a user is discarded and closed when a call fails."""
+    from interfaces.process_manager_interface import _drivers
+
+    driver = mock_get_process_manager_driver.return_value
+    driver.channel.close = AsyncMock()
+    _drivers["root"] = driver
+    driver.logs.side_effect = RuntimeError
+
+    with pytest.raises(RuntimeError):
+        list(stream_process_logs("1234", "root", 10))
+    assert "root" not in _drivers
+    driver.channel.close.assert_awaited_once()
+
+
 def test_boot_process(mock_get_process_manager_driver, dummy_session_data):
     """Test the boot_process function."""
     mock_driver = mock_get_process_manager_driver
@@ -40,14 +71,132 @@ def test_boot_process(mock_get_process_manager_driver, dummy_session_data):
     )
 
 
-def test_get_process_logs(mock_get_process_manager_driver):
-    """Test the get_process_logs function."""
+def test_stream_process_logs(mock_get_process_manager_driver):
+    """Test the stream_process_logs function."""
+
+    async def logs(request):
+        for i in range(250):
+            item = MagicMock()
+            item.data.line = f"line {i}"
+            yield item
+
     mock_driver = mock_get_process_manager_driver
-    get_process_logs("1234", "root")
+    mock_driver.return_value.logs.side_effect = logs
 
-    mock_driver.assert_called_once_with("root")
-    mock_logs = mock_driver.return_value.logs
+    lines = stream_process_logs("1234", "root", 250)
+    assert list(lines) == [f"line {i}" for i in range(250)]
 
     query = ProcessQuery(uuids=[ProcessUUID(uuid="1234")])
-    request = LogRequest(query=query, how_far=100)
-    mock_logs.assert_called_once_with(request)
+    request = LogRequest(query=query, how_far=250)
+    mock_driver.return_value.logs.assert_called_once_with(request)
+
+
+def test_get_session_info_cached(mocker):
+    """Test that get_session_info shares the process list between requests."""
+    from interfaces.process_manager_interface import (
+        get_session_info,
+        session_info_cache,
+    )
+
+    mock = mocker.patch(
+        "interfaces.process_manager_interface._get_session_info",
+        return_value="session_info",
+    )
+
+    assert get_session_info("user1") == "session_info"
+    assert get_session_info("user2") == "session_info"
+    mock.assert_called_once_with("user1")
+    assert session_info_cache.stats() == {"hits": 1, "misses": 1}
+
+
+def test_get_session_info_query(mocker):
+    """Test that the processes selected by each query are cached separately."""
+    from interfaces.process_manager_interface import get_session_info
+
+    mock = mocker.patch(
+        "interfaces.process_manager_interface._get_session_info",
+        side_effect=lambda username, query=None: query,
+    )
+
+    query = ProcessQuery(session="session1")
+    assert get_session_info("root", query) == query
+    assert get_session_info("root", ProcessQuery(session="session1")) == query
+    assert get_session_info("root") is None
+    assert mock.call_count == 2
+
+
+@pytest.mark.parametrize(
+    "column, search, expected",
+    [
+        ("", "app", None),
+        ("name", "", None),
+        ("name", "app.1", ProcessQuery(names=["(?i)app\\.1"])),
+        (
+            "uuid",
+            "9F3B6A0C-1D2E-4F5A-8B7C-6D5E4F3A2B1C",
+            ProcessQuery(
+                uuids=[ProcessUUID(uuid="9f3b6a0c-1d2e-4f5a-8b7c-6d5e4f3a2b1c")]
+            ),
+        ),
+        ("uuid", "9f3b6a0c", None),
+        ("session", "session1", None),
+        ("user", "user1", None),
+        ("status_code", "DEAD", None),
+        ("name", "app 1", None),
+        ("name", "session:session1", None),
+        ("name", "/^app/", None),
+    ],
+)
+def test_process_query(column, search, expected):
+    """Test the translation of process table searches into process queries."""
+    from interfaces.process_manager_interface import process_query
+
+    assert process_query(column, search) == expected
+
+
+def test_process_call_invalidates_session_info(mocker):
+    """Test that actions on processes discard the cached process list."""
+    from interfaces.process_manager_interface import (
+        ProcessAction,
+        get_session_info,
+        process_call,
+    )
+
+    mock = mocker.patch(
+        "interfaces.process_manager_interface._get_session_info",
+        return_value="session_info",
+    )
+    mocker.patch("interfaces.process_manager_interface._process_call")
+
+    get_session_info("root")
+    process_call(["1234"], ProcessAction.KILL, "root")
+    get_session_info("root")
+    assert mock.call_count == 2
+
+
+def test_process_call_restart(mock_get_process_manager_driver, settings):
+    """Test that processes are restarted concurrently, reporting failures."""
+    import asyncio
+
+    from interfaces.process_manager_interface import ProcessAction, process_call
+
+    settings.PROCESS_RESTART_CONCURRENCY = 2
+    running = 0
+    max_running = 0
+
+    async def restart(query):
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        if query.uuids[0].uuid == "2":
+            raise RuntimeError("failed")
+
+    mock_get_process_manager_driver.return_value.restart.side_effect = restart
+
+    results = process_call(["1", "2", "3"], ProcessAction.RESTART, "root")
+    assert results["1"] is None
+    assert isinstance(results["2"], RuntimeError)
+    assert results["3"] is None
+    assert max_running == 2
@@ -0,0 +1,174 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from main.ingest import MessageCoalescer, MessageWriter
+from main.models import DruncMessage
+
+
+def decode(record):
+    """Create a message from a fake record."""
+    if record.value is None:
+        raise ValueError("Invalid record")
+    return DruncMessage(
+        topic="control.test.process_manager",
+        timestamp=datetime.now(tz=timezone.utc),
+        message=record.value,
+    )
+
+
+def records(start, count):
+    """Create fake records with consecutive offsets."""
+    return [
+        SimpleNamespace(offset=offset, value=f"message {offset}")
+        for offset in range(start, start + count)
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.parametrize("pool", [False, True])
+def test_message_writer(pool):
+    """Test that records of all partitions are stored and their offsets reported."""
+    after_write = MagicMock()
+    decode_pool = ThreadPoolExecutor(2) if pool else None
+    writer = MessageWriter(decode, 100, 0.05, decode_pool, after_write=after_write)
+    writer.start()
+
+    writer.put("partition 0", records(0, 3))
+    writer.put("partition 1", [*records(10, 2), SimpleNamespace(offset=12, value=None)])
+    writer.stop()
+
+    assert sorted(DruncMessage.objects.values_list("message", flat=True)) == [
+        "message 0",
+        "message 1",
+        "message 10",
+        "message 11",
+        "message 2",
+    ]
+    assert writer.written() == {"partition 0": 3, "partition 1": 13}
+    assert writer.written() == {}
+    after_write.assert_called()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_message_writer_batch_size():
+    """Test that records are stored in batches of at most the batch size."""
+    writer = MessageWriter(decode, 2, 10)
+    writer._write = MagicMock(wraps=writer._write)
+    writer.start()
+    for start in range(0, 6, 2):
+        writer.put("partition", records(start, 2))
+    writer.stop()
+
+    assert DruncMessage.objects.count() == 6
+    assert [len(call.args[0]) for call in writer._write.call_args_list] == [2, 2, 2]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_message_writer_batch_size_split():
+    """Test that the records of a partition are split between batches if needed."""
+    writer = MessageWriter(decode, 2, 10)
+    writer._write = MagicMock(wraps=writer._write)
+    writer.start()
+    writer.put("partition 0", records(0, 3))
+    writer.put("partition 1", records(10, 2))
+    writer.stop()
+
+    assert DruncMessage.objects.count() == 5
+    assert [len(call.args[0]) for call in writer._write.call_args_list] == [2, 2, 1]
+    assert writer.written() == {"partition 0": 3, "partition 1": 12}
+
+
+@pytest.mark.django_db(transaction=True)
+def test_message_writer_coalesce():
+    """Test that identical messages are stored once, counting them."""
+    writer = MessageWriter(decode, 2, 10, coalesce_windows={"INFO": 60})
+    writer.start()
+    for offset in range(5):
+        writer.put("partition", [SimpleNamespace(offset=offset, value="spam")])
+    writer.put("partition", [SimpleNamespace(offset=5, value="other")])
+    writer.stop()
+
+    assert list(
+        DruncMessage.objects.order_by("id").values_list("message", "count")
+    ) == [
+        ("spam", 5),
+        ("other", 1),
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_message_writer_coalesce_revision():
+    """Test that messages updated by coalescing are given increasing revisions."""
+    writer = MessageWriter(decode, 1, 10, coalesce_windows={"INFO": 60})
+    writer.start()
+    writer.put("partition", [SimpleNamespace(offset=0, value="spam")])
+    writer.put("partition", [SimpleNamespace(offset=1, value="other")])
+    writer.put("partition", [SimpleNamespace(offset=2, value="spam")])
+    writer.put("partition", [SimpleNamespace(offset=3, value="spam")])
+    writer.stop()
+
+    assert list(
+        DruncMessage.objects.order_by("id").values_list("message", "revision")
+    ) == [
+        ("spam", 2),
+        ("other", 0),
+    ]
+
+
+def message(seconds, severity="INFO", text="spam"):
+    """Create a message received the given number of seconds after a fixed time."""
+    return DruncMessage(
+        topic="control.test.process_manager",
+        timestamp=datetime(2025, 1, 1, tzinfo=timezone.utc)
+        + timedelta(seconds=seconds),
+        severity=severity,
+        message=text,
+    )
+
+
+def test_message_coalescer():
+    """Test identical messages are coalesced within the window for their severity."""
+    coalescer = MessageCoalescer({"INFO": 10, "ERROR": 0})
+    first, other, error = message(0), message(1, text="other"), message(2, "ERROR")
+
+    created, updated = coalescer.add(
+        [first, other, message(3), error, message(4, "ERROR"), message(5, "DEBUG")]
+    )
+    assert created[:3] == [first, other, error]
+    assert len(created) == 5
+    assert updated == []
+    assert first.count == 2
+    assert first.timestamp == message(3).timestamp
+    assert first.first_seen == message(0).timestamp
+
+    # Saved messages are updated when later messages are coalesced with them
+    first.pk = 1
+    created, updated = coalescer.add([message(10), message(21)])
+    assert updated == [first]
+    assert first.count == 3
+    assert len(created) == 1
+    assert created[0].timestamp == message(21).timestamp
+
+
+def test_message_coalescer_sliding():
+    """Test the window slides with each message coalesced, for continuous repeats."""
+    coalescer = MessageCoalescer({"INFO": 10})
+    first = message(0)
+
+    created, _ = coalescer.add([first, *(message(seconds) for seconds in (8, 16, 24))])
+    assert created == [first]
+    assert first.count == 4
+
+    created, _ = coalescer.add([message(40)])
+    assert len(created) == 1
+
+
+def test_message_writer_stopped():
+    """Test that records cannot be queued if the writer is not running."""
+    writer = MessageWriter(decode, 2, 0.05)
+    with pytest.raises(RuntimeError):
+        writer.put("partition", records(0, 1))
@@ -0,0 +1,119 @@
+import os
+import socket
+from datetime import datetime, timezone
+
+import pytest
+from django.core.management import call_command
+
+from main import jobs
+from main.models import Job
+
+
+@pytest.mark.django_db
+def test_submit_inline():
+    """Test that jobs run straight away without workers, recording their progress."""
+
+    def function(job):
+        job.add_progress("step 1")
+        job.add_progress("step 2")
+
+    job = jobs.submit("name", "user", function)
+    job.refresh_from_db()
+    assert job.name == "name"
+    assert job.username == "user"
+    assert job.status == Job.SUCCEEDED
+    assert job.progress == "step 1\nstep 2\n"
+    assert job.finished is not None
+    assert job.done
+    assert job.worker == f"{socket.gethostname()}:{os.getpid()}"
+
+
+@pytest.mark.django_db
+def test_submit_failed():
+    """Test that jobs raising an exception are marked as failed."""
+
+    def function(job):
+        raise RuntimeError("oops")
+
+    job = jobs.submit("name", "user", function)
+    job.refresh_from_db()
+    assert job.status == Job.FAILED
+    assert job.error == "oops"
+    assert job.done
+
+
+@pytest.mark.django_db
+def test_submit_workers(settings, mocker, django_capture_on_commit_callbacks):
+    """Test that jobs are handed to the workers once the transaction is committed."""
+    settings.JOB_WORKERS = 2
+    workers = mocker.patch("main.jobs._workers")
+    function = mocker.MagicMock()
+
+    with django_capture_on_commit_callbacks(execute=True):
+        job = jobs.submit("name", "user", function)
+        workers.executor.submit.assert_not_called()
+
+    workers.executor.submit.assert_called_once_with(
+        jobs._run_in_worker, job.pk, function
+    )
+    assert job.status == Job.PENDING
+    function.assert_not_called()
+
+
+@pytest.mark.django_db
+def test_fail_orphaned_jobs(mocker):
+    """Test that only the unfinished jobs of stopped processes are marked as failed."""
+    host = socket.gethostname()
+    mocker.patch("main.jobs.os.kill", side_effect=ProcessLookupError)
+    stopped = Job.objects.create(name="stopped", worker=f"{host}:1234")
+    restarted = Job.objects.create(name="restarted", worker=f"{host}:{os.getpid()}")
+    other_host = Job.objects.create(name="other", worker="other-host:1234")
+    finished = Job.objects.create(
+        name="finished",
+        worker=f"{host}:1234",
+        status=Job.SUCCEEDED,
+        finished=datetime.now(tz=timezone.utc),
+    )
+
+    assert jobs.fail_orphaned_jobs() == 2
+    for job in (stopped, restarted, other_host, finished):
+        job.refresh_from_db()
+    assert stopped.status == restarted.status == Job.FAILED
+    assert stopped.finished is not None
+    assert stopped.error == "The server process running the job stopped."
+    assert other_host.status == Job.PENDING
+    assert finished.status == Job.SUCCEEDED
+
+
+@pytest.mark.django_db
+def test_fail_orphaned_jobs_running(mocker):
+    """Test that the jobs of processes still running are left alone."""
+    kill = mocker.patch("main.jobs.os.kill")
+    job = Job.objects.create(name="running", worker=f"{socket.gethostname()}:1234")
+
+    assert jobs.fail_orphaned_jobs() == 0
+    kill.assert_called_once_with(1234, 0)
+    job.refresh_from_db()
+    assert job.status == Job.PENDING
+
+
+@pytest.mark.django_db
+def test_recover_jobs_command(mocker):
+    """Test that the recover_jobs command fails orphaned and purges expired jobs."""
+    fail = mocker.patch("main.jobs.fail_orphaned_jobs", return_value=0)
+    purge = mocker.patch("main.jobs.purge_expired_jobs")
+
+    call_command("recover_jobs")
+    fail.assert_called_once_with()
+    purge.assert_called_once_with()
+
+
+@pytest.mark.django_db
+def test_add_progress(django_assert_num_queries):
+    """Test that each line of progress is recorded with a single query."""
+    job = Job.objects.create(name="name", username="user")
+    job.add_progress("step 1")
+
+    with django_assert_num_queries(1):
+        job.add_progress("step 2")
+    assert Job.objects.get(pk=job.pk).progress == "step 1\nstep 2\n"
@@ -0,0 +1,38 @@
+import pytest
+from kafka.structs import TopicPartition
+
+from main.management.commands.kafka_consumer import Command, offset_to_commit
+
+
+def test_offset_to_commit():
+    """Test offsets are created with the fields of the installed kafka-python."""
+    offset = offset_to_commit(42)
+    assert offset.offset == 42
+    assert offset.metadata == ""
+
+
+def test_consume_commits_offsets(mocker):
+    """Test the offsets of the messages stored are committed to the consumer group."""
+    consumer = mocker.patch(
+        "main.management.commands.kafka_consumer.KafkaConsumer"
+    ).return_value
+    writer = mocker.patch(
+        "main.management.commands.kafka_consumer.MessageWriter"
+    ).return_value
+    partition = TopicPartition("erscontrol.session", 0)
+    writer.written.side_effect = [{partition: 6}, {}]
+    consumer.poll.side_effect = [{}, RuntimeError("stop")]
+
+    with pytest.raises(RuntimeError):
+        Command().consume(
+            debug=False,
+            batch_size=10,
+            flush_ms=10,
+            decode_workers=0,
+            group_id="drunc-ui",
+            purge=False,
+        )
+
+    consumer.commit.assert_called_once_with({partition: offset_to_commit(6)})
+    writer.stop.assert_called_once()
+    consumer.close.assert_called_once_with(autocommit=False)
@@ -0,0 +1,102 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from django.core.cache import cache
+
+from main.live import get_live_tail, publish_messages
+from main.models import DruncMessage
+
+
+@pytest.fixture(autouse=True)
+def live_tail(settings):
+    """Enable the live tail, starting empty."""
+    settings.MESSAGE_LIVE_BUFFER_SIZE = 3
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def stored_messages(*texts, topic="control.test.process_manager"):
+    """Create and save messages with the given texts, one second apart."""
+    t = datetime.now(tz=timezone.utc)
+    return DruncMessage.objects.bulk_create(
+        DruncMessage(topic=topic, timestamp=t + timedelta(seconds=i), message=text)
+        for i, text in enumerate(texts)
+    )
+
+
+@pytest.mark.django_db
+def test_live_tail():
+    """Test that only the last messages published to a topic group are kept."""
+    messages = stored_messages("a", "b", "c", "d")
+    stored_messages("other", topic="erscontrol.test.app")
+    assert get_live_tail("PROCMAN") is None
+
+    publish_messages(messages[:2])
+    publish_messages(messages[2:])
+
+    tail = get_live_tail("PROCMAN")
+    assert [m.message for m in tail.messages] == ["d", "c", "b"]
+    assert [m.pk for m in tail.messages] == [m.pk for m in messages[:0:-1]]
+    assert tail.first_id == messages[1].pk
+    assert get_live_tail("ERSCONTROL") is None
+
+
+@pytest.mark.django_db
+def test_live_tail_republished():
+    """Test that messages published again replace their previous version."""
+    messages = stored_messages("a", "b")
+    publish_messages(messages)
+    messages[0].count, messages[0].revision = 5, 1
+    publish_messages([], messages[:1])
+
+    tail = get_live_tail("PROCMAN")
+    assert [(m.message, m.count, m.revision) for m in tail.messages] == [
+        ("b", 1, 0),
+        ("a", 5, 1),
+    ]
+
+
+@pytest.mark.django_db
+def test_live_tail_republished_first_id():
+    """Test that messages published again do not extend the complete range."""
+    messages = stored_messages("a", "b", "c", "d", "e")
+    publish_messages(messages)
+    publish_messages([], messages[:1])
+
+    tail = get_live_tail("PROCMAN")
+    assert [m.message for m in tail.messages] == ["e", "d", "a"]
+    assert tail.first_id == messages[3].pk
+
+
+@pytest.mark.django_db
+def test_live_tail_bounded():
+    """Test that the cache holds one entry per slot of the buffer per topic group."""
+    messages = stored_messages(*"abcdefg")
+    for message in messages:
+        publish_messages([message])
+
+    assert len(cache._cache) == 1 + 3  # the counter and the slots
+    tail = get_live_tail("PROCMAN")
+    assert [m.message for m in tail.messages] == ["g", "f", "e"]
+    assert tail.first_id == messages[4].pk
+
+
+@pytest.mark.django_db
+def test_live_tail_filter():
+    """Test filtering the live tail by search and severity."""
+    messages = stored_messages("Run started", "Run stopped", "Other")
+    messages[1].severity = "ERROR"
+    publish_messages(messages)
+
+    tail = get_live_tail("PROCMAN")
+    assert [m.message for m in tail.filter("run")] == ["Run stopped", "Run started"]
+    assert [m.message for m in tail.filter("run", "ERROR")] == ["Run stopped"]
+
+
+@pytest.mark.django_db
+def test_live_tail_disabled(settings):
+    """Test that the live tail is not used when disabled."""
+    publish_messages(stored_messages("a"))
+    settings.MESSAGE_LIVE_BUFFER_SIZE = 0
+    assert get_live_tail("PROCMAN") is None
@@ -0,0 +1,69 @@
+from datetime import datetime, timezone
+
+import pytest
+from django.db import connection
+
+from main.models import DruncMessage
+
+
+def explain(queryset) -> str:
+    """Get the query plan of a queryset, favouring indexes even for small tables."""
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute("SET enable_seqscan = off")
+    return queryset.explain()
+
+
+@pytest.mark.django_db
+class TestDruncMessageIndexes:
+    """Check the queries on messages use the indexes rather than scan the table."""
+
+    def test_expired(self):
+        """Test expired messages are found using the timestamp index."""
+        now = datetime.now(tz=timezone.utc)
+        plan = explain(DruncMessage.objects.filter(timestamp__lt=now))
+        assert "main_message_timestamp_idx" in plan
+
+    def test_feed(self):
+        """Test the feed of a topic group is found using the group index."""
+        records = DruncMessage.objects.filter(topic_group="PROCMAN")
+        plan = explain(records.order_by("-timestamp"))
+        assert "main_message_group_idx" in plan
+        assert "TEMP B-TREE" not in plan
+
+    def test_session(self):
+        """Test the messages of a session are found using the session index."""
+        records = DruncMessage.objects.filter(session="test")
+        plan = explain(records.order_by("-timestamp"))
+        assert "main_message_session_idx" in plan
+
+    def test_topic(self):
+        """Test the messages of a topic are found using the topic index."""
+        records = DruncMessage.objects.filter(topic="control.test.process_manager")
+        plan = explain(records.order_by("-timestamp"))
+        assert "main_message_topic_idx" in plan
+
+    def test_severity(self):
+        """Test the messages of a severity are found using the severity index."""
+        plan = explain(
+            DruncMessage.objects.filter(severity="ERROR").order_by("-timestamp")
+        )
+        assert "main_message_severity_idx" in plan
+
+
+@pytest.mark.django_db
+def test_classify():
+    """Test messages are classified by topic whichever way they are created."""
+    timestamp = datetime.now(tz=timezone.utc)
+    DruncMessage.objects.bulk_create(
+        [
+            DruncMessage(topic="control.s1.process_manager", timestamp=timestamp),
+            DruncMessage(topic="erscontrol.s2.controller", timestamp=timestamp),
+        ]
+    )
+    DruncMessage.objects.create(topic="unknown", timestamp=timestamp)
+
+    assert list(
+        DruncMessage.objects.order_by("id").values_list("topic_group", "session")
+    ) == [("PROCMAN", "s1"), ("ERSCONTROL", "s2"), ("", "")]
+    assert set(DruncMessage.objects.values_list("first_seen", flat=True)) == {timestamp}
@@ -0,0 +1,70 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from main.models import DruncMessage, Job
+from main.purge import purge_expired_jobs, purge_expired_messages, purge_messages
+
+
+def create_messages(*ages):
+    """Create messages received the given number of seconds ago."""
+    now = datetime.now(tz=timezone.utc)
+    return DruncMessage.objects.bulk_create(
+        DruncMessage(
+            topic="control.test.process_manager",
+            timestamp=now - timedelta(seconds=age),
+            message=f"message {age}",
+        )
+        for age in ages
+    )
+
+
+@pytest.mark.django_db
+def test_purge_messages():
+    """Test that only messages older than the given time are deleted, in chunks."""
+    messages = create_messages(50, 40, 5, 30, 20, 10)
+
+    stats = purge_messages(datetime.now(tz=timezone.utc) - timedelta(seconds=15), 2)
+
+    assert stats.deleted == 4
+    # Ids of the expired messages span 5 ids, hence 3 chunks of 2
+    assert stats.chunks == 3
+    assert stats.duration >= 0
+    assert list(DruncMessage.objects.order_by("id")) == [messages[2], messages[5]]
+
+
+@pytest.mark.django_db
+def test_purge_messages_none():
+    """Test purging when no message expired."""
+    create_messages(5)
+    stats = purge_messages(datetime.now(tz=timezone.utc) - timedelta(seconds=15), 2)
+    assert (stats.deleted, stats.chunks) == (0, 0)
+    assert DruncMessage.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_purge_expired_messages(settings):
+    """Test that the expiry time and chunk size are taken from the settings."""
+    settings.MESSAGE_EXPIRE_SECS = 15
+    settings.MESSAGE_PURGE_CHUNK_SIZE = 10
+    create_messages(20, 5)
+
+    stats = purge_expired_messages()
+
+    assert (stats.deleted, stats.chunks) == (1, 1)
+    assert DruncMessage.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_purge_expired_jobs(settings):
+    """Test that only the jobs finished before the expiry time are deleted."""
+    settings.JOB_EXPIRE_SECS = 15
+    now = datetime.now(tz=timezone.utc)
+    Job.objects.create(name="old", finished=now - timedelta(seconds=20)).add_progress(
+        "done"
+    )
+    recent = Job.objects.create(name="recent", finished=now - timedelta(seconds=10))
+    running = Job.objects.create(name="running")
+
+    assert purge_expired_jobs() == 1
+    assert set(Job.objects.all()) == {recent, running}
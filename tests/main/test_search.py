@@ -0,0 +1,101 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from main import search as search_module
+from main.models import DruncMessage
+from main.search import message_matches, search_messages
+
+
+@pytest.fixture
+def messages():
+    """Create some messages to search."""
+    timestamp = datetime.now(tz=timezone.utc)
+    return DruncMessage.objects.bulk_create(
+        DruncMessage(
+            topic="control.test.process_manager", timestamp=timestamp, message=m
+        )
+        for m in ["Run number 12 started", "Started run", "Number of runs: 3"]
+    )
+
+
+def search(text):
+    """Get the text of the messages matching a search."""
+    return sorted(m.message for m in search_messages(DruncMessage.objects.all(), text))
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("full_text", [True, False])
+def test_search_messages(messages, settings, full_text):
+    """Test searching messages by words, with or without the full-text index."""
+    settings.MESSAGE_FULL_TEXT_SEARCH = full_text
+    assert search("") == sorted(m.message for m in messages)
+    assert search("START") == ["Run number 12 started", "Started run"]
+    assert search("of runs") == ["Number of runs: 3"]
+    assert search("not there") == []
+
+
+@pytest.mark.django_db
+def test_search_messages_full_text(messages):
+    """Test full-text specific searches and that the index is kept up to date."""
+    assert search("number run") == ["Number of runs: 3", "Run number 12 started"]
+    assert search('"run number"') == ["Run number 12 started"]
+    assert search("runs") == ["Number of runs: 3"]
+
+    messages[0].message = "Run stopped"
+    messages[0].save()
+    assert search("stopped") == ["Run stopped"]
+    assert search("12") == []
+
+    DruncMessage.objects.filter(message="Started run").delete()
+    assert search("started") == []
+
+
+@pytest.mark.django_db
+def test_has_fts_table(mocker):
+    """Test that the FTS5 table is looked for again only if it was missing long ago."""
+    mocker.patch.object(search_module, "_fts_tables", {})
+    table_names = mocker.patch.object(
+        search_module.connection.introspection, "table_names", return_value=[]
+    )
+    assert not search_module._has_fts_table()
+    assert not search_module._has_fts_table()
+    assert table_names.call_count == 1
+
+    mocker.patch.object(search_module, "FTS_RECHECK_SECS", 0)
+    table_names.return_value = [search_module.FTS_TABLE]
+    assert search_module._has_fts_table()
+    assert search_module._has_fts_table()
+    assert table_names.call_count == 2
+
+
+@pytest.mark.django_db
+def test_message_matches_without_fts_table(messages, mocker):
+    """Test that messages are matched by substring if the FTS5 table is missing."""
+    mocker.patch.object(search_module, "_has_fts_table", return_value=False)
+    assert not search_module.full_text_search("runs started")
+    assert search("of runs") == ["Number of runs: 3"]
+    assert search("runs of") == []
+    assert not message_matches("Number of runs: 3", "runs of", False)
+
+
+@pytest.mark.django_db
+def test_search_messages_fallback(messages):
+    """Test searching by substring when there are no words to search for."""
+    assert search(":") == ["Number of runs: 3"]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("full_text", [True, False])
+def test_message_matches(messages, settings, full_text):
+    """Test searching messages in memory matches the same messages as the database."""
+    settings.MESSAGE_FULL_TEXT_SEARCH = full_text
+    searches = ["", "START", "of runs", "not there", ":"]
+    if full_text:
+        searches += ["number run", '"run number"', "runs", '"number run"']
+    for text in searches:
+        assert search(text) == sorted(
+            m.message
+            for m in messages
+            if message_matches(m.message, text, search_module.full_text_search(text))
+        )
@@ -2,10 +2,12 @@ from datetime import datetime, timedelta, timezone
 from http import HTTPStatus
 
 import pytest
+from django.core.cache import cache
 from django.urls import reverse
 from pytest_django.asserts import assertTemplateUsed
 
-from main.models import DruncMessage
+from main.live import publish_messages
+from main.models import DruncMessage, Job
 from main.tables import DruncMessageTable
 
 from ...utils import LoginRequiredTest
@@ -120,3 +122,207 @@ class TestMessagesView(LoginRequiredTest):
         table = response.context["table"]
         table_data = list(table.data)
         assert len(table_data) == 0
+
+    def test_get_not_modified(self, auth_client):
+        """Test that the messages are only sent again if they changed."""
+        DruncMessage.objects.create(
+            topic=self.topic,
+            timestamp=datetime.now(tz=timezone.utc),
+            message="message 0",
+        )
+        response = auth_client.get(self.endpoint)
+        assert response.status_code == HTTPStatus.OK
+        etag = response["ETag"]
+
+        response = auth_client.get(self.endpoint, headers={"If-None-Match": etag})
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+        response = auth_client.get(
+            self.endpoint, data={"search": "1"}, headers={"If-None-Match": etag}
+        )
+        assert response.status_code == HTTPStatus.OK
+
+        DruncMessage.objects.create(
+            topic=self.topic,
+            timestamp=datetime.now(tz=timezone.utc),
+            message="message 1",
+        )
+        response = auth_client.get(self.endpoint, headers={"If-None-Match": etag})
+        assert response.status_code == HTTPStatus.OK
+
+    def create_messages(self, count, start=0):
+        """Create messages one second apart, numbered from start."""
+        t = datetime.now(tz=timezone.utc)
+        return DruncMessage.objects.bulk_create(
+            DruncMessage(
+                topic=self.topic,
+                timestamp=t + timedelta(seconds=i),
+                message=f"message {i}",
+            )
+            for i in range(start, start + count)
+        )
+
+    def test_get_first_page(self, auth_client, settings):
+        """Test that only the most recent messages are rendered at first."""
+        settings.MESSAGE_PAGE_SIZE = 2
+        messages = self.create_messages(3)
+
+        response = auth_client.get(self.endpoint)
+        assert response.status_code == HTTPStatus.OK
+        assert list(response.context["table"].data) == messages[:0:-1]
+        assert response.context["more"]
+        assert response.context["last_id"] == messages[1].pk
+
+    def test_get_older(self, auth_client, settings):
+        """Test getting the messages before the last one displayed."""
+        settings.MESSAGE_PAGE_SIZE = 2
+        messages = self.create_messages(3)
+        # Same timestamp as the cursor but received before it
+        messages[0].timestamp = messages[1].timestamp
+        messages[0].save()
+
+        with assertTemplateUsed("main/partials/message_rows.html"):
+            response = auth_client.get(
+                self.endpoint, data={"before_id": messages[1].pk}
+            )
+        assert response.status_code == HTTPStatus.OK
+        assert list(response.context["table"].data) == [messages[0]]
+        assert not response.context["more"]
+
+    def test_get_newer(self, auth_client, settings):
+        """Test getting the messages received since the latest one displayed."""
+        settings.MESSAGE_PAGE_SIZE = 2
+        messages = self.create_messages(3)
+
+        with assertTemplateUsed("main/partials/message_rows.html"):
+            response = auth_client.get(self.endpoint, data={"after_id": messages[0].pk})
+        assert response.status_code == HTTPStatus.OK
+        assert list(response.context["table"].data) == messages[:0:-1]
+        assert f'data-id="{messages[2].pk}"' in response.content.decode()
+
+        response = auth_client.get(self.endpoint, data={"after_id": messages[2].pk})
+        assert response.status_code == HTTPStatus.NO_CONTENT
+
+    def test_get_updated(self, auth_client, settings):
+        """Test getting the messages updated since the latest revision displayed."""
+        settings.MESSAGE_PAGE_SIZE = 2
+        messages = self.create_messages(3)
+        DruncMessage.objects.filter(pk=messages[0].pk).update(count=2, revision=1)
+
+        response = auth_client.get(
+            self.endpoint, data={"after_id": messages[2].pk, "after_revision": 0}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert [(m.pk, m.count) for m in response.context["table"].data] == [
+            (messages[0].pk, 2)
+        ]
+        assert 'data-revision="1"' in response.content.decode()
+
+        response = auth_client.get(
+            self.endpoint, data={"after_id": messages[2].pk, "after_revision": 1}
+        )
+        assert response.status_code == HTTPStatus.NO_CONTENT
+
+    def test_get_newer_too_many(self, auth_client, settings):
+        """Test that the feed is reloaded if too many messages were received."""
+        settings.MESSAGE_PAGE_SIZE = 2
+        messages = self.create_messages(4)
+
+        with assertTemplateUsed("main/partials/message_items.html"):
+            response = auth_client.get(self.endpoint, data={"after_id": messages[0].pk})
+        assert response.status_code == HTTPStatus.OK
+        assert response["HX-Retarget"] == "#message-list"
+        assert list(response.context["table"].data) == messages[:1:-1]
+
+    def test_get_live(self, auth_client, settings, django_assert_num_queries):
+        """Test that recent messages are served from the live tail without queries."""
+        settings.MESSAGE_PAGE_SIZE = 2
+        settings.MESSAGE_LIVE_BUFFER_SIZE = 3
+        cache.clear()
+        messages = self.create_messages(3)
+        publish_messages(messages)
+        auth_client.get(self.endpoint)  # load the session and user
+
+        with django_assert_num_queries(2):  # session and user only
+            response = auth_client.get(self.endpoint)
+        assert list(response.context["table"].data) == messages[:0:-1]
+
+        with django_assert_num_queries(2):
+            response = auth_client.get(self.endpoint, data={"after_id": messages[1].pk})
+        assert list(response.context["table"].data) == [messages[2]]
+
+        messages[1].count, messages[1].revision = 2, 1
+        publish_messages([], messages[1:2])
+        with django_assert_num_queries(2):
+            response = auth_client.get(
+                self.endpoint, data={"after_id": messages[2].pk, "after_revision": 0}
+            )
+        assert [(m.pk, m.count) for m in response.context["table"].data] == [
+            (messages[1].pk, 2)
+        ]
+        cache.clear()
+
+    def test_get_live_republished(self, auth_client, settings):
+        """Test that messages missing from the live tail are taken from the database.
+
+        A message published again must not make the live tail look complete from its
+        id, when messages published after it were dropped from the tail since.
+        """
+        settings.MESSAGE_PAGE_SIZE = 5
+        settings.MESSAGE_LIVE_BUFFER_SIZE = 3
+        cache.clear()
+        messages = self.create_messages(5)
+        publish_messages(messages)
+        publish_messages([], messages[:1])
+
+        response = auth_client.get(self.endpoint, data={"after_id": messages[1].pk})
+        assert list(response.context["table"].data) == messages[:1:-1]
+        cache.clear()
+
+
+class TestJobsView(LoginRequiredTest):
+    """Test the main.views.jobs view function."""
+
+    endpoint = reverse("main:jobs")
+
+    def test_get(self, auth_client):
+        """Test that only the unfinished and recently finished jobs are listed."""
+        now = datetime.now(tz=timezone.utc)
+        running = Job.objects.create(name="running", username="user")
+        recent = Job.objects.create(name="recent", username="user", finished=now)
+        Job.objects.create(
+            name="old", username="user", finished=now - timedelta(hours=1)
+        )
+        Job.objects.create(name="other", username="other")
+
+        with assertTemplateUsed("main/partials/jobs.html"):
+            response = auth_client.get(self.endpoint)
+        assert response.status_code == HTTPStatus.OK
+        assert list(response.context["jobs"]) == [recent, running]
+
+
+class TestJobView(LoginRequiredTest):
+    """Test the main.views.job view function."""
+
+    endpoint = reverse("main:job", args=[1])
+
+    def test_get(self, auth_client):
+        """Test that the job is displayed, triggering an event once finished."""
+        job = Job.objects.create(name="job", username="user", status=Job.RUNNING)
+        endpoint = reverse("main:job", args=[job.pk])
+
+        response = auth_client.get(endpoint)
+        assert response.status_code == HTTPStatus.OK
+        assert response.context["job"] == job
+        assert "HX-Trigger" not in response
+
+        job.status = Job.SUCCEEDED
+        job.save()
+        response = auth_client.get(endpoint)
+        assert response["HX-Trigger"] == "jobFinished"
+
+    def test_get_other_user(self, auth_client):
+        """Test that the jobs of other users are not found."""
+        job = Job.objects.create(name="job", username="other")
+        response = auth_client.get(reverse("main:job", args=[job.pk]))
+        assert response.status_code == HTTPStatus.NOT_FOUND
@@ -1,8 +1,10 @@
+from http import HTTPStatus
 from unittest import mock
 
 from django.template.loader import render_to_string
 from django.test import RequestFactory, TestCase
 
+from main.views.utils import fingerprint, render_if_modified
 from process_manager.views.partials import handle_errors
 
 
@@ -31,3 +33,35 @@ class HandleErrorsTest(TestCase):
         mock_logger.exception.assert_called_once()
 
         self.assertEqual(response.status_code, 200)
+
+
+def test_fingerprint():
+    """Test that the fingerprint only changes with the data."""
+    assert fingerprint("user", [1, 2]) == fingerprint("user", [1, 2])
+    assert fingerprint("user", [1, 2]) != fingerprint("user", [1, 3])
+    assert fingerprint("user").startswith('"')
+
+
+def test_render_if_modified(rf, mocker):
+    """Test that the template is only rendered if the ETag changed."""
+    context = mocker.MagicMock(return_value={})
+    etag = fingerprint("data")
+    template_name = "main/error_message.html"
+
+    response = render_if_modified(rf.get("/"), etag, template_name, context)
+    assert response.status_code == HTTPStatus.OK
+    assert response["ETag"] == etag
+    assert "no-cache" in response["Cache-Control"]
+    context.assert_called_once()
+
+    context.reset_mock()
+    request = rf.get("/", headers={"If-None-Match": etag})
+    response = render_if_modified(request, etag, template_name, context)
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    assert response["ETag"] == etag
+    context.assert_not_called()
+
+    request = rf.get("/", headers={"If-None-Match": fingerprint("old data")})
+    response = render_if_modified(request, etag, template_name, context)
+    assert response.status_code == HTTPStatus.OK
+    context.assert_called_once()
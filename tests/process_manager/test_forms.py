@@ -1,6 +1,7 @@
 from django import forms
 
-from process_manager.forms import BootProcessForm
+from process_manager.forms import BootProcessForm, ProcessFilterForm
+from process_manager.snapshot import ProcessFilter
 
 
 def test_boot_form_empty():
@@ -30,3 +31,22 @@ def test_boot_form_with_data(dummy_session_data):
     assert form.cleaned_data["n_processes"] == 1
     assert form.cleaned_data["sleep"] == 5
     assert form.cleaned_data["n_sleeps"] == 4
+
+
+def test_process_filter_form():
+    """Test the form selecting processes by their properties."""
+    form = ProcessFilterForm(
+        data={"session": "run-a", "name": "^df-", "status": "DEAD"}
+    )
+    assert form.is_valid()
+    assert form.process_filter() == ProcessFilter(
+        session="run-a", name="^df-", status="DEAD"
+    )
+
+    form = ProcessFilterForm(data={"name": "df-[", "status": "ASLEEP"})
+    assert not form.is_valid()
+    assert set(form.errors) == {"name", "status"}
+
+    form = ProcessFilterForm(data={"session": "", "status": ""})
+    assert not form.is_valid()
+    assert form.non_field_errors() == ["Select processes by at least one criterion."]
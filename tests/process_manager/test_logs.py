@@ -0,0 +1,54 @@
+from process_manager.logs import (
+    ANCHOR_LINES,
+    LogLine,
+    anchored_lines,
+    last_lines,
+    lines_after,
+    lines_before,
+)
+
+
+def test_log_line():
+    """Test the properties of a log line."""
+    assert LogLine(" \n").blank
+    assert not LogLine("a").blank
+
+
+def test_anchored_lines():
+    """Test that lines are identified along with the lines before them."""
+    anchors = [line.anchor for line in anchored_lines(["a", "b", "a", "a", "b"])]
+    assert len(set(anchors)) == 5
+
+    # Only the last ANCHOR_LINES lines are covered by an anchor
+    lines = ["x", *["a"] * ANCHOR_LINES]
+    anchors = [line.anchor for line in anchored_lines(lines)]
+    assert anchors[-1] != anchors[-2]
+    assert [line.anchor for line in anchored_lines([*lines, "a"])][-1] == anchors[-1]
+
+
+def test_last_lines():
+    """Test that the last lines are returned with their anchors."""
+    lines = ["a", "b", "c"]
+    assert last_lines(lines, 2) == list(anchored_lines(lines))[1:]
+
+
+def test_lines_before():
+    """Test that the lines already displayed are left out."""
+    lines = ["a", "b", "c", "d"]
+    assert [line.text for line in lines_before(lines, 0)] == lines
+    assert [line.text for line in lines_before(lines, 3)] == ["a"]
+    assert list(lines_before(lines, 10)) == []
+
+
+def test_lines_after():
+    """Test that only the lines after the last one displayed are returned."""
+    displayed = ["a", "b", "a"]
+    anchor = last_lines(displayed, 1)[0].anchor
+    lines = [*displayed, "a", "a", "c"]
+    assert [line.text for line in lines_after(lines, anchor)] == ["a", "a", "c"]
+    assert lines_after(lines, last_lines(lines, 1)[0].anchor) == []
+
+
+def test_lines_after_not_found():
+    """Test that None is returned if the last line displayed is not found."""
+    assert lines_after(["a", "b"], LogLine("x", "unknown").anchor) is None
@@ -0,0 +1,176 @@
+from unittest.mock import MagicMock
+
+import pytest
+from druncschema.process_manager_pb2 import ProcessQuery
+
+from process_manager.snapshot import (
+    ProcessFilter,
+    ProcessSnapshot,
+    get_process_snapshot,
+)
+
+rows = [
+    {"uuid": "1", "name": "ru-01", "session": "run-a", "exit_code": 0},
+    {"uuid": "2", "name": "df-01", "session": "run-a", "exit_code": 1},
+    {"uuid": "3", "name": "df-02", "session": "run-b", "exit_code": 0},
+]
+
+
+def test_filter():
+    """Test searching the rows of a snapshot."""
+    snapshot = ProcessSnapshot(rows)
+
+    assert snapshot.filter("") is rows
+    assert snapshot.filter("DF") == rows[1:]
+    assert snapshot.filter("df run-a") == [rows[1]]
+    assert snapshot.filter("exit_code:1") == [rows[1]]
+    assert snapshot.filter("a", "session") == rows[:2]
+    assert snapshot.filter("/^D.-0[2-9]$/", "name") == [rows[2]]
+    assert snapshot.filter("/[/") == []
+
+
+process_1 = {
+    "uuid": "1",
+    "name": "Process1",
+    "user": "user1",
+    "session": "session1",
+    "status_code": "running",
+    "exit_code": 0,
+}
+process_2 = {
+    "uuid": "2",
+    "name": "Process2",
+    "user": "user2",
+    "session": "session2",
+    "status_code": "completed",
+    "exit_code": 0,
+}
+
+
+@pytest.mark.parametrize(
+    "search, column, table, expected",
+    [
+        pytest.param(
+            "",
+            "",
+            [process_1, process_2],
+            [process_1, process_2],
+            id="no search",
+        ),
+        pytest.param(
+            "Process1",
+            "",
+            [process_1, process_2],
+            [process_1],
+            id="search all columns",
+        ),
+        pytest.param(
+            "Process1",
+            "name",
+            [process_1, process_2],
+            [process_1],
+            id="search specific column",
+        ),
+        pytest.param(
+            "Process1",
+            "nonexistent",
+            [process_1, process_2],
+            [process_1],
+            id="search non-existent column",
+        ),
+        pytest.param(
+            "Process1",
+            "",
+            [],
+            [],
+            id="filter empty table",
+        ),
+        pytest.param(
+            "process1",
+            "",
+            [process_1, process_2],
+            [process_1],
+            id="search case insensitive",
+        ),
+        pytest.param(
+            "process user2",
+            "",
+            [process_1, process_2],
+            [process_2],
+            id="search all terms",
+        ),
+        pytest.param(
+            "session:1",
+            "name",
+            [process_1, process_2],
+            [process_1],
+            id="search column term",
+        ),
+        pytest.param(
+            "/^process[2-9]$/",
+            "name",
+            [process_1, process_2],
+            [process_2],
+            id="search regular expression",
+        ),
+    ],
+)
+def test_filter_search(search, column, table, expected):
+    """Test searching the rows of a snapshot, in all columns or the one selected."""
+    assert ProcessSnapshot(table).filter(search, column) == expected
+
+
+def test_filter_sorted():
+    """Test sorting the rows of a snapshot."""
+    snapshot = ProcessSnapshot(rows)
+
+    assert snapshot.filter("", "", "name") == [rows[1], rows[2], rows[0]]
+    assert snapshot.filter("df", "", "-name") == [rows[2], rows[1]]
+    assert snapshot.filter("", "", "nonexistent") is rows
+    assert rows[0]["uuid"] == "1"
+
+
+def test_filter_memoized():
+    """Test that the rows matching a search are only searched for once."""
+    snapshot = ProcessSnapshot(rows)
+
+    result = snapshot.filter("df")
+    assert snapshot.filter("df") is result
+    assert snapshot.filter("df", "name") is not result
+
+    snapshot.max_results = 1
+    snapshot.filter("ru")
+    assert snapshot.filter("df") is not result
+
+
+def test_get_process_snapshot(mocker):
+    """Test that process lists are converted once into a snapshot."""
+    get_rows = mocker.patch(
+        "process_manager.snapshot.get_process_rows", return_value=rows
+    )
+    session_info = MagicMock()
+
+    snapshot = get_process_snapshot(session_info)
+    assert snapshot.rows is rows
+    assert get_process_snapshot(session_info) is snapshot
+    assert get_process_snapshot(MagicMock()) is not snapshot
+    assert get_rows.call_count == 2
+
+
+def test_process_filter():
+    """Test selecting processes with a filter."""
+    row = {"name": "df-01", "user": "u", "session": "run-a", "status_code": "DEAD"}
+
+    process_filter = ProcessFilter(session="run-a", name="^df", status="DEAD")
+    assert process_filter.matches(row)
+    assert not ProcessFilter(session="run-a", status="RUNNING").matches(row)
+    assert not ProcessFilter(name="^01").matches(row)
+    assert ProcessFilter().matches(row)
+
+    assert process_filter.query() == ProcessQuery(session="run-a")
+    assert ProcessFilter(user="u", name="^df").query() == ProcessQuery(user="u")
+    assert ProcessFilter(name="^df").query() == ProcessQuery(names=["^df"])
+    assert ProcessFilter().query() == ProcessQuery(names=[".*"])
+
+    assert str(process_filter) == "session=run-a, name=^df, status=DEAD"
+    assert str(ProcessFilter()) == "all"
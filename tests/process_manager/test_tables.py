@@ -0,0 +1,42 @@
+from uuid import uuid4
+
+from django.utils.html import conditional_escape
+
+from process_manager.tables import ProcessTable, _render_row, render_process_row
+
+
+def _row(status="RUNNING"):
+    return {
+        "uuid": str(uuid4()),
+        "name": "<app>",
+        "user": "user",
+        "session": "session",
+        "status_code": status,
+        "exit_code": 0,
+    }
+
+
+def test_render_process_row():
+    """Test rows are rendered with the same cells as with django-tables2."""
+    row = _row()
+    html = render_process_row(row)
+
+    assert html.startswith(f'<tr id="process-{row["uuid"]}">')
+    assert "&lt;app&gt;" in html
+    bound_row = next(iter(ProcessTable([row]).rows))
+    for column, cell in bound_row.items():
+        td = column.attrs["td"].as_html()
+        assert f"<td {td}>{conditional_escape(cell)}</td>" in html
+
+
+def test_render_process_row_cached():
+    """Test rows are only rendered again when the process state changes."""
+    row = _row()
+    render_process_row(row)
+
+    hits = _render_row.cache_info().hits
+    render_process_row(dict(row))
+    assert _render_row.cache_info().hits == hits + 1
+
+    assert "DEAD" in render_process_row(dict(row, status_code="DEAD"))
+    assert _render_row.cache_info().hits == hits + 1
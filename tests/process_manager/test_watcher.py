@@ -0,0 +1,57 @@
+from uuid import uuid4
+
+import pytest
+
+from process_manager.watcher import ProcessDiff, ProcessWatcher, diff_rows
+
+
+def _row(uuid, status="RUNNING"):
+    return {
+        "uuid": uuid,
+        "name": "process",
+        "user": "user",
+        "session": "session",
+        "status_code": status,
+        "exit_code": 0,
+    }
+
+
+def test_diff_rows():
+    """Test that new, removed and changed processes are found."""
+    kept, changed, removed, added = (str(uuid4()) for _ in range(4))
+    old = {kept: _row(kept), changed: _row(changed), removed: _row(removed)}
+    new = {kept: _row(kept), changed: _row(changed, "DEAD"), added: _row(added)}
+
+    diff = diff_rows(old, new)
+    assert diff.added == [added]
+    assert diff.removed == [removed]
+    assert list(diff.changed) == [changed]
+    assert f'id="process-{changed}"' in diff.changed[changed]
+    assert "DEAD" in diff.changed[changed]
+    assert not diff.reload
+
+
+def test_diff_rows_no_changes():
+    """Test that identical rows produce an empty diff."""
+    uuid = str(uuid4())
+    assert not diff_rows({uuid: _row(uuid)}, {uuid: _row(uuid)})
+
+
+@pytest.mark.asyncio
+async def test_subscribe(mocker):
+    """Test that subscribers are asked to reload and then receive the changes."""
+    uuid = str(uuid4())
+    rows = [[_row(uuid)], [_row(uuid, "DEAD")]]
+    mocker.patch("process_manager.watcher.get_session_info")
+    mocker.patch(
+        "process_manager.watcher.get_process_rows",
+        side_effect=lambda _: rows[0] if len(rows) == 1 else rows.pop(0),
+    )
+    watcher = ProcessWatcher()
+    watcher.interval = 0.01
+
+    events = watcher.subscribe("user")
+    assert await anext(events) == ProcessDiff(reload=True)
+    diff = await anext(events)
+    assert list(diff.changed) == [uuid]
+    await events.aclose()
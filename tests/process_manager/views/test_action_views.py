@@ -4,6 +4,7 @@ from uuid import uuid4
 import pytest
 from django.urls import reverse
 
+from main.models import Job
 from process_manager.views.actions import ProcessAction
 
 from ...utils import PermissionRequiredTest
@@ -40,3 +41,118 @@ class TestProcessActionView(PermissionRequiredTest):
         assert response.url == reverse("process_manager:index")
 
         mock.assert_called_once_with(uuids_, ProcessAction(action), "process_user")
+
+    def test_results_reported(self, auth_process_client, mocker):
+        """Test the outcome of the action is recorded in its job."""
+        mock = mocker.patch("process_manager.views.actions.process_call")
+        mock.return_value = {"1": None, "2": RuntimeError("oops")}
+        auth_process_client.post(
+            self.endpoint, data={"action": "restart", "select": ["1", "2"]}
+        )
+        job = Job.objects.get(username="process_user")
+        assert job.name == "Restart 2 process(es)"
+        assert job.status == Job.FAILED
+        assert job.progress.splitlines() == [
+            "Restart: 1 process(es) succeeded.",
+            "Restart of 2 failed: oops",
+        ]
+
+    def test_select_all(self, auth_process_client, mocker):
+        """Test the action is performed on all the processes matching the search."""
+        from process_manager.snapshot import ProcessSnapshot
+
+        mock = mocker.patch("process_manager.views.actions.process_call")
+        rows = [{"uuid": "1", "name": "ru-01"}, {"uuid": "2", "name": "df-01"}]
+        search = mocker.patch(
+            "process_manager.views.actions.search_processes",
+            return_value=ProcessSnapshot(rows),
+        )
+        auth_process_client.post(
+            self.endpoint,
+            data={
+                "action": "kill",
+                "select_all": "true",
+                "select": ["1"],
+                "search-drp": "name",
+                "search": "df",
+            },
+        )
+        search.assert_called_once_with("process_user", "name", "df")
+        mock.assert_called_once_with(["2"], ProcessAction.KILL, "process_user")
+
+    def test_chunks(self, auth_process_client, mocker, settings):
+        """Test large actions are performed in chunks, reporting progress."""
+        settings.PROCESS_ACTION_CHUNK_SIZE = 2
+        mock = mocker.patch("process_manager.views.actions.process_call")
+        mock.side_effect = lambda uuids, action, username: dict.fromkeys(uuids)
+        auth_process_client.post(
+            self.endpoint, data={"action": "flush", "select": ["1", "2", "3"]}
+        )
+        assert [call.args[0] for call in mock.call_args_list] == [["1", "2"], ["3"]]
+        job = Job.objects.get(username="process_user")
+        assert job.progress.splitlines() == [
+            "Flush: 2 of 3 process(es) done.",
+            "Flush: 3 of 3 process(es) done.",
+            "Flush: 3 process(es) succeeded.",
+        ]
+
+    def test_filter(self, auth_process_client, mocker):
+        """Test the action is performed on the processes matching a filter."""
+        from process_manager.snapshot import ProcessFilter
+
+        mock = mocker.patch("process_manager.views.actions.process_call")
+        select = mocker.patch(
+            "process_manager.views.actions.select_processes", return_value=["1", "2"]
+        )
+        auth_process_client.post(
+            self.endpoint,
+            data={
+                "action": "kill",
+                "selection": "filter",
+                "select": ["3"],
+                "filter-session": "run-a",
+                "filter-status": "RUNNING",
+            },
+        )
+        process_filter = ProcessFilter(session="run-a", status="RUNNING")
+        select.assert_called_once_with("process_user", process_filter)
+        mock.assert_called_once_with(["1", "2"], ProcessAction.KILL, "process_user")
+        job = Job.objects.get(username="process_user")
+        assert job.name == "Kill processes (session=run-a, status=RUNNING)"
+
+    def test_filter_invalid(self, auth_process_client, mocker):
+        """Test an invalid filter is rejected."""
+        mock = mocker.patch("process_manager.views.actions.process_call")
+        response = auth_process_client.post(
+            self.endpoint,
+            data={"action": "kill", "selection": "filter", "filter-name": "["},
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        mock.assert_not_called()
+
+    def test_filter_empty(self, auth_process_client, mocker):
+        """Test an empty filter is rejected rather than selecting every process."""
+        mock = mocker.patch("process_manager.views.actions.process_call")
+        response = auth_process_client.post(
+            self.endpoint, data={"action": "kill", "selection": "filter"}
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        mock.assert_not_called()
+        assert not Job.objects.exists()
+
+    def test_select_processes(self, mocker):
+        """Test processes are selected by filtering the processes queried."""
+        from process_manager.snapshot import ProcessFilter
+        from process_manager.views.actions import select_processes
+
+        rows = [
+            {"uuid": "1", "session": "run-a", "status_code": "RUNNING"},
+            {"uuid": "2", "session": "run-a", "status_code": "DEAD"},
+        ]
+        get_session_info = mocker.patch(
+            "process_manager.views.actions.get_session_info"
+        )
+        mocker.patch("process_manager.snapshot.get_process_rows", return_value=rows)
+        process_filter = ProcessFilter(session="run-a", status="DEAD")
+        assert select_processes("user", process_filter) == ["2"]
+        get_session_info.assert_called_once_with("user", process_filter.query())
@@ -4,6 +4,9 @@ from uuid import uuid4
 from django.urls import reverse
 from pytest_django.asserts import assertContains, assertNotContains, assertTemplateUsed
 
+from main.models import Job
+from process_manager.logs import ANCHOR_LINES, last_lines
+
 from ...utils import LoginRequiredTest, PermissionRequiredTest
 
 
@@ -32,6 +35,16 @@ class TestIndexView(LoginRequiredTest):
             f'<a class="nav-link" href="{reverse("process_manager:boot_process")}">Boot</a>',  # noqa: E501
         )
 
+    def test_push(self, auth_client, settings):
+        """Test that the table listens to pushed changes only when enabled."""
+        events_url = reverse("process_manager:process_table_events")
+
+        settings.PROCESS_TABLE_PUSH = False
+        assertNotContains(auth_client.get(self.endpoint), events_url)
+
+        settings.PROCESS_TABLE_PUSH = True
+        assertContains(auth_client.get(self.endpoint), events_url)
+
 
 class TestLogsView(PermissionRequiredTest):
     """Tests for the logs view."""
@@ -39,15 +52,19 @@ class TestLogsView(PermissionRequiredTest):
     uuid = uuid4()
     endpoint = reverse("process_manager:logs", kwargs=dict(uuid=uuid))
 
-    def test_get(self, auth_logs_client, mocker):
+    def test_get(self, auth_logs_client, mocker, settings):
         """Test the logs view for a privileged user."""
-        mock = mocker.patch("process_manager.views.pages.get_process_logs")
+        settings.PROCESS_LOG_LINES = 2
+        lines = ["line 1", "line 2", "line 3"]
+        mock = mocker.patch(
+            "process_manager.views.pages.stream_process_logs", return_value=iter(lines)
+        )
         with assertTemplateUsed(template_name="process_manager/logs.html"):
             response = auth_logs_client.get(self.endpoint)
         assert response.status_code == HTTPStatus.OK
 
-        mock.assert_called_once_with(str(self.uuid), "logs_user")
-        assert "log_lines" in response.context
+        mock.assert_called_once_with(str(self.uuid), "logs_user", 2 + ANCHOR_LINES)
+        assert response.context["log_lines"] == last_lines(lines, 2)
 
 
 class TestBootProcess(PermissionRequiredTest):
@@ -79,7 +96,11 @@ class TestBootProcess(PermissionRequiredTest):
 
     def test_post_valid(self, auth_process_client, mocker, dummy_session_data):
         """Test the POST request for the BootProcess view."""
-        mock = mocker.patch("process_manager.views.pages.boot_process")
+        mock = mocker.patch("process_manager.views.pages.stream_boot_process")
+        process = mocker.MagicMock()
+        process.data.process_description.metadata.name = "process"
+        process.data.uuid.uuid = "1234"
+        mock.return_value = [process]
         response = auth_process_client.post(
             reverse("process_manager:boot_process"), data=dummy_session_data
         )
@@ -88,3 +109,6 @@ class TestBootProcess(PermissionRequiredTest):
         assert response.url == reverse("process_manager:index")
 
         mock.assert_called_once_with("process_user", dummy_session_data)
+        job = Job.objects.get(username="process_user")
+        assert job.status == Job.SUCCEEDED
+        assert job.progress == "Booted process (1234)\n"
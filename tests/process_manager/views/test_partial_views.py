@@ -2,13 +2,13 @@ from http import HTTPStatus
 from unittest.mock import MagicMock
 from uuid import uuid4
 
-import pytest
 from django.test import Client
 from django.urls import reverse
 
+from process_manager.logs import ANCHOR_LINES, last_lines
 from process_manager.tables import ProcessTable
 
-from ...utils import LoginRequiredTest
+from ...utils import LoginRequiredTest, PermissionRequiredTest
 
 
 class TestProcessTableView(LoginRequiredTest):
@@ -63,74 +63,127 @@ class TestProcessTableView(LoginRequiredTest):
             )
             assert row["uuid"] == uuid
 
+    def test_get_with_search_pushdown(self, auth_client: Client, mocker):
+        """Tests that searches are sent to the process manager where possible."""
+        from druncschema.process_manager_pb2 import ProcessQuery
 
-process_1 = {
-    "uuid": "1",
-    "name": "Process1",
-    "user": "user1",
-    "session": "session1",
-    "status_code": "running",
-    "exit_code": 0,
-}
-process_2 = {
-    "uuid": "2",
-    "name": "Process2",
-    "user": "user2",
-    "session": "session2",
-    "status_code": "completed",
-    "exit_code": 0,
-}
-
-
-@pytest.mark.parametrize(
-    "search, column, table, expected",
-    [
-        pytest.param(
-            "",
-            "",
-            [process_1, process_2],
-            [process_1, process_2],
-            id="no search",
-        ),
-        pytest.param(
-            "Process1",
-            "",
-            [process_1, process_2],
-            [process_1],
-            id="search all columns",
-        ),
-        pytest.param(
-            "Process1",
-            "name",
-            [process_1, process_2],
-            [process_1],
-            id="search specific column",
-        ),
-        pytest.param(
-            "Process1",
-            "nonexistent",
-            [process_1, process_2],
-            [process_1],
-            id="search non-existent column",
-        ),
-        pytest.param(
-            "Process1",
-            "",
-            [],
-            [],
-            id="filter empty table",
-        ),
-        pytest.param(
-            "process1",
-            "",
-            [process_1, process_2],
-            [process_1],
-            id="search case insensitive",
-        ),
-    ],
-)
-def test_filter_table(search, column, table, expected):
-    """Test filter_table function."""
-    from process_manager.views.partials import filter_table
-
-    assert filter_table(search, column, table) == expected
+        mock = self._mock_session_info(mocker, [str(uuid4())], ["session1"])
+        mock.reset_mock()
+
+        auth_client.get(self.endpoint, data={"search-drp": "name", "search": "app"})
+        mock.assert_called_once_with("user", ProcessQuery(names=["(?i)app"]))
+
+        mock.reset_mock()
+        auth_client.get(self.endpoint, data={"search-drp": "", "search": "app"})
+        mock.assert_called_once_with("user", None)
+
+    def test_get_with_search_session_substring(self, auth_client: Client, mocker):
+        """Tests that sessions are searched by substring, even if one matches."""
+        mock = self._mock_session_info(
+            mocker, [str(uuid4()) for _ in range(3)], ["run", "run2", "other"]
+        )
+        mock.reset_mock()
+
+        response = auth_client.get(
+            self.endpoint, data={"search-drp": "session", "search": "run"}
+        )
+        assert response.status_code == HTTPStatus.OK
+        mock.assert_called_once_with("user", None)
+        sessions = [row["session"] for row in response.context["table"].data.data]
+        assert sorted(sessions) == ["run", "run2"]
+
+    def test_get_paginated(self, auth_client: Client, mocker, settings):
+        """Tests that the table is rendered in windows of sorted rows."""
+        settings.PROCESS_TABLE_PAGE_SIZE = 2
+        uuids = [str(uuid4()) for _ in range(5)]
+        self._mock_session_info(mocker, uuids)
+        expected = sorted(uuids, reverse=True)
+
+        response = auth_client.get(self.endpoint, data={"sort": "-uuid"})
+        assert [row["uuid"] for row in response.context["table"].data] == expected[:2]
+        assert response.context["total"] == 5
+        assert response.context["more"]
+        assert b'name="select_all"' in response.content
+        assert b'"offset": 2' in response.content
+
+        response = auth_client.get(self.endpoint, data={"sort": "-uuid", "offset": "4"})
+        assert [row["uuid"] for row in response.context["table"].data] == expected[4:]
+        assert not response.context["more"]
+        assert b"<tbody" not in response.content
+
+        response = auth_client.get(self.endpoint, data={"limit": 4})
+        assert len(response.context["table"].data) == 4
+
+        response = auth_client.get(self.endpoint, data={"offset": -1})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+class TestProcessTableEventsView(LoginRequiredTest):
+    """Test the process_manager.views.process_table_events view function."""
+
+    endpoint = reverse("process_manager:process_table_events")
+
+
+class TestLogLinesView(PermissionRequiredTest):
+    """Test the process_manager.views.log_lines view function."""
+
+    uuid = uuid4()
+    endpoint = reverse("process_manager:log_lines", kwargs=dict(uuid=uuid))
+
+    def _get(self, client, mocker, lines, **data):
+        mock = mocker.patch(
+            "process_manager.views.partials.stream_process_logs",
+            return_value=iter(lines),
+        )
+        response = client.get(self.endpoint, data=data)
+        content = b"".join(response.streaming_content).decode()
+        return mock, response, content
+
+    def test_get(self, auth_logs_client, mocker):
+        """Test the last lines of the log are streamed."""
+        mock, response, content = self._get(
+            auth_logs_client, mocker, ["line 1", "line 2"], how_far=2
+        )
+        assert response.status_code == HTTPStatus.OK
+        mock.assert_called_once_with(str(self.uuid), "logs_user", 2)
+        assert "line 1" in content
+        assert "line 2" in content
+
+    def test_get_older(self, auth_logs_client, mocker):
+        """Test the lines already displayed are left out."""
+        _, _, content = self._get(
+            auth_logs_client, mocker, ["line 1", "line 2"], how_far=2, skip=1
+        )
+        assert "line 1" in content
+        assert "line 2" not in content
+
+    def test_get_after(self, auth_logs_client, mocker, settings):
+        """Test only the lines after the last one displayed are sent."""
+        settings.PROCESS_LOG_LINES = 10
+        anchor = last_lines(["line 1", "line 1"], 1)[0].anchor
+        mock, response, content = self._get(
+            auth_logs_client,
+            mocker,
+            ["line 1", "line 1", "line 1", "line 2"],
+            after=anchor,
+        )
+        mock.assert_called_once_with(str(self.uuid), "logs_user", 10 + ANCHOR_LINES)
+        assert "HX-Reswap" not in response
+        assert content.count("line 1") == 1
+        assert "line 2" in content
+
+    def test_get_after_not_found(self, auth_logs_client, mocker):
+        """Test the lines displayed are replaced if the last one is not found."""
+        _, response, content = self._get(
+            auth_logs_client, mocker, ["line 1", "line 2"], after="unknown", how_far=1
+        )
+        assert response["HX-Reswap"] == "innerHTML"
+        assert "line 1" not in content
+        assert "line 2" in content
+
+    def test_get_invalid(self, auth_logs_client, mocker):
+        """Test invalid parameters are rejected."""
+        mock = mocker.patch("process_manager.views.partials.stream_process_logs")
+        response = auth_logs_client.get(self.endpoint, data={"how_far": 0})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        mock.assert_not_called()
@@ -25,6 +25,19 @@ class TestActiveSessionsView(LoginRequiredTest):
         expected = list(sessions_table.as_values())
         assert actual == expected
 
+    def test_sessions_table_not_modified(self, auth_client, mocker):
+        """Tests the table is only sent again if the sessions changed."""
+        mock = mocker.patch("interfaces.session_manager_interface.get_sessions")
+        mock.return_value = [{"name": "123", "actor": "Gandalf"}]
+        etag = auth_client.get(self.endpoint)["ETag"]
+
+        response = auth_client.get(self.endpoint, headers={"If-None-Match": etag})
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+        mock.return_value = [{"name": "456", "actor": "Gandalf"}]
+        response = auth_client.get(self.endpoint, headers={"If-None-Match": etag})
+        assert response.status_code == HTTPStatus.OK
+
 
 class TestAvailableConfigsView(LoginRequiredTest):
     """Test the controller.views.partials.available_configs_table_view view function."""